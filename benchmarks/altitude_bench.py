@@ -0,0 +1,70 @@
+"""Pressure -> altitude: AltitudeLUT vs the exact ISA pow() formula.
+
+Runs on the board (mpremote run benchmarks/altitude_bench.py, with sensors/
+on the device) or on desktop (python benchmarks/altitude_bench.py).
+Prints the per-call cost of both and the LUT's max error over its table range.
+"""
+import sys
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+if __name__ == '__main__' and not hasattr(time, 'ticks_us'):
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensors.altitude import AltitudeLUT, altitude_exact, SEA_LEVEL_PA
+
+
+def _now_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def _elapsed_us(t0):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(time.ticks_us(), t0)
+    return _now_us() - t0
+
+
+def max_error(lut, points=20001):
+    """Worst |lut - exact| in metres over the table's pressure-ratio range."""
+    worst = 0.0
+    at = lut.r_min
+    span = lut.r_max - lut.r_min
+    for k in range(points):
+        r = lut.r_min + span * k / (points - 1)
+        p = r * lut.p0_pa
+        e = abs(lut.altitude(p) - altitude_exact(p, lut.p0_pa))
+        if e > worst:
+            worst = e
+            at = r
+    return worst, at
+
+
+def time_per_call_us(fn, pressures, rounds):
+    t0 = _now_us()
+    for _ in range(rounds):
+        for p in pressures:
+            fn(p)
+    return _elapsed_us(t0) / float(rounds * len(pressures))
+
+
+def main(rounds=20):
+    lut = AltitudeLUT()
+    pressures = [SEA_LEVEL_PA * (0.62 + 0.47 * k / 99) for k in range(100)]
+    exact_us = time_per_call_us(altitude_exact, pressures, rounds)
+    lut_us = time_per_call_us(lut.altitude, pressures, rounds)
+    err, at = max_error(lut)
+    print('exact pow(): {:.2f} us/call'.format(exact_us))
+    print('AltitudeLUT: {:.2f} us/call ({:.1f}x)'.format(lut_us, exact_us / lut_us))
+    print('max error  : {:.4f} m at p/p0 = {:.4f} ({} segments, r {}..{})'.format(
+        err, at, lut.segments, lut.r_min, lut.r_max))
+    return {'exact_us': exact_us, 'lut_us': lut_us, 'max_error_m': err}
+
+
+if __name__ == '__main__':
+    main()
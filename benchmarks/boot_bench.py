@@ -0,0 +1,42 @@
+"""Boot to armable: full hardware probe vs the persisted discovery record.
+
+Board only (mpremote run benchmarks/boot_bench.py, with the firmware on the
+device). Deletes the bench's own record, builds a FlightComputer (full probe,
+record written), then builds it again (record verified by ID), and prints
+FlightComputer.boot_us and SensorHub.discovery_us for both.
+"""
+import os
+
+from drivers.i2c_bus import get_i2c
+from fc.flight_computer import FlightComputer
+
+BENCH_PATH = 'hw_cache_bench.json'
+
+
+def boot_once(i2c, path):
+    fc = FlightComputer(loop_hz=100, i2c=i2c, hw_cache=path)
+    fc.disarm()
+    return fc.boot_us, fc.sensors.discovery_us, fc.sensors.hw_source
+
+
+def main(path=BENCH_PATH):
+    i2c = get_i2c()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    cold = boot_once(i2c, path)
+    warm = boot_once(i2c, path)
+    for name, (boot_us, disc_us, src) in (('cold', cold), ('warm', warm)):
+        print('{}: boot {:.1f} ms, discovery {:.1f} ms ({})'.format(
+            name, boot_us / 1000.0, disc_us / 1000.0, src))
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return {'cold_us': cold[0], 'warm_us': warm[0],
+            'cold_discovery_us': cold[1], 'warm_discovery_us': warm[1]}
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Per-sample cost of the control/filters.py filters at a 1 kHz gyro rate.
+
+Runs on the board (mpremote run benchmarks/filter_bench.py, with control/ on
+the device) or on desktop (python benchmarks/filter_bench.py). One sample is
+one update() of all three axes. Prints the float and fixed-point cost of each
+filter and the share of the 1000 us budget a 1 kHz loop has per sample; on
+the RP2040 (no FPU) the fixed-point variants are the ones to use.
+"""
+import math
+import sys
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+if __name__ == '__main__' and not hasattr(time, 'ticks_us'):
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+from control.filters import LowPass1, LowPass1Q, lowpass_biquad, notch
+
+SAMPLE_HZ = 1000
+BUDGET_US = 1000000.0 / SAMPLE_HZ
+
+
+def _now_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def _elapsed_us(t0):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(time.ticks_us(), t0)
+    return _now_us() - t0
+
+
+def make_filters():
+    """(name, float filter, fixed filter) for the three filter kinds."""
+    return (
+        ('lowpass1 80 Hz', LowPass1(80, SAMPLE_HZ), LowPass1Q(80, SAMPLE_HZ)),
+        ('biquad lpf 100 Hz', lowpass_biquad(100, SAMPLE_HZ),
+         lowpass_biquad(100, SAMPLE_HZ, fixed=True)),
+        ('notch 200 Hz', notch(200, SAMPLE_HZ), notch(200, SAMPLE_HZ, fixed=True)),
+    )
+
+
+def make_inputs(n=64):
+    """n three-axis gyro samples: float dps and the matching raw counts."""
+    fl = []
+    fx = []
+    for k in range(n):
+        v = array('f', [0.0, 0.0, 0.0])
+        r = array('i', [0, 0, 0])
+        for i in range(3):
+            dps = 50.0 * math.sin(2 * math.pi * (k / 64.0 + i / 3.0)) + \
+                  5.0 * math.sin(2 * math.pi * 200.0 * k / SAMPLE_HZ)
+            v[i] = dps
+            r[i] = int(dps * 65.5)  # +/-500 dps range
+        fl.append(v)
+        fx.append(r)
+    return fl, fx
+
+
+def time_per_sample_us(f, inputs, rounds):
+    upd = f.update
+    t0 = _now_us()
+    for _ in range(rounds):
+        for v in inputs:
+            upd(v)
+    return _elapsed_us(t0) / float(rounds * len(inputs))
+
+
+def main(rounds=20):
+    fl, fx = make_inputs()
+    res = {}
+    print('{} Hz, budget {:.0f} us/sample (3 axes per update)'.format(SAMPLE_HZ, BUDGET_US))
+    for name, f_float, f_fixed in make_filters():
+        us_f = time_per_sample_us(f_float, fl, rounds)
+        us_q = time_per_sample_us(f_fixed, fx, rounds)
+        print('{:18s} float {:6.2f} us ({:4.1f}%)  fixed {:6.2f} us ({:4.1f}%)'.format(
+            name, us_f, 100.0 * us_f / BUDGET_US, us_q, 100.0 * us_q / BUDGET_US))
+        res[name] = (us_f, us_q)
+    return res
+
+
+if __name__ == '__main__':
+    main()
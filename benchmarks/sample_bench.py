@@ -0,0 +1,123 @@
+"""SensorHub read: legacy per-call dict vs the reused SensorSample.
+
+The legacy path rebuilds the original 13-key dict from the wrappers' read()
+dicts and has the consumer pick it apart with .get() / `or` defaults; the
+new path is SensorHub.update() plus attribute and validity-bit reads.
+Runs on the board (mpremote run benchmarks/sample_bench.py; pass the I2C bus
+to main() to read real sensors) or on desktop with the simulated sensors.
+Prints time per read and heap bytes allocated per read.
+"""
+import gc
+import sys
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+if __name__ == '__main__' and not hasattr(time, 'ticks_us'):
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensors.sensor_hub import SensorHub
+from sensors.sample import VALID_ALTITUDE, VALID_BARO_TEMP
+
+
+def _now_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def _elapsed_us(t0):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(time.ticks_us(), t0)
+    return _now_us() - t0
+
+
+def legacy_read(hub):
+    """The original SensorHub.read() dict and FlightComputer.step() lookups."""
+    ts_ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+    imu = hub.imu.read()
+    baro = hub.baro.read()
+    gps = hub.gps.read()
+    s = {
+        'ts_ms': ts_ms,
+        'accel_g': imu.get('accel_g'),
+        'gyro_dps': imu.get('gyro_dps'),
+        'mag_uT': imu.get('mag_uT'),
+        'imu_temp_c': imu.get('temp_c'),
+        'temperature_c': baro.get('temperature_c'),
+        'pressure_pa': baro.get('pressure_pa'),
+        'altitude_m': baro.get('altitude_m'),
+        'gps_has_fix': gps.get('has_fix'),
+        'gps_lat': gps.get('lat'),
+        'gps_lon': gps.get('lon'),
+        'gps_alt_m': gps.get('alt_m'),
+        'gps_sats': gps.get('sats'),
+    }
+    a = s.get('accel_g') or (0.0, 0.0, 1.0)
+    g = s.get('gyro_dps') or (0.0, 0.0, 0.0)
+    alt = s.get('altitude_m')
+    temp = s.get('temperature_c') or s.get('imu_temp_c')
+    return a[2] + g[0] + (alt or 0.0) + (temp or 0.0)
+
+
+def sample_read(hub):
+    s = hub.update()
+    v = s.valid
+    a = s.accel_g
+    g = s.gyro_dps
+    alt = s.altitude_m if v & VALID_ALTITUDE else 0.0
+    temp = s.temperature_c if v & VALID_BARO_TEMP else s.imu_temp_c
+    return a[2] + g[0] + alt + temp
+
+
+def time_per_read_us(fn, hub, reads):
+    fn(hub)
+    t0 = _now_us()
+    for _ in range(reads):
+        fn(hub)
+    return _elapsed_us(t0) / float(reads)
+
+
+def bytes_per_read(fn, hub, reads=20):
+    """Heap bytes allocated per read (MicroPython: gc.mem_alloc() with the
+    collector off; CPython: tracemalloc peak over a single read)."""
+    fn(hub)
+    if hasattr(gc, 'mem_alloc'):
+        gc.collect()
+        gc.disable()
+        try:
+            m0 = gc.mem_alloc()
+            for _ in range(reads):
+                fn(hub)
+            return (gc.mem_alloc() - m0) / float(reads)
+        finally:
+            gc.enable()
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(hub)
+        return float(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+
+def main(i2c=None, reads=500):
+    hub = SensorHub(i2c)
+    legacy_us = time_per_read_us(legacy_read, hub, reads)
+    sample_us = time_per_read_us(sample_read, hub, reads)
+    legacy_b = bytes_per_read(legacy_read, hub)
+    sample_b = bytes_per_read(sample_read, hub)
+    print('legacy dict : {:.1f} us/read, {:.0f} B/read'.format(legacy_us, legacy_b))
+    print('SensorSample: {:.1f} us/read, {:.0f} B/read ({:.2f}x)'.format(
+        sample_us, sample_b, legacy_us / sample_us))
+    return {'legacy_us': legacy_us, 'sample_us': sample_us,
+            'legacy_bytes': legacy_b, 'sample_bytes': sample_b}
+
+
+if __name__ == '__main__':
+    main()
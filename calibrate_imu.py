@@ -0,0 +1,42 @@
+try:
+    from drivers.i2c_bus import get_i2c
+    from sensors.sensor_hub import SensorHub
+    from sensors.hw_cache import HW_CACHE_PATH
+    from sensors import imu_cal
+except ImportError as e:
+    print("Import error:", e)
+    raise
+
+
+def main(path=imu_cal.IMU_CAL_PATH, accel=True):
+    hub = SensorHub(get_i2c(), hw_cache=HW_CACHE_PATH, imu_cal=path)
+    imu = hub.imu
+    print("Keep the board still: measuring gyro bias...")
+    gyro = imu_cal.GyroBias()
+    bias = imu_cal.calibrate_gyro(imu, gyro)
+    if bias is None:
+        print("Board kept moving ({} restarts); nothing saved.".format(gyro.rejected))
+        return None
+    print("Gyro bias (dps): {:.3f} {:.3f} {:.3f}".format(*bias))
+    offset = scale = None
+    if accel:
+        est = imu_cal.AccelSixPosition()
+        imu.set_calibration(None)
+        while est.missing():
+            print("Rest the board", ' / '.join(est.missing()), "...")
+            slot = imu_cal.capture_accel(imu, est)
+            if slot is not None:
+                print("  got", imu_cal.POSITIONS[slot])
+        offset, scale = est.result()
+        print("Accel offset (g): {:.4f} {:.4f} {:.4f}".format(*offset))
+        print("Accel scale:      {:.4f} {:.4f} {:.4f}".format(*scale))
+    elif imu.cal:
+        offset, scale = imu.cal.get('accel_offset_g'), imu.cal.get('accel_scale')
+    cal = imu_cal.record(imu._lib, bias, offset, scale)
+    imu.set_calibration(cal)
+    print("Saved" if imu_cal.save(cal, path) else "Could not write", path)
+    return cal
+
+
+if __name__ == '__main__':
+    main()
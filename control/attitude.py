@@ -18,6 +18,12 @@ class ComplementaryAHRS:
     def update(self, accel_g, gyro_dps, dt):
         ax, ay, az = accel_g or (0.0, 0.0, 1.0)
         gx, gy, gz = gyro_dps or (0.0, 0.0, 0.0)
+        self.update_xyz(ax, ay, az, gx, gy, gz, dt)
+        return self.roll, self.pitch, self.yaw
+
+    def update_xyz(self, ax, ay, az, gx, gy, gz, dt):
+        """Same as update() with scalar inputs; updates roll/pitch/yaw in place
+        and returns nothing, so the control loop does not build tuples."""
         # Integrate gyro
         roll_g = self.roll + gx * dt
         pitch_g = self.pitch + gy * dt
@@ -33,4 +39,3 @@ class ComplementaryAHRS:
         self.roll = a * roll_g + (1 - a) * roll_a
         self.pitch = a * pitch_g + (1 - a) * pitch_a
         self.yaw = yaw_g
-        return self.roll, self.pitch, self.yaw
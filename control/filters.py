@@ -0,0 +1,242 @@
+"""Three-axis low-pass and notch filters for gyro, accel and the PID D term.
+
+Each filter keeps its state in preallocated arrays and filters x, y and z
+in one update(v) call: v is any 3-item sequence (e.g. SensorSample.gyro_dps)
+and the result goes to the filter's own `out` array, or back into v with
+update(v, v). Nothing is allocated per call.
+
+Two variants of each:
+
+- LowPass1, Biquad: float maths, for the RP2350's FPU and the desktop.
+- LowPass1Q, BiquadQ: integer maths on raw sensor counts, for the FPU-less
+  RP2040. The biquad runs Direct Form I with error feedback: the fraction
+  cut off each output is added to the next sum, so there is no rounding
+  deadband around the settled value, and its numerator is adjusted after
+  quantisation to keep the design's DC gain, which matters at low cutoffs
+  where 1 + a1 + a2 is only a few counts. Coefficients get up to FILTER_Q
+  (13) fraction bits, fewer when the sum of the coefficient magnitudes
+  times int16 full scale (plus 10% for overshoot) would reach 2^30,
+  MicroPython's small-int bound: gyro low-passes get Q13, notches mostly Q12.
+  LowPass1Q is always Q13. No intermediate becomes a long int.
+
+lowpass_biquad() and notch() build a biquad from cutoff/centre frequency
+(RBJ cookbook), float or fixed (fixed=True).
+"""
+import math
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+try:
+    from micropython import const
+except Exception:
+    def const(x):
+        return x
+
+FILTER_Q = const(13)
+_ONE_Q = const(8192)
+_HALF_Q = const(4096)
+_BIQUAD_IN_MAX = const(36045)  # int16 full scale + 10%
+_SMALL_INT = const(0x40000000)
+
+Q_BUTTERWORTH = 0.7071
+NOTCH_Q = 2.0
+
+
+def lpf_alpha(cutoff_hz, dt):
+    """Smoothing factor of a first-order low-pass at the given step."""
+    rc = 1.0 / (2.0 * math.pi * cutoff_hz)
+    return dt / (dt + rc)
+
+
+def _rbj(kind, f_hz, sample_hz, q):
+    # (b0, b1, b2, a1, a2) normalised by a0
+    w0 = 2.0 * math.pi * f_hz / sample_hz
+    c = math.cos(w0)
+    alpha = math.sin(w0) / (2.0 * q)
+    a0 = 1.0 + alpha
+    if kind == 'lowpass':
+        b0 = b2 = (1.0 - c) * 0.5 / a0
+        b1 = (1.0 - c) / a0
+    else:
+        b0 = b2 = 1.0 / a0
+        b1 = -2.0 * c / a0
+    return b0, b1, b2, -2.0 * c / a0, (1.0 - alpha) / a0
+
+
+class LowPass1:
+    """First-order (exponential) low-pass, float."""
+    def __init__(self, cutoff_hz, sample_hz):
+        self.a = lpf_alpha(cutoff_hz, 1.0 / sample_hz)
+        self.y = array('f', [0.0, 0.0, 0.0])
+        self.out = array('f', [0.0, 0.0, 0.0])
+        self._primed = False
+
+    def reset(self):
+        self._primed = False
+
+    def update(self, v, out=None):
+        if out is None:
+            out = self.out
+        y = self.y
+        if not self._primed:
+            # Start from the first sample instead of ramping up from zero
+            y[0] = v[0]; y[1] = v[1]; y[2] = v[2]
+            self._primed = True
+        a = self.a
+        for i in range(3):
+            yi = y[i] + a * (v[i] - y[i])
+            y[i] = yi
+            out[i] = yi
+        return out
+
+
+class LowPass1Q:
+    """First-order low-pass on integers. The state carries FILTER_Q extra
+    fraction bits so small steps are not lost to truncation."""
+    def __init__(self, cutoff_hz, sample_hz):
+        self.a = int(round(lpf_alpha(cutoff_hz, 1.0 / sample_hz) * _ONE_Q))
+        self.y = array('i', [0, 0, 0])
+        self.out = array('i', [0, 0, 0])
+        self._primed = False
+
+    def reset(self):
+        self._primed = False
+
+    def update(self, v, out=None):
+        if out is None:
+            out = self.out
+        y = self.y
+        if not self._primed:
+            y[0] = v[0] << FILTER_Q; y[1] = v[1] << FILTER_Q; y[2] = v[2] << FILTER_Q
+            self._primed = True
+        a = self.a
+        for i in range(3):
+            yi = y[i]
+            yi += a * (v[i] - ((yi + _HALF_Q) >> FILTER_Q))
+            y[i] = yi
+            out[i] = (yi + _HALF_Q) >> FILTER_Q
+        return out
+
+
+class Biquad:
+    """Second-order section, float, transposed Direct Form II."""
+    def __init__(self, b0, b1, b2, a1, a2):
+        self.s1 = array('f', [0.0, 0.0, 0.0])
+        self.s2 = array('f', [0.0, 0.0, 0.0])
+        self.out = array('f', [0.0, 0.0, 0.0])
+        self.set(b0, b1, b2, a1, a2)
+
+    def set(self, b0, b1, b2, a1, a2):
+        """Load new coefficients (e.g. to move a notch); state is kept."""
+        self.b0 = b0
+        self.b1 = b1
+        self.b2 = b2
+        self.a1 = a1
+        self.a2 = a2
+
+    def reset(self):
+        for i in range(3):
+            self.s1[i] = 0.0
+            self.s2[i] = 0.0
+
+    def update(self, v, out=None):
+        if out is None:
+            out = self.out
+        s1 = self.s1
+        s2 = self.s2
+        b0 = self.b0; b1 = self.b1; b2 = self.b2
+        a1 = self.a1; a2 = self.a2
+        for i in range(3):
+            x = v[i]
+            y = b0 * x + s1[i]
+            s1[i] = b1 * x - a1 * y + s2[i]
+            s2[i] = b2 * x - a2 * y
+            out[i] = y
+        return out
+
+
+class BiquadQ:
+    """Second-order section on integers, Direct Form I with error feedback.
+    Takes float coefficients and quantises them to `shift` fraction bits
+    (FILTER_Q or fewer, see the module docstring)."""
+    def __init__(self, b0, b1, b2, a1, a2):
+        # x1, x2, y1, y2 and the carried fraction e for each axis
+        self.x1 = array('i', [0, 0, 0])
+        self.x2 = array('i', [0, 0, 0])
+        self.y1 = array('i', [0, 0, 0])
+        self.y2 = array('i', [0, 0, 0])
+        self.e = array('i', [0, 0, 0])
+        self.out = array('i', [0, 0, 0])
+        self.set(b0, b1, b2, a1, a2)
+
+    def set(self, b0, b1, b2, a1, a2):
+        mag = abs(b0) + abs(b1) + abs(b2) + abs(a1) + abs(a2)
+        shift = FILTER_Q
+        while shift > 0 and mag * (1 << shift) * _BIQUAD_IN_MAX >= _SMALL_INT:
+            shift -= 1
+        one = 1 << shift
+        self.a1 = a1q = int(round(a1 * one))
+        self.a2 = a2q = int(round(a2 * one))
+        self.b0 = int(round(b0 * one))
+        self.b2 = int(round(b2 * one))
+        b1q = int(round(b1 * one))
+        den = 1.0 + a1 + a2
+        if den > 1e-9:
+            # DC gain = sum(b) / (1 + a1 + a2): give the quantised numerator
+            # the sum that keeps the float design's gain with the quantised
+            # poles (the remainder goes into b1)
+            want = int(round((b0 + b1 + b2) / den * (one + a1q + a2q)))
+            b1q += want - (self.b0 + b1q + self.b2)
+        self.b1 = b1q
+        self.shift = shift
+        self.frac = one - 1
+
+    def reset(self):
+        for i in range(3):
+            self.x1[i] = 0
+            self.x2[i] = 0
+            self.y1[i] = 0
+            self.y2[i] = 0
+            self.e[i] = 0
+
+    def update(self, v, out=None):
+        if out is None:
+            out = self.out
+        x1 = self.x1; x2 = self.x2
+        y1 = self.y1; y2 = self.y2
+        e = self.e
+        b0 = self.b0; b1 = self.b1; b2 = self.b2
+        a1 = self.a1; a2 = self.a2
+        shift = self.shift; frac = self.frac
+        for i in range(3):
+            x = v[i]
+            acc = (b0 * x + b1 * x1[i] + b2 * x2[i] - a1 * y1[i] - a2 * y2[i]
+                   + e[i])
+            y = acc >> shift
+            e[i] = acc & frac
+            x2[i] = x1[i]
+            x1[i] = x
+            y2[i] = y1[i]
+            y1[i] = y
+            out[i] = y
+        return out
+
+
+def lowpass_biquad(cutoff_hz, sample_hz, q=Q_BUTTERWORTH, fixed=False):
+    """Second-order low-pass (Butterworth at the default q)."""
+    cls = BiquadQ if fixed else Biquad
+    return cls(*_rbj('lowpass', cutoff_hz, sample_hz, q))
+
+
+def notch(center_hz, sample_hz, q=NOTCH_Q, fixed=False):
+    """Notch at center_hz; bandwidth is center_hz / q."""
+    cls = BiquadQ if fixed else Biquad
+    return cls(*_rbj('notch', center_hz, sample_hz, q))
+
+
+def set_notch(f, center_hz, sample_hz, q=NOTCH_Q):
+    """Move an existing notch (Biquad or BiquadQ) without reallocating."""
+    f.set(*_rbj('notch', center_hz, sample_hz, q))
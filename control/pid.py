@@ -1,5 +1,9 @@
+from control.filters import lpf_alpha
+
+
 class PID:
-    def __init__(self, kp=0.0, ki=0.0, kd=0.0, i_limit=None, out_limit=None):
+    def __init__(self, kp=0.0, ki=0.0, kd=0.0, i_limit=None, out_limit=None, d_lpf_hz=None):
+        # d_lpf_hz: first-order low-pass on the error derivative (None = raw)
         self.kp = kp
         self.ki = ki
         self.kd = kd
@@ -7,10 +11,18 @@ class PID:
         self.prev_err = None
         self.i_limit = i_limit
         self.out_limit = out_limit
+        self.d_lpf_hz = d_lpf_hz
+        self.d_rate = 0.0  # filtered error derivative (d_lpf_hz only)
+        # lpf_alpha() for the last (d_lpf_hz, dt): a divide plus pi maths
+        # that a loop at a steady rate need not repeat every update
+        self._alpha = 0.0
+        self._alpha_hz = None
+        self._alpha_dt = None
 
     def reset(self):
         self.i = 0.0
         self.prev_err = None
+        self.d_rate = 0.0
 
     def update(self, err, dt):
         if dt <= 0:
@@ -21,7 +33,16 @@ class PID:
             self.i = max(-self.i_limit, min(self.i, self.i_limit))
         d = 0.0
         if self.prev_err is not None:
-            d = self.kd * (err - self.prev_err) / dt
+            if self.d_lpf_hz:
+                if dt != self._alpha_dt or self.d_lpf_hz != self._alpha_hz:
+                    self._alpha_hz = self.d_lpf_hz
+                    self._alpha_dt = dt
+                    self._alpha = lpf_alpha(self.d_lpf_hz, dt)
+                rate = (err - self.prev_err) / dt
+                self.d_rate += self._alpha * (rate - self.d_rate)
+                d = self.kd * self.d_rate
+            else:
+                d = self.kd * (err - self.prev_err) / dt
         self.prev_err = err
         out = p + self.i + d
         if self.out_limit is not None:
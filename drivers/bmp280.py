@@ -1,5 +1,32 @@
-from micropython import const
-from ustruct import unpack as unp
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+try:
+    from ustruct import unpack as unp
+except ImportError:
+    from struct import unpack as unp
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+if hasattr(time, 'ticks_us'):
+    _ticks_us = time.ticks_us
+    _ticks_diff = time.ticks_diff
+    _ticks_add = time.ticks_add
+else:
+    def _ticks_us():
+        return int(time.monotonic() * 1000000)
+
+    def _ticks_diff(a, b):
+        return a - b
+
+    def _ticks_add(a, b):
+        return a + b
 
 # Author David Stenwall (david at stenwall.io)
 
@@ -59,6 +86,9 @@ _BMP280_OS_MATRIX = [
     [BMP280_PRES_OS_16, BMP280_TEMP_OS_2, 44]
 ]
 
+# Standby time per t_sb setting, in us (normal mode)
+_BMP280_STANDBY_US = (500, 62500, 125000, 250000, 500000, 1000000, 2000000, 4000000)
+
 # Use cases
 BMP280_CASE_HANDHELD_LOW = const(0)
 BMP280_CASE_HANDHELD_DYN = const(1)
@@ -89,23 +119,25 @@ class BMP280:
     def __init__(self, i2c_bus, addr=0x76, use_case=BMP280_CASE_HANDHELD_DYN):
         self._bmp_i2c = i2c_bus
         self._i2c_addr = addr
-
-        # read calibration data
+        # Preallocated bus buffers: steady-state reads/writes allocate nothing
+        self._rd_into = getattr(i2c_bus, 'readfrom_mem_into', None)
+        self._b1 = bytearray(1)
+        self._w1 = bytearray(1)
+        self._data = bytearray(6)
+        self._b2 = bytearray(2)
+        # Shadow of ctrl_meas (0xF4) and config (0xF5): setters write once,
+        # getters never touch the bus. sync()/verify() reconcile with the chip
+        self._shadow = bytearray(2)
+
+        # read calibration data (0x88..0x9F in one burst)
         # < little-endian
         # H unsigned short
         # h signed short
-        self._T1 = unp('<H', self._read(0x88, 2))[0]
-        self._T2 = unp('<h', self._read(0x8A, 2))[0]
-        self._T3 = unp('<h', self._read(0x8C, 2))[0]
-        self._P1 = unp('<H', self._read(0x8E, 2))[0]
-        self._P2 = unp('<h', self._read(0x90, 2))[0]
-        self._P3 = unp('<h', self._read(0x92, 2))[0]
-        self._P4 = unp('<h', self._read(0x94, 2))[0]
-        self._P5 = unp('<h', self._read(0x96, 2))[0]
-        self._P6 = unp('<h', self._read(0x98, 2))[0]
-        self._P7 = unp('<h', self._read(0x9A, 2))[0]
-        self._P8 = unp('<h', self._read(0x9C, 2))[0]
-        self._P9 = unp('<h', self._read(0x9E, 2))[0]
+        cal = bytearray(24)
+        self._read_into(0x88, cal)
+        (self._T1, self._T2, self._T3,
+         self._P1, self._P2, self._P3, self._P4, self._P5,
+         self._P6, self._P7, self._P8, self._P9) = unp('<HhhHhhhhhhhh', cal)
 
         # output raw
         self._t_raw = 0
@@ -116,34 +148,130 @@ class BMP280:
         self._p = 0
 
         self.read_wait_ms = 0  # interval between forced measure and readout
-        self._new_read_ms = 200  # interval between
-        self._last_read_ts = 0
 
+        # Measurement cache: the data registers are read and compensated at
+        # most once per conversion. _period_us is the normal-mode output
+        # period (0 in sleep/forced mode: new data only after force_measure)
+        self._meas_us = 0
+        self._period_us = 0
+        self._due_us = 0
+        self._pending = True  # a conversion newer than the cache is due
+        self._valid = False
+        self._converting = False  # split-phase conversion in flight
+        self.bus_reads = 0
+
+        self.sync()
         if use_case is not None:
             self.use_case(use_case)
 
     def _read(self, addr, size=1):
         return self._bmp_i2c.readfrom_mem(self._i2c_addr, addr, size)
 
+    def _read_into(self, addr, buf):
+        if self._rd_into is not None:
+            self._rd_into(self._i2c_addr, addr, buf)
+        else:
+            buf[:] = self._bmp_i2c.readfrom_mem(self._i2c_addr, addr, len(buf))
+
     def _write(self, addr, b_arr):
         if not type(b_arr) is bytearray:
-            b_arr = bytearray([b_arr])
-        return self._bmp_i2c.writeto_mem(self._i2c_addr, addr, b_arr)
+            w = self._w1
+            w[0] = b_arr & 0xFF
+            b_arr = w
+        self._bmp_i2c.writeto_mem(self._i2c_addr, addr, b_arr)
+        if addr == _BMP280_REGISTER_CONTROL or addr == _BMP280_REGISTER_CONFIG:
+            self._shadow[addr - _BMP280_REGISTER_CONTROL] = b_arr[0]
 
     def _gauge(self):
-        # TODO limit new reads
         # read all data at once (as by spec)
-        d = self._read(_BMP280_REGISTER_DATA, 6)
+        d = self._data
+        self._read_into(_BMP280_REGISTER_DATA, d)
+        self.bus_reads += 1
 
         self._p_raw = (d[0] << 12) + (d[1] << 4) + (d[2] >> 4)
         self._t_raw = (d[3] << 12) + (d[4] << 4) + (d[5] >> 4)
 
+    def sync(self):
+        """Reload the ctrl_meas/config shadow from the chip (one read)."""
+        self._read_into(_BMP280_REGISTER_CONTROL, self._shadow)
+        self._update_timing()
+
+    def verify(self, repair=False):
+        """Compare the chip's ctrl_meas/config with the shadow.
+
+        Returns True when they match. The mode bits are ignored while the
+        shadow says forced: the chip drops back to sleep after a conversion.
+        With repair=True a mismatch is fixed by rewriting the shadow values.
+        """
+        b = self._b2
+        sh = self._shadow
+        self._read_into(_BMP280_REGISTER_CONTROL, b)
+        mask = 0xFC if sh[0] & 3 == BMP280_POWER_FORCED else 0xFF
+        ok = (b[0] ^ sh[0]) & mask == 0 and b[1] == sh[1]
+        if not ok and repair:
+            self._write(_BMP280_REGISTER_CONFIG, sh[1])
+            self._write(_BMP280_REGISTER_CONTROL, sh[0])
+        return ok
+
+    def _update_timing(self):
+        b = self._shadow
+        t_os = b[0] >> 5 & 7
+        p_os = b[0] >> 2 & 7
+        # Datasheet 3.8.1 max measurement time: 1.25 + 2.3*T + (2.3*P + 0.575) ms
+        meas = 1250
+        if t_os:
+            meas += 2300 * (1 << (min(t_os, 5) - 1))
+        if p_os:
+            meas += 2300 * (1 << (min(p_os, 5) - 1)) + 575
+        self._meas_us = meas
+        if b[0] & 3 == BMP280_POWER_NORMAL:
+            self._period_us = meas + _BMP280_STANDBY_US[b[1] >> 5 & 7]
+        else:
+            self._period_us = 0
+        self._pending = True
+
+    def _conv_us(self):
+        # Forced conversion time: table value or datasheet max, whichever is longer
+        return max(self.read_wait_ms * 1000, self._meas_us)
+
+    def _refresh(self):
+        # One bus read + one compensation per conversion period
+        now = _ticks_us()
+        if self._valid and not (self._pending and _ticks_diff(now, self._due_us) >= 0):
+            return
+        self._gauge()
+        self._compensate()
+        self._valid = True
+        if self._period_us:
+            self._due_us = _ticks_add(now, self._period_us)
+        else:
+            self._pending = False
+
+    def _compensate(self):
         self._t_fine = 0
-        self._t = 0
-        self._p = 0
+        self._calc_t_fine()
+        self._t = ((self._t_fine * 5 + 128) >> 8) / 100.
+        self._p = self._calc_pressure()
+
+    def measure(self):
+        """Return (temperature_c, pressure_pa) from one coherent conversion.
+
+        The bus is read only when the sensor has produced a new conversion
+        since the last call; otherwise the cached pair is returned.
+        """
+        self._refresh()
+        return self._t, self._p
+
+    def invalidate(self):
+        """Drop the cache: the next access reads the data registers."""
+        self._valid = False
 
     def reset(self):
         self._write(_BMP280_REGISTER_RESET, 0xB6)
+        # Power-on defaults: sleep, no oversampling, filter off
+        self._shadow[0] = 0
+        self._shadow[1] = 0
+        self._update_timing()
 
     def load_test_calibration(self):
         self._T1 = 27504
@@ -179,7 +307,6 @@ class BMP280:
 
     def _calc_t_fine(self):
         # From datasheet page 22
-        self._gauge()
         if self._t_fine == 0:
             var1 = (((self._t_raw >> 3) - (self._T1 << 1)) * self._T2) >> 11
             var2 = (((((self._t_raw >> 4) - self._T1)
@@ -190,45 +317,53 @@ class BMP280:
 
     @property
     def temperature(self):
-        self._calc_t_fine()
-        if self._t == 0:
-            self._t = ((self._t_fine * 5 + 128) >> 8) / 100.
+        self._refresh()
         return self._t
 
     @property
     def pressure(self):
-        # From datasheet page 22
-        self._calc_t_fine()
-        if self._p == 0:
-            var1 = self._t_fine - 128000
-            var2 = var1 * var1 * self._P6
-            var2 = var2 + ((var1 * self._P5) << 17)
-            var2 = var2 + (self._P4 << 35)
-            var1 = ((var1 * var1 * self._P3) >> 8) + ((var1 * self._P2) << 12)
-            var1 = (((1 << 47) + var1) * self._P1) >> 33
-
-            if var1 == 0:
-                return 0
-
-            p = 1048576 - self._p_raw
-            p = int((((p << 31) - var2) * 3125) / var1)
-            var1 = (self._P9 * (p >> 13) * (p >> 13)) >> 25
-            var2 = (self._P8 * p) >> 19
-
-            p = ((p + var1 + var2) >> 8) + (self._P7 << 4)
-            self._p = p / 256.0
+        self._refresh()
         return self._p
 
+    def _calc_pressure(self):
+        # From datasheet page 22
+        var1 = self._t_fine - 128000
+        var2 = var1 * var1 * self._P6
+        var2 = var2 + ((var1 * self._P5) << 17)
+        var2 = var2 + (self._P4 << 35)
+        var1 = ((var1 * var1 * self._P3) >> 8) + ((var1 * self._P2) << 12)
+        var1 = (((1 << 47) + var1) * self._P1) >> 33
+
+        if var1 == 0:
+            return 0
+
+        p = 1048576 - self._p_raw
+        p = int((((p << 31) - var2) * 3125) / var1)
+        var1 = (self._P9 * (p >> 13) * (p >> 13)) >> 25
+        var2 = (self._P8 * p) >> 19
+
+        p = ((p + var1 + var2) >> 8) + (self._P7 << 4)
+        return p / 256.0
+
     def _write_bits(self, address, value, length, shift=0):
-        d = self._read(address)[0]
-        m = int('1' * length, 2) << shift
+        # Shadowed registers: one write, no read-back
+        if address == _BMP280_REGISTER_CONTROL or address == _BMP280_REGISTER_CONFIG:
+            d = self._shadow[address - _BMP280_REGISTER_CONTROL]
+        else:
+            self._read_into(address, self._b1)
+            d = self._b1[0]
+        m = ((1 << length) - 1) << shift
         d &= ~m
         d |= m & value << shift
         self._write(address, d)
 
     def _read_bits(self, address, length, shift=0):
-        d = self._read(address)[0]
-        return d >> shift & int('1' * length, 2)
+        if address == _BMP280_REGISTER_CONTROL or address == _BMP280_REGISTER_CONFIG:
+            d = self._shadow[address - _BMP280_REGISTER_CONTROL]
+        else:
+            self._read_into(address, self._b1)
+            d = self._b1[0]
+        return d >> shift & ((1 << length) - 1)
 
     @property
     def standby(self):
@@ -238,6 +373,7 @@ class BMP280:
     def standby(self, v):
         assert 0 <= v <= 7
         self._write_bits(_BMP280_REGISTER_CONFIG, v, 3, 5)
+        self._update_timing()
 
     @property
     def iir(self):
@@ -265,6 +401,7 @@ class BMP280:
     def temp_os(self, v):
         assert 0 <= v <= 5
         self._write_bits(_BMP280_REGISTER_CONTROL, v, 3, 5)
+        self._update_timing()
 
     @property
     def press_os(self):
@@ -274,6 +411,7 @@ class BMP280:
     def press_os(self, v):
         assert 0 <= v <= 5
         self._write_bits(_BMP280_REGISTER_CONTROL, v, 3, 2)
+        self._update_timing()
 
     @property
     def power_mode(self):
@@ -283,6 +421,11 @@ class BMP280:
     def power_mode(self, v):
         assert 0 <= v <= 3
         self._write_bits(_BMP280_REGISTER_CONTROL, v, 2)
+        self._update_timing()
+        if v == BMP280_POWER_FORCED:
+            # New data once this conversion completes
+            self._due_us = _ticks_add(_ticks_us(), self._conv_us())
+            self._pending = True
 
     @property
     def is_measuring(self):
@@ -303,6 +446,39 @@ class BMP280:
     def force_measure(self):
         self.power_mode = BMP280_POWER_FORCED
 
+    # Split-phase forced measurement: trigger, keep flying, collect later.
+    # The result is taken read_wait_ms after the trigger; STATUS is not polled.
+    def start_measurement(self):
+        """Start one forced conversion (a single register write).
+
+        Returns the tick (us) from which collect() will return the result.
+        """
+        now = _ticks_us()
+        ctrl = (self._shadow[0] & 0xFC) | BMP280_POWER_FORCED
+        self._write(_BMP280_REGISTER_CONTROL, ctrl)
+        self._period_us = 0  # forced mode: no free-running conversions
+        self._due_us = _ticks_add(now, self._conv_us())
+        self._pending = True
+        self._converting = True
+        return self._due_us
+
+    @property
+    def converting(self):
+        return self._converting
+
+    def measurement_ready(self):
+        """True once the started conversion is due (no bus access)."""
+        return self._converting and _ticks_diff(_ticks_us(), self._due_us) >= 0
+
+    def collect(self):
+        """Return (temperature_c, pressure_pa) of the started conversion, or
+        None while it is still running."""
+        if not self.measurement_ready():
+            return None
+        self._converting = False
+        self._refresh()
+        return self._t, self._p
+
     def normal_measure(self):
         self.power_mode = BMP280_POWER_NORMAL
 
@@ -315,8 +491,10 @@ class BMP280:
         p_os, t_os, self.read_wait_ms = _BMP280_OS_MATRIX[oss]
         self._write(_BMP280_REGISTER_CONFIG, (iir << 2) + (sb << 5))
         self._write(_BMP280_REGISTER_CONTROL, pm + (p_os << 2) + (t_os << 5))
+        self._update_timing()
 
     def oversample(self, oss):
         assert 0 <= oss <= 4
         p_os, t_os, self.read_wait_ms = _BMP280_OS_MATRIX[oss]
-        self._write_bits(_BMP280_REGISTER_CONTROL, p_os + (t_os << 3), 2)
\ No newline at end of file
+        self._write_bits(_BMP280_REGISTER_CONTROL, p_os + (t_os << 3), 6, 2)
+        self._update_timing()
\ No newline at end of file
@@ -1,18 +1,60 @@
-"""u-blox NEO-6M GPS driver (UART/NMEA) - minimal parser.
+"""u-blox NEO-6M GPS driver (UART, NMEA and UBX) - minimal parser.
 
 Works on MicroPython/CPython. If no UART is available, you can use
-parse_nmea_line() directly in tests.
+parse_nmea_line() / parse_ubx() directly in tests.
+
+NEO6M.poll() drains the UART through GpsFramer: whatever uart.any() reports
+goes into a fixed ring buffer, NMEA sentences and UBX frames are assembled
+byte by byte across calls and checksummed on the fly, so one poll costs at
+most a ring's worth of UART reads plus `budget` bytes of framing, however
+much data is pending.
+
+configure_ubx() switches the receiver to binary UBX navigation messages
+(NEO-6M: NAV-POSLLH + NAV-VELNED + NAV-SOL; u-blox 7/M8: NAV-PVT) at up to
+5 Hz and turns the NMEA sentences off. Each frame is decoded with
+struct.unpack_from straight from the framer's preallocated payload buffer.
 """
 from __future__ import annotations
 
 from typing import Optional, Dict, Any
 
+try:
+	from ustruct import unpack_from, pack
+except ImportError:
+	from struct import unpack_from, pack
+
 from .uart_bus import get_uart
 
 # Useful NMEA sentence IDs
 _NMEA_RMC = "GPRMC"
 _NMEA_GGA = "GPGGA"
 
+NMEA_MAX_LEN = 82  # '$' .. '\n', NMEA 0183 limit
+
+# UBX protocol
+UBX_SYNC1 = 0xB5
+UBX_SYNC2 = 0x62
+UBX_MAX_PAYLOAD = 100  # NAV-PVT (92) is the largest frame we decode
+CLS_NAV = 0x01
+CLS_ACK = 0x05
+CLS_CFG = 0x06
+NAV_POSLLH = 0x02
+NAV_SOL = 0x06
+NAV_PVT = 0x07  # u-blox 7 and later; the NEO-6M does not have it
+NAV_VELNED = 0x12
+ACK_NAK = 0x00
+ACK_ACK = 0x01
+CFG_MSG = 0x01
+CFG_RATE = 0x08
+# NMEA sentences the receiver emits by default (class 0xF0): GGA GLL GSA GSV RMC VTG
+_NMEA_STD_IDS = (0x00, 0x01, 0x02, 0x03, 0x04, 0x05)
+# Navigation solution sets for configure_ubx()
+UBX_NAV_NEO6 = (NAV_POSLLH, NAV_VELNED, NAV_SOL)
+UBX_NAV_PVT = (NAV_PVT,)
+
+FRAME_NMEA = 1
+FRAME_UBX = 2
+
 
 def _hex2int(h: str) -> int:
 	try:
@@ -34,31 +76,80 @@ def _nmea_checksum_ok(line: str) -> bool:
 	return calc == _hex2int(cs[:2])
 
 
-def _parse_latlon(nmea_val: str, hemi: str, is_lat: bool) -> Optional[float]:
-	"""Convert ddmm.mmmm (lat) / dddmm.mmmm (lon) + hemisphere to signed degrees."""
-	if not nmea_val or not hemi:
+def _parse_dec(val: str, places: int) -> Optional[int]:
+	"""Decimal string -> int scaled by 10**places, without float ("545.4", 3 -> 545400)."""
+	if not val:
 		return None
 	try:
-		if is_lat:
-			deg = int(nmea_val[0:2])
-			mins = float(nmea_val[2:])
+		neg = val[0] == '-'
+		if neg:
+			val = val[1:]
+		dot = val.find('.')
+		if dot < 0:
+			whole, frac = val, ''
 		else:
-			deg = int(nmea_val[0:3])
-			mins = float(nmea_val[3:])
-		val = deg + mins / 60.0
-		if hemi in ('S', 'W'):
-			val = -val
-		return val
+			whole, frac = val[:dot], val[dot + 1:]
+		frac = (frac + '0' * places)[:places]
+		v = int(whole or '0') * 10 ** places + int(frac or '0')
+		return -v if neg else v
+	except Exception:
+		return None
+
+
+def _parse_latlon_e7(nmea_val: str, hemi: str) -> Optional[int]:
+	"""Convert ddmm.mmmmm / dddmm.mmmmm + hemisphere to signed 1e-7 degrees.
+
+	Integer only: minutes are taken to 1e-5 and rounded once on division,
+	so the result is exact to the receiver's resolution (~2 cm).
+	"""
+	if not nmea_val or not hemi:
+		return None
+	dot = nmea_val.find('.')
+	if dot < 0:
+		dot = len(nmea_val)
+	if dot < 3:
+		return None
+	try:
+		deg = int(nmea_val[:dot - 2])
+		mins_e5 = _parse_dec(nmea_val[dot - 2:], 5)
+		if mins_e5 is None:
+			return None
+		# mins * 1e7 / 60, rounded to nearest
+		val = deg * 10000000 + (mins_e5 * 200 + 60) // 120
+		return -val if hemi in ('S', 'W') else val
 	except Exception:
 		return None
 
 
+def _parse_latlon(nmea_val: str, hemi: str, is_lat: bool) -> Optional[float]:
+	"""Convert ddmm.mmmm (lat) / dddmm.mmmm (lon) + hemisphere to signed degrees."""
+	v = _parse_latlon_e7(nmea_val, hemi)
+	return None if v is None else v * 1e-7
+
+
 def _knots_to_mps(kn: Optional[float]) -> Optional[float]:
 	if kn is None:
 		return None
 	return kn * 0.514444
 
 
+def _knots_to_mm_s(val: str) -> Optional[int]:
+	mkn = _parse_dec(val, 3)  # 1e-3 knots
+	if mkn is None:
+		return None
+	# 1 kn = 1852 m / 3600 s
+	return (mkn * 1852 + 1800) // 3600
+
+
+def _put_latlon(out, lat, ns, lon, ew):
+	lat_e7 = _parse_latlon_e7(lat, ns)
+	lon_e7 = _parse_latlon_e7(lon, ew)
+	out['lat_e7'] = lat_e7
+	out['lon_e7'] = lon_e7
+	out['lat'] = lat_e7 * 1e-7 if lat_e7 is not None else None
+	out['lon'] = lon_e7 * 1e-7 if lon_e7 is not None else None
+
+
 def parse_nmea_line(line: str) -> Optional[Dict[str, Any]]:
 	"""Parse a single NMEA sentence (RMC or GGA). Returns a dict or None.
 
@@ -69,12 +160,15 @@ def parse_nmea_line(line: str) -> Optional[Dict[str, Any]]:
 	- date: str (ddmmyy)
 	- lat: float deg
 	- lon: float deg
+	- lat_e7 / lon_e7: int, 1e-7 deg (exact, use these for navigation)
 	- speed_mps: float
+	- speed_mm_s: int (RMC)
 	- course_deg: float
 	- fix_quality: int (GGA)
 	- sats: int (GGA)
 	- hdop: float (GGA)
 	- alt_m: float (GGA)
+	- alt_mm: int (GGA)
 	"""
 	if not line:
 		return None
@@ -94,13 +188,10 @@ def parse_nmea_line(line: str) -> Optional[Dict[str, Any]]:
 		out['time_utc'] = parts[1] or None
 		status = parts[2] or 'V'
 		out['valid'] = (status == 'A')
-		out['lat'] = _parse_latlon(parts[3], parts[4], True)
-		out['lon'] = _parse_latlon(parts[5], parts[6], False)
-		try:
-			spd_kn = float(parts[7]) if parts[7] else None
-		except Exception:
-			spd_kn = None
-		out['speed_mps'] = _knots_to_mps(spd_kn) if spd_kn is not None else None
+		_put_latlon(out, parts[3], parts[4], parts[5], parts[6])
+		mm_s = _knots_to_mm_s(parts[7])
+		out['speed_mm_s'] = mm_s
+		out['speed_mps'] = mm_s / 1000.0 if mm_s is not None else None
 		try:
 			out['course_deg'] = float(parts[8]) if parts[8] else None
 		except Exception:
@@ -111,8 +202,7 @@ def parse_nmea_line(line: str) -> Optional[Dict[str, Any]]:
 		# $GPGGA,time,lat,N,lon,E,fix,sats,hdop,alt,M,geoid,M,...
 		out['type'] = 'GGA'
 		out['time_utc'] = parts[1] or None
-		out['lat'] = _parse_latlon(parts[2], parts[3], True)
-		out['lon'] = _parse_latlon(parts[4], parts[5], False)
+		_put_latlon(out, parts[2], parts[3], parts[4], parts[5])
 		try:
 			out['fix_quality'] = int(parts[6]) if parts[6] else 0
 		except Exception:
@@ -125,23 +215,319 @@ def parse_nmea_line(line: str) -> Optional[Dict[str, Any]]:
 			out['hdop'] = float(parts[8]) if parts[8] else None
 		except Exception:
 			out['hdop'] = None
-		try:
-			out['alt_m'] = float(parts[9]) if parts[9] else None
-		except Exception:
-			out['alt_m'] = None
+		alt_mm = _parse_dec(parts[9], 3)
+		out['alt_mm'] = alt_mm
+		out['alt_m'] = alt_mm / 1000.0 if alt_mm is not None else None
 		return out
 	return None
 
 
+def _hexval(b: int) -> int:
+	if 48 <= b <= 57:
+		return b - 48
+	if 65 <= b <= 70:
+		return b - 55
+	if 97 <= b <= 102:
+		return b - 87
+	return -1
+
+
+def ubx_frame(cls: int, mid: int, payload=b'') -> bytes:
+	"""Build a UBX frame: sync, class, id, length, payload, Fletcher checksum."""
+	body = bytes((cls, mid, len(payload) & 0xFF, len(payload) >> 8)) + bytes(payload)
+	a = 0
+	b = 0
+	for x in body:
+		a = (a + x) & 0xFF
+		b = (b + a) & 0xFF
+	return bytes((UBX_SYNC1, UBX_SYNC2)) + body + bytes((a, b))
+
+
+class UbxNav:
+	"""Latest UBX navigation solution, integers in the receiver's own units.
+
+	lat/lon in 1e-7 deg, heights in mm (height: ellipsoid, hmsl: mean sea
+	level), velocities in mm/s, heading in 1e-5 deg, pdop in 0.01. Updated
+	in place by parse_ubx(); `updates` counts decoded frames.
+	"""
+	def __init__(self):
+		self.itow_ms = 0
+		self.lat_e7 = 0
+		self.lon_e7 = 0
+		self.height_mm = 0
+		self.hmsl_mm = 0
+		self.h_acc_mm = 0
+		self.v_acc_mm = 0
+		self.vel_n_mm_s = 0
+		self.vel_e_mm_s = 0
+		self.vel_d_mm_s = 0
+		self.gspeed_mm_s = 0
+		self.heading_e5 = 0
+		self.fix_type = 0  # 0 none, 2 2D, 3 3D
+		self.fix_ok = False
+		self.num_sv = 0
+		self.pdop_e2 = 0
+		self.have_pos = False
+		self.updates = 0
+
+
+def parse_ubx(cls: int, mid: int, buf, n: int, nav: UbxNav) -> bool:
+	"""Decode a NAV frame payload (buf[:n]) into nav; False if not handled."""
+	if cls != CLS_NAV:
+		return False
+	if mid == NAV_PVT and n >= 92:
+		(nav.itow_ms, _y, _mo, _d, _h, _mi, _s, _valid, _tacc, _nano,
+		 nav.fix_type, flags, _flags2, nav.num_sv,
+		 nav.lon_e7, nav.lat_e7, nav.height_mm, nav.hmsl_mm,
+		 nav.h_acc_mm, nav.v_acc_mm, nav.vel_n_mm_s, nav.vel_e_mm_s,
+		 nav.vel_d_mm_s, nav.gspeed_mm_s, nav.heading_e5, _sacc, _hacc,
+		 nav.pdop_e2) = unpack_from('<IHBBBBBBIiBBBBiiiiIIiiiiiIIH', buf, 0)
+		nav.fix_ok = bool(flags & 0x01)
+		nav.have_pos = True
+	elif mid == NAV_POSLLH and n >= 28:
+		(nav.itow_ms, nav.lon_e7, nav.lat_e7, nav.height_mm, nav.hmsl_mm,
+		 nav.h_acc_mm, nav.v_acc_mm) = unpack_from('<IiiiiII', buf, 0)
+		nav.have_pos = True
+	elif mid == NAV_VELNED and n >= 36:
+		# cm/s and 1e-5 deg on the wire
+		itow, vn, ve, vd, _speed, gs, nav.heading_e5 = unpack_from('<IiiiIIi', buf, 0)
+		nav.vel_n_mm_s = vn * 10
+		nav.vel_e_mm_s = ve * 10
+		nav.vel_d_mm_s = vd * 10
+		nav.gspeed_mm_s = gs * 10
+	elif mid == NAV_SOL and n >= 52:
+		nav.fix_type, flags = unpack_from('<BB', buf, 10)
+		nav.pdop_e2, nav.num_sv = unpack_from('<HxB', buf, 44)
+		nav.fix_ok = bool(flags & 0x01)
+	else:
+		return False
+	nav.updates += 1
+	return True
+
+
+class GpsFramer:
+	"""Incremental NMEA/UBX framer over a fixed RX ring buffer.
+
+	drain(uart) moves up to the free ring space from the UART; next_frame()
+	consumes ring bytes until a frame completes or `limit` bytes were used
+	(see `consumed`) and returns FRAME_NMEA, FRAME_UBX or 0. Only frames
+	whose checksum matched are returned: NMEA text via sentence() ("$...,"
+	without the "*CS" suffix), UBX as ubx_cls/ubx_id/ubx_len + ubx_buf.
+	"""
+	def __init__(self, rx_size: int = 512, chunk: int = 64):
+		self._ring = bytearray(rx_size)
+		self._size = rx_size
+		self._head = 0  # write index
+		self._tail = 0  # read index
+		self.pending = 0  # bytes in the ring
+		self._chunk = bytearray(chunk)
+		self._line = bytearray(NMEA_MAX_LEN)
+		self._n = 0
+		# 0 hunt, 1 NMEA body, 2/3 NMEA checksum digits,
+		# 10 UBX sync2, 11 class, 12 id, 13/14 length, 15 payload, 16/17 checksum
+		self._state = 0
+		self._xor = 0
+		self._cs = 0
+		self.ubx_buf = bytearray(UBX_MAX_PAYLOAD)
+		self.ubx_cls = 0
+		self.ubx_id = 0
+		self.ubx_len = 0
+		self._ck_a = 0
+		self._ck_b = 0
+		self.consumed = 0
+		self.sentences = 0
+		self.ubx_frames = 0
+		self.bad_checksum = 0
+		self.overruns = 0  # frames dropped for exceeding the buffers
+
+	def drain(self, uart) -> int:
+		"""Copy pending UART bytes into the ring; returns how many."""
+		try:
+			avail = uart.any()
+		except Exception:
+			return 0
+		ring = self._ring
+		chunk = self._chunk
+		size = self._size
+		moved = 0
+		while avail > 0 and self.pending < size:
+			k = min(avail, size - self.pending, len(chunk))
+			got = uart.readinto(chunk, k)
+			if not got:
+				break
+			h = self._head
+			for i in range(got):
+				ring[h] = chunk[i]
+				h += 1
+				if h == size:
+					h = 0
+			self._head = h
+			self.pending += got
+			avail -= got
+			moved += got
+		return moved
+
+	def feed(self, data) -> int:
+		"""Copy bytes into the ring (desktop/tests); returns how many fit."""
+		ring = self._ring
+		size = self._size
+		h = self._head
+		n = min(len(data), size - self.pending)
+		for i in range(n):
+			ring[h] = data[i]
+			h += 1
+			if h == size:
+				h = 0
+		self._head = h
+		self.pending += n
+		return n
+
+	def next_frame(self, limit: int = 256) -> int:
+		ring = self._ring
+		size = self._size
+		t = self._tail
+		used = 0
+		kind = 0
+		while used < limit and self.pending > 0:
+			b = ring[t]
+			t += 1
+			if t == size:
+				t = 0
+			self.pending -= 1
+			used += 1
+			kind = self._byte(b)
+			if kind:
+				break
+		self._tail = t
+		self.consumed = used
+		return kind
+
+	def sentence(self) -> str:
+		"""Text of the NMEA sentence last returned by next_frame()."""
+		return self._line[:self._n].decode()
+
+	def next_sentence(self, limit: int = 256) -> Optional[str]:
+		"""next_frame() for NMEA only: the sentence text, else None."""
+		if self.next_frame(limit) == FRAME_NMEA:
+			return self.sentence()
+		return None
+
+	def _byte(self, b: int) -> int:
+		st = self._state
+		if st >= 10:
+			return self._ubx_byte(st, b)
+		line = self._line
+		if b == 0x24:  # '$' always starts a new sentence
+			line[0] = b
+			self._n = 1
+			self._xor = 0
+			self._state = 1
+			return 0
+		if b == UBX_SYNC1:  # never valid inside NMEA text
+			if st:
+				self.bad_checksum += 1
+			self._state = 10
+			return 0
+		if st == 1:
+			if b == 0x2A:  # '*'
+				self._state = 2
+				self._cs = 0
+			elif b == 0x0D or b == 0x0A:
+				self._state = 0  # no checksum: reject
+				self.bad_checksum += 1
+			elif self._n >= NMEA_MAX_LEN:
+				self._state = 0
+				self.overruns += 1
+			else:
+				self._xor ^= b
+				line[self._n] = b
+				self._n += 1
+			return 0
+		if st >= 2:
+			v = _hexval(b)
+			if v < 0:
+				self._state = 0
+				self.bad_checksum += 1
+				return 0
+			self._cs = (self._cs << 4) | v
+			if st == 2:
+				self._state = 3
+				return 0
+			self._state = 0
+			if self._cs != self._xor:
+				self.bad_checksum += 1
+				return 0
+			self.sentences += 1
+			return FRAME_NMEA
+		return 0
+
+	def _ubx_byte(self, st: int, b: int) -> int:
+		if st == 10:
+			if b == UBX_SYNC2:
+				self._state = 11
+				self._ck_a = 0
+				self._ck_b = 0
+			elif b != UBX_SYNC1:
+				self._state = 0
+				if b == 0x24:
+					return self._byte(b)
+			return 0
+		if st <= 15:
+			a = (self._ck_a + b) & 0xFF
+			self._ck_a = a
+			self._ck_b = (self._ck_b + a) & 0xFF
+			if st == 11:
+				self.ubx_cls = b
+				self._state = 12
+			elif st == 12:
+				self.ubx_id = b
+				self._state = 13
+			elif st == 13:
+				self.ubx_len = b
+				self._state = 14
+			elif st == 14:
+				self.ubx_len |= b << 8
+				if self.ubx_len > UBX_MAX_PAYLOAD:
+					self.overruns += 1
+					self._state = 0
+				else:
+					self._n = 0
+					self._state = 15 if self.ubx_len else 16
+			else:
+				self.ubx_buf[self._n] = b
+				self._n += 1
+				if self._n == self.ubx_len:
+					self._state = 16
+			return 0
+		if st == 16:
+			if b != self._ck_a:
+				self.bad_checksum += 1
+				self._state = 0
+			else:
+				self._state = 17
+			return 0
+		self._state = 0
+		if b != self._ck_b:
+			self.bad_checksum += 1
+			return 0
+		self.ubx_frames += 1
+		return FRAME_UBX
+
+
 class NEO6M:
-	"""High-level helper for reading NMEA from UART and providing a combined fix.
+	"""High-level helper for reading NMEA/UBX from UART and providing a combined fix.
 
-	Call read_fix() to get a dict containing a merge of last-seen RMC/GGA fields.
+	Call read_fix() to get a dict containing a merge of last-seen RMC/GGA
+	fields, or of the UBX navigation solution once UBX frames arrive.
 	"""
-	def __init__(self, uart=None):
+	def __init__(self, uart=None, rx_size: int = 512):
 		self.uart = uart if uart is not None else get_uart()
 		self._last_rmc: Optional[Dict[str, Any]] = None
 		self._last_gga: Optional[Dict[str, Any]] = None
+		self.framer = GpsFramer(rx_size)
+		self.nav = UbxNav()
+		self.acks = 0
+		self.naks = 0
 
 	def _readline(self) -> Optional[str]:
 		u = self.uart
@@ -157,11 +543,33 @@ class NEO6M:
 		except Exception:
 			return None
 
-	def poll(self):
-		line = self._readline()
-		if not line:
+	def poll(self, budget: int = 256):
+		"""Drain the UART and decode every frame completed within `budget`
+		framed bytes. Returns the newest parsed NMEA message, the UbxNav
+		state if a UBX navigation frame came last, or None.
+		"""
+		u = self.uart
+		if not u:
 			return None
-		msg = parse_nmea_line(line)
+		if not hasattr(u, 'any'):
+			# Line-oriented stand-ins without any()/readinto()
+			return self._store(parse_nmea_line(self._readline()))
+		fr = self.framer
+		fr.drain(u)
+		last = None
+		while budget > 0 and fr.pending:
+			kind = fr.next_frame(budget)
+			budget -= fr.consumed
+			if kind == FRAME_NMEA:
+				msg = self._store(parse_nmea_line(fr.sentence()))
+				if msg is not None:
+					last = msg
+			elif kind == FRAME_UBX:
+				if self._store_ubx(fr):
+					last = self.nav
+		return last
+
+	def _store(self, msg):
 		if not msg:
 			return None
 		if msg.get('type') == 'RMC':
@@ -170,8 +578,73 @@ class NEO6M:
 			self._last_gga = msg
 		return msg
 
+	def _store_ubx(self, fr) -> bool:
+		if fr.ubx_cls == CLS_ACK:
+			if fr.ubx_id == ACK_ACK:
+				self.acks += 1
+			elif fr.ubx_id == ACK_NAK:
+				self.naks += 1
+			return False
+		return parse_ubx(fr.ubx_cls, fr.ubx_id, fr.ubx_buf, fr.ubx_len, self.nav)
+
+	# UBX configuration
+	def send_ubx(self, cls: int, mid: int, payload=b'') -> bool:
+		u = self.uart
+		if not u:
+			return False
+		try:
+			u.write(ubx_frame(cls, mid, payload))
+			return True
+		except Exception:
+			return False
+
+	def set_msg_rate(self, cls: int, mid: int, rate: int) -> bool:
+		"""CFG-MSG: output message cls/mid every `rate` navigation solutions (0 = off)."""
+		return self.send_ubx(CLS_CFG, CFG_MSG, bytes((cls, mid, rate)))
+
+	def set_nav_rate(self, rate_hz: float) -> bool:
+		"""CFG-RATE: measurement period 1000/rate_hz ms, one solution per
+		measurement, aligned to GPS time. The NEO-6M tops out at 5 Hz."""
+		return self.send_ubx(CLS_CFG, CFG_RATE, pack('<HHH', int(1000 / rate_hz), 1, 1))
+
+	def configure_ubx(self, rate_hz: float = 5, nav_msgs=UBX_NAV_NEO6, disable_nmea: bool = True) -> bool:
+		"""Switch the receiver to UBX navigation output at rate_hz.
+
+		nav_msgs: UBX_NAV_NEO6 (POSLLH + VELNED + SOL, u-blox 6) or
+		UBX_NAV_PVT (one NAV-PVT frame, u-blox 7 and later). Not persisted
+		to the receiver's flash: call again after a power cycle. ACK/NAK
+		replies are counted by poll() in acks/naks.
+		"""
+		ok = True
+		if disable_nmea:
+			for mid in _NMEA_STD_IDS:
+				ok = self.set_msg_rate(0xF0, mid, 0) and ok
+		for mid in nav_msgs:
+			ok = self.set_msg_rate(CLS_NAV, mid, 1) and ok
+		return self.set_nav_rate(rate_hz) and ok
+
 	def read_fix(self) -> Dict[str, Any]:
-		"""Return a combined fix dict from the most recent RMC/GGA data."""
+		"""Return a combined fix dict from the most recent RMC/GGA data, or
+		from the UBX navigation solution when one has been received."""
+		nav = self.nav
+		if nav.have_pos:
+			return {
+				'type': 'UBX',
+				'has_fix': nav.fix_ok and nav.fix_type >= 2,
+				'fix_type': nav.fix_type,
+				'lat': nav.lat_e7 * 1e-7,
+				'lon': nav.lon_e7 * 1e-7,
+				'lat_e7': nav.lat_e7,
+				'lon_e7': nav.lon_e7,
+				'alt_m': nav.hmsl_mm / 1000.0,
+				'alt_mm': nav.hmsl_mm,
+				'sats': nav.num_sv,
+				'speed_mps': nav.gspeed_mm_s / 1000.0,
+				'speed_mm_s': nav.gspeed_mm_s,
+				'course_deg': nav.heading_e5 * 1e-5,
+				'hdop': None,
+				'pdop': nav.pdop_e2 / 100.0,
+			}
 		fix: Dict[str, Any] = {}
 		if self._last_rmc:
 			fix.update(self._last_rmc)
@@ -4,8 +4,14 @@ except Exception:
     def const(x):
         return x
 
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
 # Minimal ICM-20948 driver (I2C) for MicroPython/CPython
 # Exposes: acceleration (g), gyro (dps), temperature (C), mag (uT -> None for now)
+# and read_all(): accel+gyro+temp in one 14-byte burst (0x2D..0x3A, bank 0)
 
 ICM20948_ADDR = const(0x68)
 
@@ -18,6 +24,44 @@ REG_PWR_MGMT_1 = const(0x06)  # Bank 0
 REG_ACCEL_XOUT_H = const(0x2D)
 REG_GYRO_XOUT_H = const(0x33)
 REG_TEMP_OUT_H = const(0x39)
+BURST_LEN = const(14)  # ACCEL_XOUT_H .. TEMP_OUT_L
+
+# Interrupts (Bank 0)
+REG_INT_PIN_CFG = const(0x0F)
+REG_INT_ENABLE_1 = const(0x11)
+REG_INT_STATUS_1 = const(0x1A)
+INT_PIN_CFG_ACTL = const(0x80)         # INT1 active low
+INT_PIN_CFG_ANYRD_CLEAR = const(0x10)  # any data read clears the status
+INT_RAW_DATA_0_RDY_EN = const(0x01)
+
+# FIFO (Bank 0)
+REG_USER_CTRL = const(0x03)
+REG_FIFO_EN_2 = const(0x67)
+REG_FIFO_RST = const(0x68)
+REG_FIFO_MODE = const(0x69)
+REG_FIFO_COUNTH = const(0x70)
+REG_FIFO_R_W = const(0x72)
+USER_CTRL_FIFO_EN = const(0x40)
+FIFO_EN_2_ACCEL_GYRO = const(0x1E)  # ACCEL | GYRO_Z | GYRO_Y | GYRO_X
+FIFO_SIZE = const(512)
+FIFO_FRAME = const(12)  # accel[6] gyro[6] per sample
+
+# Sample rate / filter config (Bank 2)
+REG_GYRO_SMPLRT_DIV = const(0x00)
+REG_GYRO_CONFIG_1 = const(0x01)
+REG_ACCEL_SMPLRT_DIV_1 = const(0x10)
+REG_ACCEL_SMPLRT_DIV_2 = const(0x11)
+REG_ACCEL_CONFIG = const(0x14)
+_FS_BITS_ACC = {2: 0, 4: 1, 8: 2, 16: 3}
+PWR_MGMT_1_DEVICE_RESET = const(0x80)
+
+# Configuration registers mirrored in the driver, keyed (bank << 8) | reg
+# (see config()/sync()/verify())
+SHADOWED_REGS = (REG_INT_PIN_CFG, REG_INT_ENABLE_1, REG_FIFO_EN_2, REG_FIFO_MODE,
+                 0x200 | REG_GYRO_SMPLRT_DIV, 0x200 | REG_GYRO_CONFIG_1,
+                 0x200 | REG_ACCEL_SMPLRT_DIV_1, 0x200 | REG_ACCEL_SMPLRT_DIV_2,
+                 0x200 | REG_ACCEL_CONFIG)
+_FS_BITS_GYRO = {250: 0, 500: 1, 1000: 2, 2000: 3}
 
 WHO_AM_I_VAL = const(0xEA)  # ICM-20948 expected value
 
@@ -43,9 +87,33 @@ class ICM20948:
         self.addr = addr
         self._accel_scale = _ACC_FS_SENS.get(accel_fs, 16384.0)
         self._gyro_scale = _GYRO_FS_SENS.get(gyro_fs, 131.0)
+        self._burst = bytearray(BURST_LEN)
+        self._rd_into = getattr(i2c, 'readfrom_mem_into', None)
+        self.data = array('f', [0.0] * 7)  # ax, ay, az, gx, gy, gz, temp_c
+        # Calibration folded into the decode: raw-count offsets and per-axis
+        # multipliers (scale / sensitivity) for ax, ay, az, gx, gy, gz
+        self._cal_off = [0] * 6
+        self._cal_k = [0.0] * 6
+        self.set_calibration()
+        self._accel_fs = accel_fs
+        self._gyro_fs = gyro_fs
+        self._cnt = bytearray(2)
+        self._w1 = bytearray(1)
+        self._buf6 = bytearray(6)
+        self._buf2 = bytearray(2)
+        self._fifo_buf = None
+        self._fifo_views = None
+        self.fifo_data = None
+        self.fifo_overflows = 0
+        self._b1 = bytearray(1)
+        # Register shadow: key -> last value written/read. A write of the
+        # value already there is skipped (no bank switch either); config()
+        # reads cost no bus access. _cur_bank shadows REG_BANK_SEL
+        self._shadow = {}
+        self._cur_bank = None
 
         # Select bank 0 and wake device (basic init)
-        self._write(REG_BANK_SEL, 0x00)
+        self._bank(0)
         # Auto clock, clear sleep (typical bring-up value 0x01)
         try:
             self._write(REG_PWR_MGMT_1, 0x01)
@@ -66,38 +134,253 @@ class ICM20948:
     def _read(self, reg, n=1):
         return self.i2c.readfrom_mem(self.addr, reg, n)
 
-    def _write(self, reg, val):
+    def _write(self, reg, val, bank=0, force=False):
+        key = (bank << 8) | reg
         if not isinstance(val, (bytes, bytearray)):
-            val = bytes([val & 0xFF])
+            val &= 0xFF
+            if key in SHADOWED_REGS:
+                if not force and self._shadow.get(key) == val:
+                    return
+                self._bank(bank)
+                self.i2c.writeto_mem(self.addr, reg, self._w1b(val))
+                self._shadow[key] = val
+                return
+            val = self._w1b(val)
+        self._bank(bank)
         self.i2c.writeto_mem(self.addr, reg, val)
+        if key == REG_PWR_MGMT_1 and val[0] & PWR_MGMT_1_DEVICE_RESET:
+            # Reset restores the defaults and selects bank 0
+            self._shadow.clear()
+            self._cur_bank = 0
+
+    def _w1b(self, v):
+        w = self._w1
+        w[0] = v
+        return w
 
     def _rx16(self, reg):
-        d = self._read(reg, 2)
+        d = self._buf2
+        self._read_into(reg, d)
         v = (d[0] << 8) | d[1]
         return v - 65536 if v & 0x8000 else v
 
+    def _read_into(self, reg, buf):
+        if self._rd_into is not None:
+            self._rd_into(self.addr, reg, buf)
+        else:
+            buf[:] = self.i2c.readfrom_mem(self.addr, reg, len(buf))
+
+    def _bank(self, n):
+        if n != self._cur_bank:
+            self.i2c.writeto_mem(self.addr, REG_BANK_SEL, self._w1b((n & 0x03) << 4))
+            self._cur_bank = n
+
+    # Register shadow
+    def config(self, reg, bank=0):
+        """Value of a shadowed config register (bus read only if unknown)."""
+        key = (bank << 8) | reg
+        v = self._shadow.get(key)
+        if v is None:
+            self._bank(bank)
+            self._read_into(reg, self._b1)
+            self._bank(0)
+            v = self._shadow[key] = self._b1[0]
+        return v
+
+    def sync(self):
+        """Reload the shadow from the chip."""
+        b = self._b1
+        for key in SHADOWED_REGS:
+            self._bank(key >> 8)
+            self._read_into(key & 0xFF, b)
+            self._shadow[key] = b[0]
+        self._bank(0)
+
+    def verify(self, repair=False):
+        """Return the shadowed keys whose chip value differs from the shadow
+        (empty when in sync); repair=True rewrites them."""
+        b = self._b1
+        bad = []
+        for key, v in self._shadow.items():
+            self._bank(key >> 8)
+            self._read_into(key & 0xFF, b)
+            if b[0] != v:
+                bad.append(key)
+                if repair:
+                    self._write(key & 0xFF, v, bank=key >> 8, force=True)
+        self._bank(0)
+        return bad
+
+    def _s16(self, i):
+        b = self._burst
+        v = (b[i] << 8) | b[i + 1]
+        return v - 65536 if v & 0x8000 else v
+
     # Public API
+    def read_all(self, out=None):
+        """Burst-read accel, gyro and temp in one transaction (bank 0).
+
+        Fills out (default self.data) with ax, ay, az (g), gx, gy, gz (dps),
+        temp_c and returns it. Layout on the bus: accel[6] gyro[6] temp[2].
+        """
+        self._read_into(REG_ACCEL_XOUT_H, self._burst)
+        if out is None:
+            out = self.data
+        s16 = self._s16
+        o = self._cal_off
+        k = self._cal_k
+        out[0] = (s16(0) - o[0]) * k[0]
+        out[1] = (s16(2) - o[1]) * k[1]
+        out[2] = (s16(4) - o[2]) * k[2]
+        out[3] = (s16(6) - o[3]) * k[3]
+        out[4] = (s16(8) - o[4]) * k[4]
+        out[5] = (s16(10) - o[5]) * k[5]
+        out[6] = (s16(12) / 333.87) + 21.0
+        return out
+
+    def set_calibration(self, gyro_bias_dps=None, accel_offset_g=None, accel_scale=None):
+        """Apply IMU calibration (sensors/imu_cal.py) to every decode path.
+
+        Offsets are converted once to raw counts and the scales folded into
+        the per-axis multipliers, so read_all()/read_fifo() do the same work
+        as without calibration. No arguments clears it.
+        """
+        ka = self._accel_scale
+        kg = self._gyro_scale
+        o = self._cal_off
+        k = self._cal_k
+        for i in range(3):
+            o[i] = int(round(accel_offset_g[i] * ka)) if accel_offset_g else 0
+            k[i] = (accel_scale[i] if accel_scale else 1.0) / ka
+            o[i + 3] = int(round(gyro_bias_dps[i] * kg)) if gyro_bias_dps else 0
+            k[i + 3] = 1.0 / kg
+
+    def set_sample_rate(self, rate_hz):
+        """Program the bank-2 sample rate dividers (gyro 1.1 kHz / (1 + div),
+        accel 1.125 kHz / (1 + div)) with the DLPF on, as the dividers
+        require. Returns the actual gyro rate."""
+        gdiv = max(0, min(255, int(1100.0 / rate_hz + 0.5) - 1))
+        adiv = max(0, min(4095, int(1125.0 / rate_hz + 0.5) - 1))
+        self._write(REG_GYRO_SMPLRT_DIV, gdiv, bank=2)
+        # DLPFCFG=1, FS_SEL, FCHOICE=1
+        self._write(REG_GYRO_CONFIG_1, (1 << 3) | (_FS_BITS_GYRO.get(self._gyro_fs, 0) << 1) | 1, bank=2)
+        self._write(REG_ACCEL_SMPLRT_DIV_1, adiv >> 8, bank=2)
+        self._write(REG_ACCEL_SMPLRT_DIV_2, adiv & 0xFF, bank=2)
+        self._write(REG_ACCEL_CONFIG, (1 << 3) | (_FS_BITS_ACC.get(self._accel_fs, 0) << 1) | 1, bank=2)
+        self._bank(0)
+        return 1100.0 / (1 + gdiv)
+
+    # Data-ready interrupt
+    def enable_data_ready_int(self, rate_hz=None, active_low=False):
+        """Pulse INT1 on every new sample (50 us, push-pull); reading the data
+        registers clears the status. Optionally sets the sample rate."""
+        rate = self.set_sample_rate(rate_hz) if rate_hz else None
+        cfg = INT_PIN_CFG_ANYRD_CLEAR
+        if active_low:
+            cfg |= INT_PIN_CFG_ACTL
+        self._write(REG_INT_PIN_CFG, cfg)
+        self._write(REG_INT_ENABLE_1, INT_RAW_DATA_0_RDY_EN)
+        return rate
+
+    def disable_data_ready_int(self):
+        self._write(REG_INT_ENABLE_1, 0x00)
+        self._write(REG_INT_PIN_CFG, 0x00)
+
+    # FIFO
+    def enable_fifo(self, rate_hz=1000, max_samples=32):
+        """Sample accel+gyro into the hardware FIFO at ~rate_hz (see
+        set_sample_rate()). max_samples sizes the preallocated read buffer
+        (>= rate_hz / loop_hz). Returns the actual gyro sample rate.
+        """
+        rate = self.set_sample_rate(rate_hz)
+        n = max(1, min(int(max_samples), FIFO_SIZE // FIFO_FRAME))
+        self._fifo_buf = bytearray(n * FIFO_FRAME)
+        # One view per frame count, so read_fifo() slices nothing per call
+        mv = memoryview(self._fifo_buf)
+        self._fifo_views = tuple(mv[:k * FIFO_FRAME] for k in range(n + 1))
+        self.fifo_data = array('f', [0.0] * (n * 6))
+        self._write(REG_FIFO_MODE, 0x00)  # stream
+        self._write(REG_FIFO_EN_2, FIFO_EN_2_ACCEL_GYRO)
+        self._write(REG_USER_CTRL, USER_CTRL_FIFO_EN)
+        self.reset_fifo()
+        return rate
+
+    def disable_fifo(self):
+        self._write(REG_FIFO_EN_2, 0x00)
+        self._write(REG_USER_CTRL, 0x00)
+        self._fifo_buf = None
+        self._fifo_views = None
+
+    def reset_fifo(self):
+        self._write(REG_FIFO_RST, 0x1F)
+        self._write(REG_FIFO_RST, 0x00)
+
+    def fifo_count(self):
+        """Bytes waiting in the FIFO."""
+        self._read_into(REG_FIFO_COUNTH, self._cnt)
+        return ((self._cnt[0] & 0x1F) << 8) | self._cnt[1]
+
+    def read_fifo(self):
+        """Drain whole samples from the FIFO into fifo_data.
+
+        fifo_data holds ax, ay, az (g), gx, gy, gz (dps) per sample, oldest
+        first; returns the number of samples. If the FIFO overflowed (the
+        count reads FIFO_SIZE, which whole frames never reach), it is reset
+        (fifo_overflows += 1) and 0 is returned. At most max_samples
+        are read per call; the rest stay queued for the next call.
+        """
+        count = self.fifo_count()
+        if count >= FIFO_SIZE:
+            # Only a wrap fills the last bytes (42 whole frames are 504):
+            # the oldest frame was overwritten and alignment is lost
+            self.fifo_overflows += 1
+            self.reset_fifo()
+            return 0
+        n = min(count // FIFO_FRAME, len(self._fifo_buf) // FIFO_FRAME)
+        if n == 0:
+            return 0
+        self._read_into(REG_FIFO_R_W, self._fifo_views[n])
+        b = self._fifo_buf
+        out = self.fifo_data
+        o = self._cal_off
+        k = self._cal_k
+        j = 0
+        for i in range(0, n * FIFO_FRAME, 2):
+            v = (b[i] << 8) | b[i + 1]
+            if v & 0x8000:
+                v -= 65536
+            a = (i % FIFO_FRAME) >> 1
+            out[j] = (v - o[a]) * k[a]
+            j += 1
+        return n
+
     @property
     def acceleration(self):
-        d = self._read(REG_ACCEL_XOUT_H, 6)
+        d = self._buf6
+        self._read_into(REG_ACCEL_XOUT_H, d)
         ax = (d[0] << 8) | d[1]
         ay = (d[2] << 8) | d[3]
         az = (d[4] << 8) | d[5]
         ax = ax - 65536 if ax & 0x8000 else ax
         ay = ay - 65536 if ay & 0x8000 else ay
         az = az - 65536 if az & 0x8000 else az
-        return (ax / self._accel_scale, ay / self._accel_scale, az / self._accel_scale)
+        o = self._cal_off
+        k = self._cal_k
+        return ((ax - o[0]) * k[0], (ay - o[1]) * k[1], (az - o[2]) * k[2])
 
     @property
     def gyro(self):
-        d = self._read(REG_GYRO_XOUT_H, 6)
+        d = self._buf6
+        self._read_into(REG_GYRO_XOUT_H, d)
         gx = (d[0] << 8) | d[1]
         gy = (d[2] << 8) | d[3]
         gz = (d[4] << 8) | d[5]
         gx = gx - 65536 if gx & 0x8000 else gx
         gy = gy - 65536 if gy & 0x8000 else gy
         gz = gz - 65536 if gz & 0x8000 else gz
-        return (gx / self._gyro_scale, gy / self._gyro_scale, gz / self._gyro_scale)
+        o = self._cal_off
+        k = self._cal_k
+        return ((gx - o[3]) * k[3], (gy - o[4]) * k[4], (gz - o[5]) * k[5])
 
     @property
     def temperature(self):
@@ -1,5 +1,13 @@
-import machine
-from machine import I2C, Pin
+try:
+    from machine import I2C, Pin
+except ImportError:
+    I2C = None
+    Pin = None
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
 import time
  
 MPU_ADDR    = const(0X68)
@@ -77,15 +85,21 @@ MPU_DEVICE_ID_REG       = 0x75
 MPU_ADDR_ADDR           = 0x68
  
 class MPU6050(object):
-    def __init__(self, bus, sclpin, sdapin):
-        self.i2c = I2C(id=bus, scl=Pin(sclpin), sda=Pin(sdapin), freq=400000)
+    def __init__(self, bus, sclpin, sdapin, i2c=None):
+        # Pass an existing bus as i2c= to share it (bus/pins are then unused)
+        self.i2c = i2c if i2c is not None else I2C(id=bus, scl=Pin(sclpin), sda=Pin(sdapin), freq=400000)
+        # Preallocated transfer buffers (no per-read allocation)
+        self._wbuf = bytearray(1)
+        self._rbuf = bytearray(1)
+        self._buf6 = bytearray(6)
     
     def Write_Mpu6050_REG(self, reg, dat):
-        buf = bytearray(1)
+        buf = self._wbuf
         buf[0] = dat
         self.i2c.writeto_mem(MPU_ADDR, reg, buf)
     def Read_Mpu6050_REG(self, reg):
-        t = self.i2c.readfrom_mem(MPU_ADDR, reg, 1)[0]
+        self.i2c.readfrom_mem_into(MPU_ADDR, reg, self._rbuf)
+        t = self._rbuf[0]
         return  (t>>4)*10 + (t%16)
     
     def Read_Mpu6050_Len(self,reg,len,buffer):
@@ -147,7 +161,7 @@ class MPU6050(object):
     
     #Get raw data
     def MPU_Get_Gyroscope(self):
-        buf = bytearray(6)
+        buf = self._buf6
         res = self.Read_Mpu6050_Len(MPU_GYRO_XOUTH_REG, 6, buf)
         gx = (buf[0]<<8) | buf[1]
         gy = (buf[2]<<8) | buf[3]
@@ -161,7 +175,7 @@ class MPU6050(object):
         return gx, gy, gz
     
     def MPU_Get_Accelerometer(self):
-        buf = bytearray(6)
+        buf = self._buf6
         res = self.Read_Mpu6050_Len(MPU_ACCEL_XOUTH_REG, 6, buf)
         ax = (buf[0]<<8) | buf[1]
         ay = (buf[2]<<8) | buf[3]
@@ -1,7 +1,17 @@
-from micropython import const
+try:
+    from micropython import const
+except Exception:
+    def const(x):
+        return x
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
 
 # Minimal reusable MPU9250 I2C driver for MicroPython with AK8963 mag via I2C bypass
 # Exposes properties: acceleration (g), gyro (dps), temperature (C), mag (uT)
+# and read_all(): accel+temp+gyro in one 14-byte burst (0x3B..0x48)
 
 MPU9250_ADDR = const(0x68)
 
@@ -13,9 +23,31 @@ REG_GYRO_CONFIG = const(0x1B)
 REG_ACCEL_CONFIG = const(0x1C)
 REG_ACCEL_CONFIG2 = const(0x1D)
 REG_INT_PIN_CFG = const(0x37)
+REG_INT_ENABLE = const(0x38)
+REG_INT_STATUS = const(0x3A)
 REG_ACCEL_XOUT_H = const(0x3B)
 REG_TEMP_OUT_H = const(0x41)
 REG_GYRO_XOUT_H = const(0x43)
+BURST_LEN = const(14)  # ACCEL_XOUT_H .. GYRO_ZOUT_L
+REG_FIFO_EN = const(0x23)
+REG_USER_CTRL = const(0x6A)
+REG_FIFO_COUNTH = const(0x72)
+REG_FIFO_R_W = const(0x74)
+
+FIFO_EN_ACCEL_GYRO = const(0x78)  # GYRO_X/Y/Z_OUT | ACCEL
+USER_CTRL_FIFO_EN = const(0x40)
+USER_CTRL_FIFO_RST = const(0x04)
+INT_PIN_CFG_BYPASS = const(0x02)
+INT_PIN_CFG_ACTL = const(0x80)       # INT active low
+INT_PIN_CFG_ANYRD_CLEAR = const(0x10)  # any data read clears the status
+INT_RAW_RDY_EN = const(0x01)
+FIFO_SIZE = const(512)
+FIFO_FRAME = const(12)  # accel[6] gyro[6] per sample
+PWR_MGMT_1_H_RESET = const(0x80)
+
+# Configuration registers mirrored in the driver (see config()/sync()/verify())
+SHADOWED_REGS = (REG_SMPLRT_DIV, REG_CONFIG, REG_GYRO_CONFIG, REG_ACCEL_CONFIG,
+                 REG_ACCEL_CONFIG2, REG_FIFO_EN, REG_INT_PIN_CFG, REG_INT_ENABLE)
 
 # AK8963 (magnetometer) registers via bypass
 AK8963_ADDR = const(0x0C)
@@ -48,6 +80,30 @@ class MPU9250:
         self.addr = addr
         self._accel_scale = _ACC_FS_SENS.get(accel_fs, 16384.0)
         self._gyro_scale = _GYRO_FS_SENS.get(gyro_fs, 131.0)
+        self._burst = bytearray(BURST_LEN)
+        self._rd_into = getattr(i2c, 'readfrom_mem_into', None)
+        self.data = array('f', [0.0] * 7)  # ax, ay, az, gx, gy, gz, temp_c
+        # Calibration folded into the decode: raw-count offsets and per-axis
+        # multipliers (scale / sensitivity) for ax, ay, az, gx, gy, gz
+        self._cal_off = [0] * 6
+        self._cal_k = [0.0] * 6
+        self.set_calibration()
+        self._dlpf = dlpf
+        self._cnt = bytearray(2)
+        self._w1 = bytearray(1)
+        self._buf6 = bytearray(6)
+        self._buf2 = bytearray(2)
+        self._st1 = bytearray(1)
+        self._b1 = bytearray(1)
+        self._mag_buf = bytearray(7)
+        self.mag_data = array('f', [0.0] * 3)
+        self._fifo_buf = None
+        self._fifo_views = None
+        self.fifo_data = None
+        self.fifo_overflows = 0
+        # Register shadow: reg -> last value written/read. A write of the
+        # value already there is skipped; config() reads cost no bus access
+        self._shadow = {}
         # Wake device
         self._write(REG_PWR_MGMT_1, 0x00)  # set clock to internal, wake up
         self._write(REG_SMPLRT_DIV, 0x00)  # sample rate divider
@@ -60,64 +116,262 @@ class MPU9250:
         self._write(REG_ACCEL_CONFIG, acc_bits)
         self._write(REG_ACCEL_CONFIG2, 0x03 if dlpf else 0x00)
         # Enable I2C bypass to access AK8963 directly
-        self._write(REG_INT_PIN_CFG, 0x02)  # BYPASS_EN=1
-        # Setup AK8963 16-bit continuous mode
-        self._ak8963_setup(mag_hz)
+        self._write(REG_INT_PIN_CFG, INT_PIN_CFG_BYPASS)  # BYPASS_EN=1
+        # Setup AK8963 16-bit continuous mode. An MPU-6500 (GY-91 clones)
+        # has no AK8963 behind the bypass: run without magnetometer
+        self.has_mag = True
+        try:
+            self._ak8963_setup(mag_hz)
+        except OSError:
+            self.has_mag = False
 
     # Low-level I2C helpers
     def _read(self, reg, n=1):
         return self.i2c.readfrom_mem(self.addr, reg, n)
 
-    def _write(self, reg, val):
+    def _write(self, reg, val, force=False):
         if not isinstance(val, (bytes, bytearray)):
-            val = bytes([val & 0xFF])
+            val &= 0xFF
+            if reg in SHADOWED_REGS:
+                if not force and self._shadow.get(reg) == val:
+                    return
+                self.i2c.writeto_mem(self.addr, reg, self._w1b(val))
+                self._shadow[reg] = val
+                return
+            val = self._w1b(val)
         self.i2c.writeto_mem(self.addr, reg, val)
+        if reg == REG_PWR_MGMT_1 and val[0] & PWR_MGMT_1_H_RESET:
+            self._shadow.clear()  # reset restores the defaults
+
+    def _w1b(self, v):
+        w = self._w1
+        w[0] = v
+        return w
+
+    # Register shadow
+    def config(self, reg):
+        """Value of a shadowed config register (bus read only if unknown)."""
+        v = self._shadow.get(reg)
+        if v is None:
+            self._read_into(reg, self._b1)
+            v = self._shadow[reg] = self._b1[0]
+        return v
+
+    def sync(self):
+        """Reload the shadow from the chip."""
+        b = self._b1
+        for reg in SHADOWED_REGS:
+            self._read_into(reg, b)
+            self._shadow[reg] = b[0]
+
+    def verify(self, repair=False):
+        """Return the shadowed registers whose chip value differs from the
+        shadow (empty when in sync); repair=True rewrites them."""
+        b = self._b1
+        bad = []
+        for reg, v in self._shadow.items():
+            self._read_into(reg, b)
+            if b[0] != v:
+                bad.append(reg)
+                if repair:
+                    self._write(reg, v, force=True)
+        return bad
 
     def _rx16(self, reg):
-        d = self._read(reg, 2)
+        d = self._buf2
+        self._read_into(reg, d)
         v = (d[0] << 8) | d[1]
         return v - 65536 if v & 0x8000 else v
 
+    def _read_into(self, reg, buf):
+        if self._rd_into is not None:
+            self._rd_into(self.addr, reg, buf)
+        else:
+            buf[:] = self.i2c.readfrom_mem(self.addr, reg, len(buf))
+
+    def _s16(self, i):
+        b = self._burst
+        v = (b[i] << 8) | b[i + 1]
+        return v - 65536 if v & 0x8000 else v
+
     # Public API
+    def read_all(self, out=None):
+        """Burst-read accel, temp and gyro in one transaction.
+
+        Fills out (default self.data) with ax, ay, az (g), gx, gy, gz (dps),
+        temp_c and returns it. Layout on the bus: accel[6] temp[2] gyro[6].
+        """
+        self._read_into(REG_ACCEL_XOUT_H, self._burst)
+        if out is None:
+            out = self.data
+        s16 = self._s16
+        o = self._cal_off
+        k = self._cal_k
+        out[0] = (s16(0) - o[0]) * k[0]
+        out[1] = (s16(2) - o[1]) * k[1]
+        out[2] = (s16(4) - o[2]) * k[2]
+        out[6] = (s16(6) / 333.87) + 21.0
+        out[3] = (s16(8) - o[3]) * k[3]
+        out[4] = (s16(10) - o[4]) * k[4]
+        out[5] = (s16(12) - o[5]) * k[5]
+        return out
+
+    def set_calibration(self, gyro_bias_dps=None, accel_offset_g=None, accel_scale=None):
+        """Apply IMU calibration (sensors/imu_cal.py) to every decode path.
+
+        Offsets are converted once to raw counts and the scales folded into
+        the per-axis multipliers, so read_all()/read_fifo() do the same work
+        as without calibration. No arguments clears it.
+        """
+        ka = self._accel_scale
+        kg = self._gyro_scale
+        o = self._cal_off
+        k = self._cal_k
+        for i in range(3):
+            o[i] = int(round(accel_offset_g[i] * ka)) if accel_offset_g else 0
+            k[i] = (accel_scale[i] if accel_scale else 1.0) / ka
+            o[i + 3] = int(round(gyro_bias_dps[i] * kg)) if gyro_bias_dps else 0
+            k[i + 3] = 1.0 / kg
+
+    def set_sample_rate(self, rate_hz):
+        """Program SMPLRT_DIV for ~rate_hz output data rate; returns the
+        actual rate (1 kHz base with the DLPF on, 8 kHz without)."""
+        base = 1000 if self._dlpf else 8000
+        div = max(0, min(255, int(base / rate_hz + 0.5) - 1))
+        self._write(REG_SMPLRT_DIV, div)
+        return base / (1 + div)
+
+    # Data-ready interrupt
+    def enable_data_ready_int(self, rate_hz=None, active_low=False):
+        """Pulse INT on every new sample (50 us, push-pull); reading the data
+        registers clears the status. Optionally sets the sample rate."""
+        rate = self.set_sample_rate(rate_hz) if rate_hz else None
+        cfg = INT_PIN_CFG_BYPASS | INT_PIN_CFG_ANYRD_CLEAR
+        if active_low:
+            cfg |= INT_PIN_CFG_ACTL
+        self._write(REG_INT_PIN_CFG, cfg)
+        self._write(REG_INT_ENABLE, INT_RAW_RDY_EN)
+        return rate
+
+    def disable_data_ready_int(self):
+        self._write(REG_INT_ENABLE, 0x00)
+        self._write(REG_INT_PIN_CFG, INT_PIN_CFG_BYPASS)
+
+    # FIFO
+    def enable_fifo(self, rate_hz=1000, max_samples=32):
+        """Sample accel+gyro into the hardware FIFO at ~rate_hz.
+
+        read_fifo() then returns every sample since the previous call.
+        max_samples sizes the preallocated read buffer (>= rate_hz / loop_hz).
+        Returns the actual sample rate.
+        """
+        rate = self.set_sample_rate(rate_hz)
+        n = max(1, min(int(max_samples), FIFO_SIZE // FIFO_FRAME))
+        self._fifo_buf = bytearray(n * FIFO_FRAME)
+        # One view per frame count, so read_fifo() slices nothing per call
+        mv = memoryview(self._fifo_buf)
+        self._fifo_views = tuple(mv[:k * FIFO_FRAME] for k in range(n + 1))
+        self.fifo_data = array('f', [0.0] * (n * 6))
+        self._write(REG_USER_CTRL, 0x00)
+        self._write(REG_FIFO_EN, FIFO_EN_ACCEL_GYRO)
+        self.reset_fifo()
+        return rate
+
+    def disable_fifo(self):
+        self._write(REG_FIFO_EN, 0x00)
+        self._write(REG_USER_CTRL, 0x00)
+        self._write(REG_SMPLRT_DIV, 0x00)
+        self._fifo_buf = None
+        self._fifo_views = None
+
+    def reset_fifo(self):
+        self._write(REG_USER_CTRL, USER_CTRL_FIFO_RST)
+        self._write(REG_USER_CTRL, USER_CTRL_FIFO_EN)
+
+    def fifo_count(self):
+        """Bytes waiting in the FIFO."""
+        self._read_into(REG_FIFO_COUNTH, self._cnt)
+        return ((self._cnt[0] & 0x1F) << 8) | self._cnt[1]
+
+    def read_fifo(self):
+        """Drain whole samples from the FIFO into fifo_data.
+
+        fifo_data holds ax, ay, az (g), gx, gy, gz (dps) per sample, oldest
+        first; returns the number of samples. If the FIFO overflowed (the
+        count reads FIFO_SIZE, which whole frames never reach), it is reset
+        (fifo_overflows += 1) and 0 is returned. At most max_samples
+        are read per call; the rest stay queued for the next call.
+        """
+        count = self.fifo_count()
+        if count >= FIFO_SIZE:
+            # Only a wrap fills the last bytes (42 whole frames are 504):
+            # the oldest frame was overwritten and alignment is lost
+            self.fifo_overflows += 1
+            self.reset_fifo()
+            return 0
+        n = min(count // FIFO_FRAME, len(self._fifo_buf) // FIFO_FRAME)
+        if n == 0:
+            return 0
+        self._read_into(REG_FIFO_R_W, self._fifo_views[n])
+        b = self._fifo_buf
+        out = self.fifo_data
+        o = self._cal_off
+        k = self._cal_k
+        j = 0
+        for i in range(0, n * FIFO_FRAME, 2):
+            v = (b[i] << 8) | b[i + 1]
+            if v & 0x8000:
+                v -= 65536
+            a = (i % FIFO_FRAME) >> 1
+            out[j] = (v - o[a]) * k[a]
+            j += 1
+        return n
+
     @property
     def acceleration(self):
-        d = self._read(REG_ACCEL_XOUT_H, 6)
+        d = self._buf6
+        self._read_into(REG_ACCEL_XOUT_H, d)
         ax = (d[0] << 8) | d[1]
         ay = (d[2] << 8) | d[3]
         az = (d[4] << 8) | d[5]
         ax = ax - 65536 if ax & 0x8000 else ax
         ay = ay - 65536 if ay & 0x8000 else ay
         az = az - 65536 if az & 0x8000 else az
-        return (ax / self._accel_scale, ay / self._accel_scale, az / self._accel_scale)
+        o = self._cal_off
+        k = self._cal_k
+        return ((ax - o[0]) * k[0], (ay - o[1]) * k[1], (az - o[2]) * k[2])
 
     @property
     def gyro(self):
-        d = self._read(REG_GYRO_XOUT_H, 6)
+        d = self._buf6
+        self._read_into(REG_GYRO_XOUT_H, d)
         gx = (d[0] << 8) | d[1]
         gy = (d[2] << 8) | d[3]
         gz = (d[4] << 8) | d[5]
         gx = gx - 65536 if gx & 0x8000 else gx
         gy = gy - 65536 if gy & 0x8000 else gy
         gz = gz - 65536 if gz & 0x8000 else gz
-        return (gx / self._gyro_scale, gy / self._gyro_scale, gz / self._gyro_scale)
+        o = self._cal_off
+        k = self._cal_k
+        return ((gx - o[3]) * k[3], (gy - o[4]) * k[4], (gz - o[5]) * k[5])
 
     @property
     def temperature(self):
         t = self._rx16(REG_TEMP_OUT_H)
         return (t / 333.87) + 21.0
 
-    @property
-    def mag(self):
-        # Returns microtesla (uT) if available
-        if not hasattr(self, '_mag_adj'):  # not initialized
-            return (None, None, None)
+    def read_mag(self, out=None):
+        """Fill out (default self.mag_data) with the field in uT and return
+        it, or return None if the AK8963 has no new data."""
+        if not self.has_mag:
+            return None
         # Check ST1 DRDY
-        st1 = self._read_ext(AK8963_ADDR, AK8963_ST1, 1)
-        if not st1 or not (st1[0] & 0x01):
-            return (None, None, None)
-        d = self._read_ext(AK8963_ADDR, AK8963_HXL, 7)
-        if not d or len(d) < 7:
-            return (None, None, None)
+        st1 = self._st1
+        self._read_ext_into(AK8963_ADDR, AK8963_ST1, st1)
+        if not (st1[0] & 0x01):
+            return None
+        d = self._mag_buf
+        self._read_ext_into(AK8963_ADDR, AK8963_HXL, d)
         # Little-endian order
         hx = (d[1] << 8) | d[0]
         hy = (d[3] << 8) | d[2]
@@ -127,19 +381,37 @@ class MPU9250:
         hz = hz - 65536 if hz & 0x8000 else hz
         # Apply factory sensitivity adjustment and scale to uT
         adj = self._mag_adj
+        if out is None:
+            out = self.mag_data
         # 0.15 uT/LSB for 16-bit output
-        mx = hx * adj[0] * 0.15
-        my = hy * adj[1] * 0.15
-        mz = hz * adj[2] * 0.15
-        return (mx, my, mz)
+        out[0] = hx * adj[0] * 0.15
+        out[1] = hy * adj[1] * 0.15
+        out[2] = hz * adj[2] * 0.15
+        return out
+
+    @property
+    def mag(self):
+        # Returns microtesla (uT) if available
+        m = self.read_mag()
+        if m is None:
+            return (None, None, None)
+        return (m[0], m[1], m[2])
 
     # AK8963 helpers
     def _read_ext(self, dev_addr, reg, n=1):
         return self.i2c.readfrom_mem(dev_addr, reg, n)
 
+    def _read_ext_into(self, dev_addr, reg, buf):
+        if self._rd_into is not None:
+            self._rd_into(dev_addr, reg, buf)
+        else:
+            buf[:] = self.i2c.readfrom_mem(dev_addr, reg, len(buf))
+
     def _write_ext(self, dev_addr, reg, val):
         if not isinstance(val, (bytes, bytearray)):
-            val = bytes([val & 0xFF])
+            w = self._w1
+            w[0] = val & 0xFF
+            val = w
         self.i2c.writeto_mem(dev_addr, reg, val)
 
     def _ak8963_setup(self, mag_hz):
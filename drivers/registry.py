@@ -0,0 +1,178 @@
+"""Lazy driver registry keyed by chip ID.
+
+Each DriverSpec names where a chip answers (I2C addresses, ID register,
+accepted ID values) and which module/class drives it, as strings. identify()
+reads the ID registers; a driver module is imported only once a chip with a
+matching ID has been found, so drivers for absent hardware never cost flash
+reads, bytecode compilation or RAM. load() records how long each import took
+and how much heap it used (stats, report()).
+"""
+import gc
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+IMU = 'imu'
+BARO = 'baro'
+
+
+class DriverSpec:
+    __slots__ = ('kind', 'lib', 'addrs', 'id_reg', 'ids', 'modules', 'ctors')
+
+    def __init__(self, kind, lib, addrs, id_reg, ids, modules, ctors):
+        self.kind = kind
+        self.lib = lib
+        self.addrs = addrs
+        self.id_reg = id_reg
+        self.ids = ids
+        self.modules = modules  # tried in order: package first, then top level
+        self.ctors = ctors      # class names tried in order
+
+
+# MPU-9250 comes first: its WHO_AM_I (0x75) is reserved/zero on the ICM-20948,
+# while the ICM's register 0x00 is a factory self-test value on the MPU.
+# 0x71 MPU-9250, 0x73 MPU-9255, 0x70 MPU-6500 (GY-91 clones; no AK8963, the
+# MPU9250 driver then runs without magnetometer).
+SPECS = (
+    DriverSpec(IMU, 'mpu9250', (0x68, 0x69), 0x75, (0x70, 0x71, 0x73),
+               ('drivers.mpu9250', 'mpu9250'), ('MPU9250', 'Mpu9250')),
+    DriverSpec(IMU, 'icm20948', (0x68, 0x69), 0x00, (0xEA,),
+               ('drivers.icm20948', 'icm20948'), ('ICM20948', 'ICM20948_I2C', 'ICM20948i2c')),
+    # BMP280 samples/production (0x56-0x58); the BME280 (0x60) shares the T/P part
+    DriverSpec(BARO, 'bmp280', (0x76, 0x77), 0xD0, (0x56, 0x57, 0x58, 0x60),
+               ('drivers.bmp280', 'bmp280'), ('BMP280',)),
+)
+
+_modules = {}   # lib -> module, or None if no candidate imported
+stats = {}      # name -> (import_us, heap_bytes or None)
+
+
+def _ticks_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def _ticks_diff(a, b):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(a, b)
+    return a - b
+
+
+def _import(name):
+    mod = __import__(name)
+    for part in name.split('.')[1:]:
+        mod = getattr(mod, part)
+    return mod
+
+
+def timed_import(name, key=None):
+    """Import module `name`, recording time and heap use under stats[key]
+    (heap bytes need gc.mem_alloc(), i.e. MicroPython). Raises ImportError."""
+    mem_alloc = getattr(gc, 'mem_alloc', None)
+    if mem_alloc is not None:
+        gc.collect()
+        m0 = mem_alloc()
+    t0 = _ticks_us()
+    mod = _import(name)
+    dt = _ticks_diff(_ticks_us(), t0)
+    stats[key or name] = (dt, mem_alloc() - m0 if mem_alloc is not None else None)
+    return mod
+
+
+def spec(lib):
+    for sp in SPECS:
+        if sp.lib == lib:
+            return sp
+    return None
+
+
+def load(sp):
+    """The driver module for sp (imported on first use), or None."""
+    if sp.lib in _modules:
+        return _modules[sp.lib]
+    mod = None
+    for name in sp.modules:
+        try:
+            mod = timed_import(name, sp.lib)
+            break
+        except ImportError:
+            pass
+    _modules[sp.lib] = mod
+    return mod
+
+
+def loaded():
+    """Libs whose driver module has been imported."""
+    return [lib for lib in _modules if _modules[lib] is not None]
+
+
+def read_id(i2c, addr, reg):
+    try:
+        return i2c.readfrom_mem(addr, reg, 1)[0]
+    except Exception:
+        return None
+
+
+def identify(i2c, kind, addr=None):
+    """First (spec, addr, id) of `kind` whose ID register matches, or None.
+
+    Addresses that do not answer are skipped for the remaining specs, and
+    each (addr, register) pair is read at most once.
+    """
+    if i2c is None:
+        return None
+    seen = {}
+    dead = []
+    for sp in SPECS:
+        if sp.kind != kind:
+            continue
+        for a in ((addr,) if addr is not None else sp.addrs):
+            if a in dead:
+                continue
+            key = (a << 8) | sp.id_reg
+            if key in seen:
+                who = seen[key]
+            else:
+                who = seen[key] = read_id(i2c, a, sp.id_reg)
+            if who is None:
+                dead.append(a)
+            elif who in sp.ids:
+                return sp, a, who
+    return None
+
+
+def create(i2c, sp, addr, ctor=None):
+    """Construct sp's driver at addr: (driver, class name) or (None, None).
+
+    ctor restricts the attempt to one class name (e.g. from the hw cache).
+    """
+    mod = load(sp)
+    if mod is None:
+        return None, None
+    for name in ((ctor,) if ctor else sp.ctors):
+        cls = getattr(mod, name, None)
+        if cls is None:
+            continue
+        try:
+            return cls(i2c, addr=addr), name
+        except TypeError:
+            try:
+                return cls(i2c), name
+            except Exception:
+                pass
+        except Exception:
+            pass
+    return None, None
+
+
+def report():
+    """One line per imported module: import time and heap used."""
+    lines = []
+    for key in stats:
+        us, heap = stats[key]
+        lines.append('{}: {:.1f} ms{}'.format(
+            key, us / 1000.0, '' if heap is None else ', {} B heap'.format(heap)))
+    return lines
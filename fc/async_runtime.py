@@ -0,0 +1,318 @@
+"""Cooperative (u)asyncio runtime: UDP link + flight loop in one process.
+
+Tasks, each with its own period and deadline:
+    control      FlightComputer.step() at loop_hz (highest rate), or on
+                 every IMU data-ready edge after fc.enable_imu_irq()
+    link         drains the UDP socket; the newest packet wins
+    housekeeping failsafe ramp (no packet for failsafe_ms -> throttle to 0)
+    telemetry    binary telemetry drain
+    stats        periodic timing record
+
+A received command is stamped on arrival and applied at the start of the next
+control step; stick-to-motor latency (arrival -> motor write) is recorded in
+`latency`. It is bounded by one link poll plus one control period.
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+from fc.scheduler import ticks_us, ticks_diff, ticks_add
+from firmware.shared.control_protocol import ThrottleSmoother
+from firmware.pico.udp_server import (UDP_PORT, FAILSAFE_MS, SOFT_LAND_MS,
+                                      decode_controls, build_ack)
+
+
+def _ticks_ms():
+    return time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+
+
+async def _sleep_us(us):
+    if hasattr(asyncio, 'sleep_ms'):
+        await asyncio.sleep_ms(us // 1000 if us > 0 else 0)
+    else:
+        await asyncio.sleep(us / 1000000.0 if us > 0 else 0)
+
+
+class _Flag:
+    """asyncio stand-in for uasyncio.ThreadSafeFlag (set from the same thread)."""
+    def __init__(self):
+        self._ev = asyncio.Event()
+
+    def set(self):
+        self._ev.set()
+
+    async def wait(self):
+        await self._ev.wait()
+        self._ev.clear()
+
+
+def _make_flag():
+    tsf = getattr(asyncio, 'ThreadSafeFlag', None)
+    return tsf() if tsf is not None else _Flag()
+
+
+class LatencyStats:
+    """Min/max/mean of stick-to-motor latency in microseconds."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.last_us = 0
+
+    def record(self, us):
+        if self.count == 0 or us < self.min_us:
+            self.min_us = us
+        if us > self.max_us:
+            self.max_us = us
+        self.last_us = us
+        self.total_us += us
+        self.count += 1
+
+    def mean_us(self):
+        return self.total_us / self.count if self.count else 0.0
+
+    def snapshot(self):
+        return {'count': self.count, 'min_us': self.min_us, 'max_us': self.max_us,
+                'mean_us': self.mean_us(), 'last_us': self.last_us}
+
+
+class TaskDeadline:
+    """Per-task deadline accounting: how late each release started."""
+    def __init__(self, name, period_us):
+        self.name = name
+        self.period_us = period_us
+        self.runs = 0
+        self.late_max_us = 0
+        self.missed = 0  # releases that started a full period late
+
+    def snapshot(self):
+        return {'period_us': self.period_us, 'runs': self.runs,
+                'late_max_us': self.late_max_us, 'missed': self.missed}
+
+
+class FlightRuntime:
+    """Runs a FlightComputer and its UDP control link as asyncio tasks.
+
+    sock: a bound UDP socket (made non-blocking here), or None for no link.
+    Roll/pitch sticks map to +-max_angle_deg, yaw to +-max_yaw_rate_dps.
+    """
+    def __init__(self, fc, sock=None, auth_key=None, expect_signature=None,
+                 deadzone=0.05, expo=0.2, link_poll_ms=2, telemetry_hz=10,
+                 housekeeping_hz=50, failsafe_ms=FAILSAFE_MS, soft_land_ms=SOFT_LAND_MS,
+                 max_angle_deg=30.0, max_yaw_rate_dps=180.0):
+        self.fc = fc
+        self.sock = sock
+        if sock is not None:
+            sock.setblocking(False)
+        self.auth_key = auth_key
+        self.expect_signature = bool(auth_key) if expect_signature is None else expect_signature
+        self.deadzone = deadzone
+        self.expo = expo
+        self.max_angle_deg = max_angle_deg
+        self.max_yaw_rate_dps = max_yaw_rate_dps
+        self.failsafe_ms = failsafe_ms
+        self.smoother = ThrottleSmoother(soft_land_ms)
+        self.latency = LatencyStats()
+        self.packets = 0
+        self.bad_packets = 0
+        self.failsafe = False
+        self._cmd = [0.0, 0.0, 0.0, 0.0]  # throttle, roll, pitch, yaw
+        self._cmd_rx_us = 0
+        self._cmd_pending = False
+        self._last_ok_us = ticks_us()
+        self._stop = False
+        self.deadlines = {}
+        self._periods = {
+            'control': int(1000000 / fc.loop_hz),
+            'link': int(link_poll_ms * 1000),
+            'housekeeping': int(1000000 / housekeeping_hz),
+            'telemetry': int(1000000 / telemetry_hz),
+        }
+        if fc.stats_every_s:
+            self._periods['stats'] = int(fc.stats_every_s * 1000000)
+
+    # Task bodies
+    def _control(self):
+        fc = self.fc
+        if self._cmd_pending:
+            c = self._cmd
+            fc.set_throttle(c[0])
+            fc.set_setpoints(c[1] * self.max_angle_deg, c[2] * self.max_angle_deg,
+                             c[3] * self.max_yaw_rate_dps)
+        fc.step()
+        if self._cmd_pending:
+            # step() has written the motors: close the latency measurement
+            self._cmd_pending = False
+            self.latency.record(ticks_diff(ticks_us(), self._cmd_rx_us))
+
+    def _link(self):
+        sock = self.sock
+        if sock is None:
+            return
+        while True:
+            try:
+                data, src = sock.recvfrom(256)
+            except OSError:
+                return
+            rx_us = ticks_us()
+            msg = data.decode('utf-8', 'ignore').strip()
+            try:
+                if msg == 'PING':
+                    sock.sendto(build_ack().encode(), src)
+                    continue
+                t, r, p, y, signed = decode_controls(
+                    msg, self.auth_key, self.expect_signature,
+                    deadzone=self.deadzone, expo=self.expo)
+            except Exception:
+                self.bad_packets += 1
+                continue
+            c = self._cmd
+            c[0] = self.smoother.on_valid(t)
+            c[1] = r
+            c[2] = p
+            c[3] = y
+            self._cmd_rx_us = rx_us
+            self._cmd_pending = True
+            self._last_ok_us = rx_us
+            self.failsafe = False
+            self.packets += 1
+            try:
+                sock.sendto(build_ack(signed).encode(), src)
+            except OSError:
+                pass
+
+    def _housekeeping(self):
+        if self.sock is None:
+            return
+        now = ticks_us()
+        if ticks_diff(now, self._last_ok_us) > self.failsafe_ms * 1000:
+            # Soft landing: ramp throttle down, level the setpoints
+            self.failsafe = True
+            c = self._cmd
+            c[0] = self.smoother.on_fail(_ticks_ms())
+            c[1] = 0.0
+            c[2] = 0.0
+            c[3] = 0.0
+            fc = self.fc
+            fc.set_throttle(c[0])
+            fc.set_setpoints(0.0, 0.0, 0.0)
+
+    def _telemetry(self):
+        self.fc.telemetry_drain.drain()
+
+    def _stats(self):
+        self.fc._publish_stats()
+
+    # Runtime
+    async def _periodic(self, name, fn):
+        period = self._periods[name]
+        dl = self.deadlines[name] = TaskDeadline(name, period)
+        release = ticks_us()
+        while not self._stop:
+            late = ticks_diff(ticks_us(), release)
+            if late > dl.late_max_us:
+                dl.late_max_us = late
+            if late >= period:
+                dl.missed += 1
+                release = ticks_us()  # resync instead of bursting to catch up
+            fn()
+            dl.runs += 1
+            release = ticks_add(release, period)
+            await _sleep_us(ticks_diff(release, ticks_us()))
+
+    async def _irq_driven(self, name, fn, flag):
+        # Released by the IMU data-ready IRQ; lateness is edge -> task start
+        imu = self.fc.sensors.imu
+        dl = self.deadlines[name] = TaskDeadline(name, self._periods[name])
+        while not self._stop:
+            await flag.wait()
+            if self._stop:
+                break
+            late = ticks_diff(ticks_us(), imu.irq_ts_us)
+            if late > dl.late_max_us:
+                dl.late_max_us = late
+            if late >= dl.period_us:
+                dl.missed += 1
+            fn()
+            dl.runs += 1
+
+    async def main(self, seconds=None):
+        self._stop = False
+        bodies = {
+            'control': self._control,
+            'link': self._link,
+            'housekeeping': self._housekeeping,
+            'telemetry': self._telemetry,
+            'stats': self._stats,
+        }
+        fc = self.fc
+        flag = None
+        if fc.imu_irq:
+            flag = _make_flag()
+            fc.on_imu_ready = flag.set
+        tasks = []
+        for name in self._periods:
+            if name == 'control' and flag is not None:
+                coro = self._irq_driven(name, bodies[name], flag)
+            else:
+                coro = self._periodic(name, bodies[name])
+            tasks.append(asyncio.create_task(coro))
+        try:
+            if seconds is None:
+                while not self._stop:
+                    await _sleep_us(100000)
+            else:
+                await _sleep_us(int(seconds * 1000000))
+        finally:
+            self._stop = True
+            fc.on_imu_ready = None
+            for t in tasks:
+                t.cancel()
+            for t in tasks:
+                try:
+                    await t
+                except BaseException:
+                    pass
+            self.fc.disarm()
+
+    def run(self, seconds=None):
+        asyncio.run(self.main(seconds))
+
+    def stop(self):
+        self._stop = True
+
+    def stats(self):
+        return {
+            'latency': self.latency.snapshot(),
+            'deadlines': {k: v.snapshot() for k, v in self.deadlines.items()},
+            'packets': self.packets,
+            'bad_packets': self.bad_packets,
+            'failsafe': self.failsafe,
+        }
+
+
+def run_flight(config_path='wifi_credentials.json', use_ap=False, port=UDP_PORT,
+               loop_hz=200, seconds=None):
+    """Board entry point: Wi-Fi up, then flight loop and UDP link together."""
+    import socket
+    from fc.flight_computer import FlightComputer
+    from firmware.pico.udp_server import _load_config, connect_wlan
+
+    cfg = _load_config(config_path)
+    connect_wlan(cfg, use_ap)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('0.0.0.0', port))
+    fc = FlightComputer(loop_hz=loop_hz)
+    rt = FlightRuntime(fc, sock, auth_key=cfg.get('udp_key'))
+    rt.run(seconds)
+    return rt
@@ -0,0 +1,215 @@
+"""Dual-core sensor acquisition.
+
+SensorCore runs the I2C sensor reads on the second core (`_thread` on
+MicroPython, `threading` on CPython) and publishes each sample through a
+SampleSeqlock. The control loop on core 0 always takes the newest consistent
+sample without locks and without waiting on the bus.
+
+Only core 1 touches I2C while the sensor core runs; GPS (UART) stays on
+core 0.
+"""
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+from fc.scheduler import ticks_us, ticks_diff, ticks_add, sleep_us
+from sensors.sample import SensorSample, VALID_IMU, VALID_MAG, VALID_IMU_TEMP, VALID_BARO
+
+# valid carries the SensorSample.valid bits (exact in float32 below 2**24);
+# baro_age_us is the baro stamp relative to the publish time, so the stamp
+# survives the float32 buffer.
+SAMPLE_FIELDS = ('ax', 'ay', 'az', 'gx', 'gy', 'gz', 'imu_temp_c',
+                 'temperature_c', 'pressure_pa', 'altitude_m',
+                 'valid', 'baro_age_us')
+_CORE1_VALID = VALID_IMU | VALID_MAG | VALID_IMU_TEMP | VALID_BARO
+
+
+class SampleSeqlock:
+    """Single-writer double buffer guarded by a sequence counter.
+
+    The writer fills the back buffer, bumps the sequence to odd, flips the
+    front index and bumps it back to even. A reader copies the front buffer
+    and retries if the sequence was odd or changed meanwhile.
+    """
+    def __init__(self, nvalues):
+        self._bufs = (array('f', [0.0] * nvalues), array('f', [0.0] * nvalues))
+        self._ts = [0, 0]
+        self._front = 0
+        self.seq = 0
+        self.n = nvalues
+        self.retries = 0
+
+    def back(self):
+        """Buffer the writer may fill for the next publish()."""
+        return self._bufs[self._front ^ 1]
+
+    def publish(self, ts_us):
+        back = self._front ^ 1
+        self._ts[back] = ts_us
+        self.seq += 1           # odd: flip in progress
+        self._front = back
+        self.seq += 1           # even: stable
+        # Prime the new back buffer with the latest values so partial
+        # updates (e.g. IMU-only samples) carry the slower fields forward
+        src = self._bufs[back]
+        dst = self._bufs[back ^ 1]
+        for i in range(self.n):
+            dst[i] = src[i]
+
+    def read_into(self, out, ts_out=None):
+        """Copy the newest consistent sample into out and return its sequence
+        number; its timestamp goes to ts_out[0] when given."""
+        while True:
+            s1 = self.seq
+            if s1 & 1:
+                self.retries += 1
+                continue
+            front = self._front
+            src = self._bufs[front]
+            for i in range(self.n):
+                out[i] = src[i]
+            ts = self._ts[front]
+            if self.seq == s1:
+                if ts_out is not None:
+                    ts_out[0] = ts
+                return s1 >> 1
+            self.retries += 1
+
+
+class SensorCore:
+    """Runs SensorHub IMU/baro reads in a loop on the second core."""
+    def __init__(self, hub, imu_hz=1000, baro_div=40):
+        self.hub = hub
+        self.period_us = int(1000000 / imu_hz)
+        self.baro_div = max(1, int(baro_div))
+        self.lock = SampleSeqlock(len(SAMPLE_FIELDS))
+        self.snapshot = array('f', [0.0] * len(SAMPLE_FIELDS))
+        self._acq = SensorSample()  # core 1 only; hub.sample belongs to core 0
+        self.samples = 0
+        self.errors = 0
+        self.running = False
+        self._stop = False
+        self._thread = None
+        self._last_seq = -1
+        self._ts = [0]
+        self.snapshot_ts = 0
+
+    # Core 1
+    def _acquire_once(self, n):
+        hub = self.hub
+        acq = self._acq
+        buf = self.lock.back()
+        hub.imu.read_into(acq)
+        a = acq.accel_g
+        g = acq.gyro_dps
+        buf[0] = a[0]
+        buf[1] = a[1]
+        buf[2] = a[2]
+        buf[3] = g[0]
+        buf[4] = g[1]
+        buf[5] = g[2]
+        buf[6] = acq.imu_temp_c
+        if n % self.baro_div == 0:
+            baro = hub.baro
+            if baro.split_phase:
+                baro.step_into(acq)
+            else:
+                baro.read_into(acq)
+            buf[7] = acq.temperature_c
+            buf[8] = acq.pressure_pa
+            buf[9] = acq.altitude_m
+        ts = acq.imu_us
+        buf[10] = acq.valid & _CORE1_VALID
+        buf[11] = ticks_diff(ts, acq.baro_us)
+        self.lock.publish(ts)
+        self.samples += 1
+
+    def _loop(self):
+        self.running = True
+        n = 0
+        next_us = ticks_us()
+        try:
+            while not self._stop:
+                try:
+                    self._acquire_once(n)
+                except Exception:
+                    self.errors += 1
+                n += 1
+                next_us = ticks_add(next_us, self.period_us)
+                delay = ticks_diff(next_us, ticks_us())
+                if delay > 0:
+                    sleep_us(delay)
+                else:
+                    next_us = ticks_us()
+        finally:
+            self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self._stop = False
+        if _thread is not None and threading is None:
+            _thread.start_new_thread(self._loop, ())
+        elif threading is not None:
+            self._thread = threading.Thread(target=self._loop, name='sensor-core')
+            self._thread.daemon = True
+            self._thread.start()
+        else:
+            raise RuntimeError('no thread support for the sensor core')
+        while not self.running and not self._stop:
+            sleep_us(100)
+
+    def stop(self, timeout_ms=500):
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join(timeout_ms / 1000.0)
+            self._thread = None
+            return
+        t0 = ticks_us()
+        while self.running and ticks_diff(ticks_us(), t0) < timeout_ms * 1000:
+            sleep_us(1000)
+
+    # Core 0
+    def read(self):
+        """Copy the newest sample into self.snapshot (stamped snapshot_ts).
+        Returns True if it was published since the previous read()."""
+        seq = self.lock.read_into(self.snapshot, self._ts)
+        self.snapshot_ts = self._ts[0]
+        fresh = seq != self._last_seq
+        self._last_seq = seq
+        return fresh
+
+    def pull_into(self, s):
+        """Copy the newest published sample into SensorSample s (core 0)."""
+        if not self.read():
+            return False
+        v = self.snapshot
+        a = s.accel_g
+        g = s.gyro_dps
+        a[0] = v[0]
+        a[1] = v[1]
+        a[2] = v[2]
+        g[0] = v[3]
+        g[1] = v[4]
+        g[2] = v[5]
+        s.imu_temp_c = v[6]
+        s.temperature_c = v[7]
+        s.pressure_pa = v[8]
+        s.altitude_m = v[9]
+        # GPS bits belong to core 0 (read_gps)
+        s.valid = (s.valid & ~_CORE1_VALID) | int(v[10])
+        ts = self.snapshot_ts
+        s.imu_us = ts
+        s.baro_us = ticks_add(ts, -int(v[11]))
+        return True
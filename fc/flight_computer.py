@@ -9,64 +9,207 @@ except ImportError:
     Pin = None
 
 from drivers.i2c_bus import get_i2c
-from sensors.sensor_hub import SensorHub
+from sensors.sensor_hub import SensorHub, SENSE_GPS
+from sensors.hw_cache import HW_CACHE_PATH
+from sensors.imu_cal import IMU_CAL_PATH
+from sensors.sample import VALID_ALTITUDE, VALID_BARO_TEMP, VALID_IMU_TEMP
 from control.pid import PID
+from control.filters import lowpass_biquad
 from config import pins as PINS
 from drivers.drv8833 import MotorQuad
 from control.attitude import ComplementaryAHRS
+from fc.scheduler import RateScheduler, ticks_us, ticks_diff, sleep_us
+from fc.loop_stats import (LoopStats, STAGE_SENSORS, STAGE_AHRS, STAGE_PID,
+                           STAGE_MIXER, STAGE_MOTORS, STAGE_LED)
+from fc.dual_core import SensorCore
+from fc.telemetry import (TelemetryRing, TelemetryDrain, UsbSerialWriter,
+                          REC_OUTPUTS, REC_STATS)
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+_NAN = float('nan')
+
+
+def _clamp1(x):
+    # Normalize to [-1, 1]
+    if x is None:
+        return 0.0
+    if x > 1.0:
+        return 1.0
+    if x < -1.0:
+        return -1.0
+    return x
+
+
+class FlightOutputs:
+    """Per-step outputs, updated in place by FlightComputer.step().
+
+    Supports out['key'] lookups for code written against the old dict.
+    """
+    __slots__ = ('dt', 'roll_deg', 'pitch_deg', 'yaw_deg', 'yaw_rate_dps',
+                 'u_roll', 'u_pitch', 'u_yaw', 'throttle', 'mix', 'alt_m', 'temp_c')
+
+    def __init__(self):
+        self.dt = 0.0
+        self.roll_deg = 0.0
+        self.pitch_deg = 0.0
+        self.yaw_deg = 0.0
+        self.yaw_rate_dps = 0.0
+        self.u_roll = 0.0
+        self.u_pitch = 0.0
+        self.u_yaw = 0.0
+        self.throttle = 0.0
+        self.mix = array('f', (0.0, 0.0, 0.0, 0.0))
+        self.alt_m = None
+        self.temp_c = None
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
 
 
 class FlightComputer:
-    def __init__(self, loop_hz=100):
+    """Flight loop. Hardware is used by default; for software-in-the-loop
+    runs pass a SensorHub-like `sensors` source, a MotorQuad-like `motors`
+    sink and a `clock` returning microseconds (see fc/sil.py).
+    """
+    def __init__(self, loop_hz=100, sensors=None, motors=None, clock=None, i2c=None,
+                 baro_hz=25, hw_cache=HW_CACHE_PATH, imu_cal=IMU_CAL_PATH,
+                 gyro_lpf_hz=None, dterm_lpf_hz=None):
+        t_boot = ticks_us()
         self.loop_hz = loop_hz
         self.dt = 1.0 / float(loop_hz)
-        self.i2c = get_i2c()
-        self.sensors = SensorHub(self.i2c)
+        self._clock = clock if clock is not None else ticks_us
+        if sensors is None:
+            self.i2c = i2c if i2c is not None else get_i2c()
+            sensors = SensorHub(self.i2c, hw_cache=hw_cache, imu_cal=imu_cal)
+        else:
+            self.i2c = i2c
+        self.sensors = sensors
+        # Tell the hub what step() reads so update() skips the rest (GPS);
+        # the control fields every step, altitude/temperature at baro_hz
+        self.sensor_subs = ()
+        subscribe = getattr(sensors, 'subscribe', None)
+        if subscribe is not None:
+            self.sensor_subs = (
+                subscribe(('accel_g', 'gyro_dps', 'imu_temp_c')),
+                subscribe(('altitude_m', 'temperature_c'), baro_hz),
+            )
         self.led = Pin(PINS.LED_RED_PIN, Pin.OUT) if Pin else None
         self.btn = Pin(PINS.BUTTON_ARM_PIN, Pin.IN, Pin.PULL_UP) if Pin else None
         self._btn_last = 1
         self._btn_last_change = 0
         self._btn_debounce_ms = 80
-        self.motors = MotorQuad()
+        self.motors = motors if motors is not None else MotorQuad()
         self.motors.disarm()  # start safe
         self._throttle = 0.0  # keep at 0 until explicitly set and armed
+        # Stabilize-mode setpoints (level hover unless a link sets them)
+        self.sp_roll_deg = 0.0
+        self.sp_pitch_deg = 0.0
+        self.sp_yaw_rate_dps = 0.0
 
         # Controllers
-        self.pid_roll = PID(kp=0.8, ki=0.0, kd=0.02, out_limit=1.0)
-        self.pid_pitch = PID(kp=0.8, ki=0.0, kd=0.02, out_limit=1.0)
-        self.pid_yaw = PID(kp=0.4, ki=0.0, kd=0.01, out_limit=1.0)
-        self._last_tick = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        self.pid_roll = PID(kp=0.8, ki=0.0, kd=0.02, out_limit=1.0, d_lpf_hz=dterm_lpf_hz)
+        self.pid_pitch = PID(kp=0.8, ki=0.0, kd=0.02, out_limit=1.0, d_lpf_hz=dterm_lpf_hz)
+        self.pid_yaw = PID(kp=0.4, ki=0.0, kd=0.01, out_limit=1.0, d_lpf_hz=dterm_lpf_hz)
+        self._last_tick = self._clock()
 
-        # Attitude filter
+        # Attitude filter, fed through an optional gyro low-pass (biquad)
         self.ahrs = ComplementaryAHRS(alpha=0.98)
+        self.gyro_lpf_hz = gyro_lpf_hz
+        self.gyro_filter = None
+        self._set_gyro_filter(loop_hz)
         self.att_roll = 0.0
         self.att_pitch = 0.0
         self.att_yaw = 0.0
         self.att_yaw_rate = 0.0
 
+        # Latest controller/mixer outputs
+        self.u_roll = 0.0
+        self.u_pitch = 0.0
+        self.u_yaw = 0.0
+        self.throttle_out = 0.0
+        self.mix = array('f', (0.0, 0.0, 0.0, 0.0))
+        self.out = FlightOutputs()
+
+        self.scheduler = None
+        self.sensor_core = None  # set by start_sensor_core()
+        self.imu_irq = False     # set by enable_imu_irq()
+        self._imu_ready = False
+        self.on_imu_ready = None  # optional wake hook (async runtime)
+        self.loop_stats = LoopStats(loop_hz)
+        self.stats_every_s = 5  # publish a timing record this often from run(); None = never
+
+        # Binary telemetry: the loop only commits records, a low-priority
+        # drain forwards them (default ~10 Hz of outputs over USB serial)
+        self.telemetry = TelemetryRing(capacity=64)
+        self.telemetry_drain = TelemetryDrain(self.telemetry, UsbSerialWriter(),
+                                              decimate=max(1, loop_hz // 10))
+        # Construction to armable (bus, sensor discovery, motors disarmed)
+        self.boot_us = ticks_diff(ticks_us(), t_boot)
+
     def step(self):
         # Timing
-        now = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
-        dt_ms = now - self._last_tick if not hasattr(time, 'ticks_diff') else time.ticks_diff(now, self._last_tick)
-        self._last_tick = now
-        dt = max(self.dt, dt_ms / 1000.0)
+        now_us = self._clock()
+        dt_us = ticks_diff(now_us, self._last_tick)
+        self._last_tick = now_us
+        dt = max(self.dt, dt_us / 1000000.0)
 
-        # Read sensors
-        s = self.sensors.read()
-        ax, ay, az = s.get('accel_g') or (0.0, 0.0, 1.0)
-        gx, gy, gz = s.get('gyro_dps') or (0.0, 0.0, 0.0)
+        st = self.loop_stats
+        st.begin()
 
-        # Update arm button state (debounced)
-        self._update_arm_button(now)
+        # Read sensors (or take the newest sample published by core 1)
+        if self.sensor_core is not None:
+            s = self.sensors.sample
+            self.sensor_core.pull_into(s)
+            self.sensors.update(sensors=SENSE_GPS)
+        else:
+            s = self.sensors.update()
+        st.stage(STAGE_SENSORS)
+
+        self._ahrs_stage(s, dt)
+        st.stage(STAGE_AHRS)
+        self._pid_stage(dt)
+        st.stage(STAGE_PID)
+        self._mixer_stage()
+        st.stage(STAGE_MIXER)
+        self._motor_stage()
+        st.stage(STAGE_MOTORS)
+        self._led_stage()
+        st.stage(STAGE_LED)
 
+        # Update arm button state (debounced); after the timed stages, as in
+        # the housekeeping task, so its pin read counts in busy time only
+        if self.btn:
+            self._update_arm_button(time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000))
+        st.end()
+        self._publish_outputs(dt, s)
+        return self._outputs(dt, s)
+
+    # Loop stages (shared by step() and the rate-group scheduler)
+    def _ahrs_stage(self, s, dt):
+        a = s.accel_g
+        g = s.gyro_dps
+        if self.gyro_filter is not None:
+            g = self.gyro_filter.update(g)
         # Attitude estimate: complementary filter
-        self.att_roll, self.att_pitch, self.att_yaw = self.ahrs.update((ax, ay, az), (gx, gy, gz), dt)
-        self.att_yaw_rate = gz
+        ahrs = self.ahrs
+        ahrs.update_xyz(a[0], a[1], a[2], g[0], g[1], g[2], dt)
+        self.att_roll = ahrs.roll
+        self.att_pitch = ahrs.pitch
+        self.att_yaw = ahrs.yaw
+        self.att_yaw_rate = g[2]
 
-        # Target setpoints (hover placeholder)
-        roll_sp = 0.0
-        pitch_sp = 0.0
-        yaw_rate_sp = 0.0
+    def _pid_stage(self, dt):
+        # Target setpoints (see set_setpoints())
+        roll_sp = self.sp_roll_deg
+        pitch_sp = self.sp_pitch_deg
+        yaw_rate_sp = self.sp_yaw_rate_dps
 
         # Errors
         err_roll = roll_sp - self.att_roll
@@ -74,9 +217,14 @@ class FlightComputer:
         err_yaw = yaw_rate_sp - self.att_yaw_rate
 
         # Controllers -> normalized demands in [-1,1]
-        u_roll = self.pid_roll.update(err_roll, dt)
-        u_pitch = self.pid_pitch.update(err_pitch, dt)
-        u_yaw = self.pid_yaw.update(err_yaw, dt)
+        self.u_roll = self.pid_roll.update(err_roll, dt)
+        self.u_pitch = self.pid_pitch.update(err_pitch, dt)
+        self.u_yaw = self.pid_yaw.update(err_yaw, dt)
+
+    def _mixer_stage(self):
+        u_roll = self.u_roll
+        u_pitch = self.u_pitch
+        u_yaw = self.u_yaw
 
         # Throttle (0..1). Default 0.0 unless set and armed.
         throttle = 0.0 if self.motors.disarmed else max(0.0, min(1.0, self._throttle))
@@ -87,21 +235,16 @@ class FlightComputer:
         r1 = throttle + (-u_roll) + (+u_pitch) + (+u_yaw)
         r2 = throttle + (-u_roll) + (-u_pitch) + (-u_yaw)
 
-        # Normalize to [-1, 1]
-        def clamp(x):
-            if x is None:
-                return 0.0
-            if x > 1.0:
-                return 1.0
-            if x < -1.0:
-                return -1.0
-            return x
-
-        l1 = clamp(l1); l2 = clamp(l2); r1 = clamp(r1); r2 = clamp(r2)
+        m = self.mix
+        m[0] = _clamp1(l1); m[1] = _clamp1(l2); m[2] = _clamp1(r1); m[3] = _clamp1(r2)
+        self.throttle_out = throttle
 
+    def _motor_stage(self):
         # Apply to motors (will noop if disarmed)
-        self.motors.set_quadsigned(l1, l2, r1, r2)
+        m = self.mix
+        self.motors.set_quadsigned(m[0], m[1], m[2], m[3])
 
+    def _led_stage(self):
         # LED heartbeat
         if self.led:
             try:
@@ -112,22 +255,231 @@ class FlightComputer:
             except Exception:
                 pass
 
-        return {
-            'dt': dt,
-            'roll_deg': self.att_roll,
-            'pitch_deg': self.att_pitch,
-            'yaw_deg': self.att_yaw,
-            'yaw_rate_dps': self.att_yaw_rate,
-            'u_roll': u_roll,
-            'u_pitch': u_pitch,
-            'u_yaw': u_yaw,
-            'throttle': throttle,
-            'mix': (l1, l2, r1, r2),
-            'alt_m': s.get('altitude_m'),
-            'temp_c': s.get('temperature_c') or s.get('imu_temp_c'),
-        }
+    def _publish_outputs(self, dt, s):
+        v = self.telemetry.values
+        v[0] = dt
+        v[1] = self.att_roll
+        v[2] = self.att_pitch
+        v[3] = self.att_yaw
+        v[4] = self.att_yaw_rate
+        v[5] = self.u_roll
+        v[6] = self.u_pitch
+        v[7] = self.u_yaw
+        v[8] = self.throttle_out
+        m = self.mix
+        v[9] = m[0]
+        v[10] = m[1]
+        v[11] = m[2]
+        v[12] = m[3]
+        v[13] = s.altitude_m if s.valid & VALID_ALTITUDE else _NAN
+        self.telemetry.commit(REC_OUTPUTS, self._clock())
+
+    def _publish_stats(self):
+        st = self.loop_stats
+        v = self.telemetry.values
+        v[0] = st.loops
+        v[1] = st.overruns
+        v[2] = st.busy_mean()
+        v[3] = st.busy_max
+        v[4] = st.period_max
+        for i in range(6):
+            v[5 + i] = st.stage_mean(i)
+        v[11] = st.jitter_count_over(1000)
+        v[12] = self.telemetry.dropped
+        v[13] = 0.0
+        self.telemetry.commit(REC_STATS, self._clock())
+
+    def set_telemetry_sink(self, writer, decimate=None):
+        """Route telemetry to a writer (UsbSerialWriter, UdpWriter, None = discard)."""
+        self.telemetry_drain.writer = writer
+        if decimate is not None:
+            self.telemetry_drain.decimate = max(1, int(decimate))
+
+    def _outputs(self, dt, s):
+        out = self.out
+        out.dt = dt
+        out.roll_deg = self.att_roll
+        out.pitch_deg = self.att_pitch
+        out.yaw_deg = self.att_yaw
+        out.yaw_rate_dps = self.att_yaw_rate
+        out.u_roll = self.u_roll
+        out.u_pitch = self.u_pitch
+        out.u_yaw = self.u_yaw
+        out.throttle = self.throttle_out
+        m = self.mix
+        om = out.mix
+        om[0] = m[0]; om[1] = m[1]; om[2] = m[2]; om[3] = m[3]
+        valid = s.valid
+        out.alt_m = s.altitude_m if valid & VALID_ALTITUDE else None
+        if valid & VALID_BARO_TEMP:
+            out.temp_c = s.temperature_c
+        elif valid & VALID_IMU_TEMP:
+            out.temp_c = s.imu_temp_c
+        else:
+            out.temp_c = None
+        return out
+
+    # Rate-group scheduling: the gyro -> motor path runs at control_hz while
+    # baro, GPS, telemetry and housekeeping run at their own (slower) rates.
+    def build_scheduler(self, control_hz=500, baro_hz=25, gps_hz=5,
+                        telemetry_hz=10, housekeeping_hz=50):
+        sched = RateScheduler(clock=self._clock)
+        sched.add('imu', self._task_imu, hz=control_hz, priority=0, critical=True)
+        sched.add('ahrs', self._task_ahrs, hz=control_hz, priority=1, critical=True)
+        sched.add('pid', self._task_pid, hz=control_hz, priority=2, critical=True)
+        sched.add('mixer', self._task_mixer, hz=control_hz, priority=3, critical=True)
+        sched.add('baro', self._task_baro, hz=baro_hz, priority=10)
+        sched.add('housekeeping', self._task_housekeeping, hz=housekeeping_hz, priority=15)
+        sched.add('gps', self._task_gps, hz=gps_hz, priority=20)
+        sched.add('telemetry', self._task_telemetry, hz=telemetry_hz, priority=30)
+        if self.stats_every_s:
+            sched.add('stats', self._task_stats,
+                      period_us=int(self.stats_every_s * 1000000), priority=40)
+        self.scheduler = sched
+        self.loop_stats = LoopStats(control_hz)
+        self._ahrs_last_us = None
+        self._pid_last_us = None
+        self._mix_last_us = None
+        self.telemetry_drain.decimate = max(1, control_hz // telemetry_hz)
+        self._ahrs_nominal_dt = 1.0 / float(control_hz)
+        self._set_gyro_filter(control_hz)
+        return sched
+
+    def _set_gyro_filter(self, rate_hz):
+        # The biquad is designed for the rate the AHRS stage runs at
+        f = self.gyro_lpf_hz
+        if f and f < rate_hz / 2.0:
+            self.gyro_filter = lowpass_biquad(f, rate_hz)
+        else:
+            self.gyro_filter = None
+
+    def run_scheduled(self, seconds=None, **rates):
+        if self.scheduler is None or rates:
+            self.build_scheduler(**rates)
+        self.scheduler.run(seconds)
+
+    def _task_dt(self, now_us, last_us):
+        if last_us is None:
+            return self._ahrs_nominal_dt
+        return max(0.0, ticks_diff(now_us, last_us) / 1000000.0)
+
+    def _task_imu(self, now_us):
+        st = self.loop_stats
+        st.begin(now_us)
+        if self.sensor_core is not None:
+            self.sensor_core.pull_into(self.sensors.sample)
+        else:
+            self.sensors.read_imu()
+        st.stage(STAGE_SENSORS)
+
+    def _task_ahrs(self, now_us):
+        dt = self._task_dt(now_us, self._ahrs_last_us)
+        self._ahrs_last_us = now_us
+        self._ahrs_stage(self.sensors.sample, dt)
+        self.loop_stats.stage(STAGE_AHRS)
+
+    def _task_pid(self, now_us):
+        dt = self._task_dt(now_us, self._pid_last_us)
+        self._pid_last_us = now_us
+        self._pid_stage(dt)
+        self.loop_stats.stage(STAGE_PID)
+
+    def _task_mixer(self, now_us):
+        st = self.loop_stats
+        self._mixer_stage()
+        st.stage(STAGE_MIXER)
+        self._motor_stage()
+        st.stage(STAGE_MOTORS)
+        st.end()
+        dt = self._task_dt(now_us, self._mix_last_us)
+        self._mix_last_us = now_us
+        self._publish_outputs(dt, self.sensors.sample)
+
+    def _task_baro(self, now_us):
+        if self.sensor_core is None:
+            self.sensors.read_baro()
+
+    def _task_gps(self, now_us):
+        self.sensors.read_gps()
+
+    def _task_housekeeping(self, now_us):
+        now = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        self._update_arm_button(now)
+        t0 = ticks_us()
+        self._led_stage()
+        self.loop_stats.record(STAGE_LED, ticks_diff(ticks_us(), t0))
+
+    def _task_telemetry(self, now_us):
+        self.telemetry_drain.drain()
+
+    def _task_stats(self, now_us):
+        self._publish_stats()
+
+    # Dual-core mode: IMU/baro reads move to core 1, control stays on core 0
+    def start_sensor_core(self, imu_hz=1000, baro_div=40):
+        if self.sensor_core is None:
+            self.sensor_core = SensorCore(self.sensors, imu_hz=imu_hz, baro_div=baro_div)
+        self.sensor_core.start()
+        return self.sensor_core
+
+    def stop_sensor_core(self):
+        if self.sensor_core is not None:
+            self.sensor_core.stop()
+            self.sensor_core = None
+
+    # Data-ready IRQ: step() runs phase-locked to fresh IMU samples
+    def enable_imu_irq(self, pin=None, rate_hz=None):
+        """Drive the loop from the IMU data-ready interrupt (IMU_INT_PIN).
+
+        The IMU output rate is set to rate_hz (default loop_hz); run() and
+        the async runtime then step once per sample instead of on a timer.
+        """
+        imu = getattr(self.sensors, 'imu', None)
+        if imu is None or not hasattr(imu, 'enable_irq'):
+            return False
+        self._imu_ready = False
+        self.imu_irq = bool(imu.enable_irq(PINS.IMU_INT_PIN if pin is None else pin,
+                                           rate_hz=rate_hz or self.loop_hz,
+                                           on_ready=self._on_imu_ready))
+        return self.imu_irq
+
+    def disable_imu_irq(self):
+        if self.imu_irq:
+            self.sensors.imu.disable_irq()
+        self.imu_irq = False
+
+    def _on_imu_ready(self, ts_us):
+        # Called from the (hard) pin IRQ: flag only, no allocation
+        self._imu_ready = True
+        wake = self.on_imu_ready
+        if wake is not None:
+            wake()
+
+    def _run_irq(self, seconds=None):
+        t0 = ticks_us()
+        limit_us = None if seconds is None else int(seconds * 1000000)
+        stats_us = int(self.stats_every_s * 1000000) if self.stats_every_s else None
+        last_stats = t0
+        while limit_us is None or ticks_diff(ticks_us(), t0) < limit_us:
+            if not self._imu_ready:
+                # Waiting for the data-ready edge: drain telemetry meanwhile
+                self.telemetry_drain.drain()
+                sleep_us(20)
+                continue
+            self._imu_ready = False
+            self.step()
+            if stats_us is not None and ticks_diff(ticks_us(), last_stats) >= stats_us:
+                last_stats = ticks_us()
+                self._publish_stats()
 
     # Basic API
+    def timing_stats(self):
+        """Per-stage timing, loop period/jitter histogram and overrun count."""
+        return self.loop_stats.snapshot()
+
+    def reset_timing_stats(self):
+        self.loop_stats.reset()
+
     def arm(self):
         self.motors.arm()
 
@@ -140,6 +492,11 @@ class FlightComputer:
         except Exception:
             self._throttle = 0.0
 
+    def set_setpoints(self, roll_deg=0.0, pitch_deg=0.0, yaw_rate_dps=0.0):
+        self.sp_roll_deg = roll_deg
+        self.sp_pitch_deg = pitch_deg
+        self.sp_yaw_rate_dps = yaw_rate_dps
+
     def _update_arm_button(self, now_ms):
         if not self.btn:
             return
@@ -157,19 +514,25 @@ class FlightComputer:
             self._btn_last_change = now_ms + 500
 
     def run(self, seconds=None):
+        if self.imu_irq:
+            return self._run_irq(seconds)
         next_ts = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
         period_ms = int(1000 / self.loop_hz)
         end_time = None
         if seconds is not None:
             now = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
             end_time = now + int(seconds * 1000)
+        stats_ms = int(self.stats_every_s * 1000) if self.stats_every_s else None
+        next_stats = next_ts + stats_ms if stats_ms else None
 
         while True:
-            out = self.step()
-            try:
-                print(out)
-            except Exception:
-                pass
+            self.step()
+
+            if next_stats is not None:
+                cur = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+                if cur >= next_stats:
+                    next_stats += stats_ms
+                    self._publish_stats()
 
             if seconds is not None:
                 cur = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
@@ -179,11 +542,17 @@ class FlightComputer:
             next_ts += period_ms
             cur = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
             delay = next_ts - cur
+            if delay > 0:
+                # Drain telemetry in the slack, then sleep whatever is left
+                self.telemetry_drain.drain()
+                cur = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+                delay = next_ts - cur
             if delay > 0:
                 if hasattr(time, 'sleep_ms'):
                     time.sleep_ms(delay)
                 else:
                     time.sleep(delay / 1000.0)
             else:
-                # Overrun: skip sleep to catch up
+                # Overrun: skip sleep to catch up (body overruns are counted
+                # in loop_stats; see timing_stats())
                 pass
@@ -0,0 +1,177 @@
+"""Per-stage loop timing instrumentation.
+
+Times each stage of the flight loop in microseconds (min/max/mean), tracks the
+loop period and a fixed-bucket histogram of its jitter, and counts overruns
+(loop body longer than one period). Storage is preallocated so recording a
+sample does not allocate.
+"""
+from fc.scheduler import ticks_us, ticks_diff
+
+STAGE_SENSORS = 0
+STAGE_AHRS = 1
+STAGE_PID = 2
+STAGE_MIXER = 3
+STAGE_MOTORS = 4
+STAGE_LED = 5
+STAGE_NAMES = ('sensors', 'ahrs', 'pid', 'mixer', 'motors', 'led')
+
+# Upper edges of the |period - nominal| histogram buckets in us; the last
+# bucket collects everything >= JITTER_EDGES_US[-1].
+JITTER_EDGES_US = (10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_BIG = 0x3FFFFFFF
+
+
+class LoopStats:
+    def __init__(self, loop_hz, stage_names=STAGE_NAMES, jitter_edges_us=JITTER_EDGES_US):
+        self.loop_hz = loop_hz
+        self.period_us = int(1000000 / loop_hz)
+        self.stage_names = stage_names
+        self.jitter_edges_us = jitter_edges_us
+        n = len(stage_names)
+        self._st_count = [0] * n
+        self._st_total = [0] * n
+        self._st_min = [_BIG] * n
+        self._st_max = [0] * n
+        self.jitter_hist = [0] * (len(jitter_edges_us) + 1)
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.stage_names)):
+            self._st_count[i] = 0
+            self._st_total[i] = 0
+            self._st_min[i] = _BIG
+            self._st_max[i] = 0
+        for i in range(len(self.jitter_hist)):
+            self.jitter_hist[i] = 0
+        self.loops = 0
+        self.overruns = 0
+        self.period_min = _BIG
+        self.period_max = 0
+        self._period_total = 0
+        self._period_count = 0
+        self.busy_min = _BIG
+        self.busy_max = 0
+        self._busy_total = 0
+        self._last_start = None
+        self._start = 0
+        self._mark = 0
+
+    # Recording
+    def begin(self, now_us=None):
+        """Mark the start of a loop iteration and record period/jitter."""
+        if now_us is None:
+            now_us = ticks_us()
+        last = self._last_start
+        if last is not None:
+            period = ticks_diff(now_us, last)
+            if period < self.period_min:
+                self.period_min = period
+            if period > self.period_max:
+                self.period_max = period
+            self._period_total += period
+            self._period_count += 1
+            jitter = period - self.period_us
+            if jitter < 0:
+                jitter = -jitter
+            edges = self.jitter_edges_us
+            i = 0
+            n = len(edges)
+            while i < n and jitter >= edges[i]:
+                i += 1
+            self.jitter_hist[i] += 1
+        self._last_start = now_us
+        self._start = now_us
+        self._mark = now_us
+
+    def stage(self, idx, now_us=None):
+        """Close the stage `idx` that started at the previous mark."""
+        if now_us is None:
+            now_us = ticks_us()
+        self.record(idx, ticks_diff(now_us, self._mark))
+        self._mark = now_us
+
+    def record(self, idx, dur_us):
+        self._st_count[idx] += 1
+        self._st_total[idx] += dur_us
+        if dur_us < self._st_min[idx]:
+            self._st_min[idx] = dur_us
+        if dur_us > self._st_max[idx]:
+            self._st_max[idx] = dur_us
+
+    def end(self, now_us=None):
+        """Mark the end of the loop body; counts an overrun if over budget."""
+        if now_us is None:
+            now_us = ticks_us()
+        busy = ticks_diff(now_us, self._start)
+        if busy < self.busy_min:
+            self.busy_min = busy
+        if busy > self.busy_max:
+            self.busy_max = busy
+        self._busy_total += busy
+        self.loops += 1
+        if busy > self.period_us:
+            self.overruns += 1
+        return busy
+
+    # Reporting
+    def stage_mean(self, idx):
+        n = self._st_count[idx]
+        return self._st_total[idx] / n if n else 0.0
+
+    def busy_mean(self):
+        return self._busy_total / self.loops if self.loops else 0.0
+
+    def jitter_count_over(self, us):
+        """Number of periods whose jitter fell in buckets starting at >= us."""
+        edges = self.jitter_edges_us
+        hist = self.jitter_hist
+        n = 0
+        for i in range(1, len(hist)):
+            if edges[i - 1] >= us:
+                n += hist[i]
+        return n
+
+    def stage_stats(self, idx):
+        n = self._st_count[idx]
+        if not n:
+            return {'count': 0, 'min_us': None, 'max_us': None, 'mean_us': None}
+        return {
+            'count': n,
+            'min_us': self._st_min[idx],
+            'max_us': self._st_max[idx],
+            'mean_us': self._st_total[idx] / n,
+        }
+
+    def snapshot(self):
+        pc = self._period_count
+        lc = self.loops
+        return {
+            'loop_hz': self.loop_hz,
+            'budget_us': self.period_us,
+            'loops': lc,
+            'overruns': self.overruns,
+            'period_us': {
+                'min': self.period_min if pc else None,
+                'max': self.period_max if pc else None,
+                'mean': self._period_total / pc if pc else None,
+            },
+            'busy_us': {
+                'min': self.busy_min if lc else None,
+                'max': self.busy_max if lc else None,
+                'mean': self._busy_total / lc if lc else None,
+            },
+            'jitter_edges_us': self.jitter_edges_us,
+            'jitter_hist': list(self.jitter_hist),
+            'stages': {name: self.stage_stats(i) for i, name in enumerate(self.stage_names)},
+        }
+
+    def summary(self):
+        """One-line text summary (mean/max per stage) for logs."""
+        parts = ['loops=%d' % self.loops, 'overruns=%d' % self.overruns]
+        for i, name in enumerate(self.stage_names):
+            n = self._st_count[i]
+            if n:
+                parts.append('%s=%d/%d' % (name, self._st_total[i] // n, self._st_max[i]))
+        parts.append('jitter=%s' % ','.join(str(c) for c in self.jitter_hist))
+        return ' '.join(parts)
@@ -0,0 +1,169 @@
+"""Rate-group task scheduler for the flight loop.
+
+Each task registers its own period and priority. Critical tasks (the
+gyro -> motor path) run whenever they are due. Everything else (baro, GPS,
+telemetry, housekeeping) only runs when it fits in the slack before the next
+critical deadline, so slow I2C/UART work never delays the control path.
+A starved non-critical task is forced through once it is a full period late.
+"""
+try:
+    import utime as time
+except ImportError:
+    import time
+
+
+def ticks_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+def ticks_diff(a, b):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(a, b)
+    return a - b
+
+
+def ticks_add(a, delta):
+    if hasattr(time, 'ticks_add'):
+        return time.ticks_add(a, delta)
+    return a + delta
+
+
+def sleep_us(us):
+    if us <= 0:
+        return
+    if hasattr(time, 'sleep_us'):
+        time.sleep_us(us)
+    else:
+        time.sleep(us / 1000000.0)
+
+
+class Task:
+    __slots__ = ('name', 'fn', 'period_us', 'priority', 'critical',
+                 'next_us', 'cost_us', 'runs', 'deferred', 'held')
+
+    def __init__(self, name, fn, period_us, priority=0, critical=False):
+        if period_us <= 0:
+            raise ValueError("task period must be > 0")
+        self.name = name
+        self.fn = fn
+        self.period_us = int(period_us)
+        self.priority = priority
+        self.critical = critical
+        self.next_us = None   # first deadline is set on first run_pending()
+        self.cost_us = 0      # last measured execution time
+        self.runs = 0
+        self.deferred = 0
+        self.held = False     # due but deferred by the last run_pending()
+
+
+class RateScheduler:
+    """Cooperative multi-rate scheduler.
+
+    Tasks are kept sorted by priority (lower value runs first) and are called
+    as fn(now_us) with the tick timestamp of the current pass.
+    """
+    def __init__(self, clock=None):
+        self._clock = clock if clock is not None else ticks_us
+        self.tasks = []
+
+    def add(self, name, fn, hz=None, period_us=None, priority=0, critical=False):
+        if period_us is None:
+            if not hz:
+                raise ValueError("either hz or period_us is required")
+            period_us = int(1000000 / hz)
+        task = Task(name, fn, period_us, priority, critical)
+        # Stable insert keeps registration order within a priority
+        i = len(self.tasks)
+        while i > 0 and self.tasks[i - 1].priority > priority:
+            i -= 1
+        self.tasks.insert(i, task)
+        return task
+
+    def get(self, name):
+        for t in self.tasks:
+            if t.name == name:
+                return t
+        return None
+
+    def remove(self, name):
+        t = self.get(name)
+        if t is not None:
+            self.tasks.remove(t)
+        return t
+
+    def _slack_us(self, now):
+        # Time left until the next critical task is due (None = no critical tasks)
+        slack = None
+        for t in self.tasks:
+            if t.critical and t.next_us is not None:
+                d = ticks_diff(t.next_us, now)
+                if slack is None or d < slack:
+                    slack = d
+        return slack
+
+    def run_pending(self, now=None):
+        """Run every due task once, in priority order. Returns tasks run."""
+        clock = self._clock
+        if now is None:
+            now = clock()
+        ran = 0
+        for t in self.tasks:
+            if t.next_us is None:
+                t.next_us = now
+            late = ticks_diff(now, t.next_us)
+            if late < 0:
+                continue
+            if not t.critical and late < t.period_us:
+                slack = self._slack_us(now)
+                if slack is not None and slack < t.cost_us:
+                    t.deferred += 1
+                    t.held = True
+                    continue
+            t.held = False
+            t0 = clock()
+            t.fn(now)
+            now = clock()
+            t.cost_us = ticks_diff(now, t0)
+            t.runs += 1
+            nxt = ticks_add(t.next_us, t.period_us)
+            if ticks_diff(nxt, now) <= 0:
+                # Fell behind by a full period: drop missed releases
+                nxt = ticks_add(now, t.period_us)
+            t.next_us = nxt
+            ran += 1
+        return ran
+
+    def next_deadline(self):
+        """Earliest time a task can run. A deferred task's release is
+        already past; it waits for slack at the next critical deadline or
+        is forced a full period late, so it counts from the latter."""
+        nxt = None
+        for t in self.tasks:
+            d = t.next_us
+            if d is None:
+                continue
+            if t.held:
+                d = ticks_add(d, t.period_us)
+            if nxt is None or ticks_diff(d, nxt) < 0:
+                nxt = d
+        return nxt
+
+    def run(self, seconds=None):
+        clock = self._clock
+        start = clock()
+        limit_us = int(seconds * 1000000) if seconds is not None else None
+        while True:
+            self.run_pending()
+            now = clock()
+            if limit_us is not None and ticks_diff(now, start) >= limit_us:
+                break
+            nxt = self.next_deadline()
+            if nxt is not None:
+                sleep_us(ticks_diff(nxt, now))
+
+    def stats(self):
+        return {t.name: {'period_us': t.period_us, 'runs': t.runs,
+                         'deferred': t.deferred, 'cost_us': t.cost_us}
+                for t in self.tasks}
@@ -0,0 +1,256 @@
+"""Software-in-the-loop replay harness.
+
+Drives FlightComputer.step() from a recorded or synthetic sensor log as fast
+as the CPU allows: a SimClock supplies the log timestamps, ReplaySensors
+stands in for SensorHub and CaptureMotors for MotorQuad. Per-step outputs are
+captured into one flat array('f') (row-major, OUTPUT_FIELDS columns).
+
+Example (desktop):
+    from fc.sil import SensorLog, SilRig
+    rig = SilRig(SensorLog.from_csv('flight.csv'), loop_hz=100)
+    rig.fc.pid_roll.kp = 1.2
+    res = rig.run()
+    roll = res.column('roll_deg')
+"""
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+import math
+
+from fc.flight_computer import FlightComputer
+from fc.telemetry import OUTPUT_FIELDS
+from sensors.sample import (SensorSample, VALID_IMU, VALID_ALTITUDE,
+                            VALID_BARO_TEMP)
+
+LOG_FIELDS = ('ax', 'ay', 'az', 'gx', 'gy', 'gz', 'alt_m', 'temp_c')
+_NLOG = len(LOG_FIELDS)
+_NAN = float('nan')
+
+
+class SensorLog:
+    """Timestamps in array('q') (us) and sensor rows in a flat array('f')."""
+    def __init__(self, t_us=None, values=None):
+        self.t_us = t_us if t_us is not None else array('q')
+        self.values = values if values is not None else array('f')
+
+    def __len__(self):
+        return len(self.t_us)
+
+    def append(self, t_us, ax, ay, az, gx, gy, gz, alt_m=_NAN, temp_c=_NAN):
+        self.t_us.append(int(t_us))
+        v = self.values
+        v.append(ax); v.append(ay); v.append(az)
+        v.append(gx); v.append(gy); v.append(gz)
+        v.append(alt_m); v.append(temp_c)
+
+    def row(self, i):
+        base = i * _NLOG
+        return tuple(self.values[base:base + _NLOG])
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a CSV with a header containing t_us and LOG_FIELDS columns
+        (alt_m and temp_c are optional)."""
+        log = cls()
+        with open(path, 'r') as fp:
+            header = fp.readline().strip().split(',')
+            idx = [header.index(k) if k in header else -1 for k in ('t_us',) + LOG_FIELDS]
+            if idx[0] < 0 or min(idx[1:7]) < 0:
+                raise ValueError("CSV needs t_us, ax, ay, az, gx, gy, gz columns")
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                parts = line.split(',')
+                vals = [float(parts[j]) if j >= 0 and parts[j] != '' else _NAN for j in idx[1:]]
+                log.append(int(float(parts[idx[0]])), *vals)
+        return log
+
+    def to_csv(self, path):
+        with open(path, 'w') as fp:
+            fp.write(','.join(('t_us',) + LOG_FIELDS) + '\n')
+            for i in range(len(self)):
+                fp.write('%d,%s\n' % (self.t_us[i], ','.join(repr(v) for v in self.row(i))))
+
+
+def synthetic_log(seconds=10.0, rate_hz=100, roll_rate_dps=0.0, pitch_rate_dps=0.0,
+                  yaw_rate_dps=0.0, gyro_noise_dps=0.0, accel_noise_g=0.0,
+                  alt_m=0.0, seed=1):
+    """Level attitude with constant body rates and optional white noise."""
+    import random
+    rnd = random.Random(seed)
+    log = SensorLog()
+    period_us = int(1000000 / rate_hz)
+    for i in range(int(seconds * rate_hz)):
+        log.append(
+            i * period_us,
+            rnd.gauss(0.0, accel_noise_g) if accel_noise_g else 0.0,
+            rnd.gauss(0.0, accel_noise_g) if accel_noise_g else 0.0,
+            1.0 + (rnd.gauss(0.0, accel_noise_g) if accel_noise_g else 0.0),
+            roll_rate_dps + (rnd.gauss(0.0, gyro_noise_dps) if gyro_noise_dps else 0.0),
+            pitch_rate_dps + (rnd.gauss(0.0, gyro_noise_dps) if gyro_noise_dps else 0.0),
+            yaw_rate_dps + (rnd.gauss(0.0, gyro_noise_dps) if gyro_noise_dps else 0.0),
+            alt_m,
+            25.0,
+        )
+    return log
+
+
+class SimClock:
+    """Injectable microsecond clock; the replay loop sets `now`."""
+    def __init__(self, start_us=0):
+        self.now = start_us
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, us):
+        self.now += us
+
+
+class ReplaySensors:
+    """SensorHub stand-in that serves row `index` of a SensorLog."""
+    def __init__(self, log):
+        self.log = log
+        self.sample = SensorSample()
+        self.index = 0
+
+    def read_imu(self):
+        s = self.sample
+        v = self.log.values
+        base = self.index * _NLOG
+        a = s.accel_g
+        g = s.gyro_dps
+        a[0] = v[base]; a[1] = v[base + 1]; a[2] = v[base + 2]
+        g[0] = v[base + 3]; g[1] = v[base + 4]; g[2] = v[base + 5]
+        s.valid |= VALID_IMU
+        s.imu_us = self.log.t_us[self.index]
+        return s
+
+    def read_baro(self):
+        s = self.sample
+        v = self.log.values
+        base = self.index * _NLOG
+        alt = v[base + 6]
+        t = v[base + 7]
+        valid = s.valid & ~(VALID_ALTITUDE | VALID_BARO_TEMP)
+        if not math.isnan(alt):
+            s.altitude_m = alt
+            valid |= VALID_ALTITUDE
+        if not math.isnan(t):
+            s.temperature_c = t
+            valid |= VALID_BARO_TEMP
+        s.valid = valid
+        s.baro_us = self.log.t_us[self.index]
+        return s
+
+    def read_gps(self):
+        return self.sample
+
+    def update(self):
+        self.read_imu()
+        self.read_baro()
+        self.sample.ts_ms = self.log.t_us[self.index] // 1000
+        return self.sample
+
+
+class CaptureMotors:
+    """MotorQuad stand-in that keeps the last command instead of driving PWM."""
+    def __init__(self):
+        self.disarmed = True
+        self.last = array('f', (0.0, 0.0, 0.0, 0.0))
+        self.commands = 0
+
+    def arm(self):
+        self.disarmed = False
+
+    def disarm(self):
+        self.disarmed = True
+        self.stop_all()
+
+    def stop_all(self):
+        m = self.last
+        m[0] = 0.0; m[1] = 0.0; m[2] = 0.0; m[3] = 0.0
+
+    def set_quadsigned(self, l1, l2, r1, r2):
+        if self.disarmed:
+            self.stop_all()
+            return
+        m = self.last
+        m[0] = l1; m[1] = l2; m[2] = r1; m[3] = r2
+        self.commands += 1
+
+
+class ReplayResult:
+    """Captured outputs: `data` is a flat array('f'), one row per step."""
+    def __init__(self, data, n, fields=OUTPUT_FIELDS):
+        self.data = data
+        self.n = n
+        self.fields = fields
+
+    def __len__(self):
+        return self.n
+
+    def column(self, name):
+        w = len(self.fields)
+        j = self.fields.index(name)
+        return array('f', [self.data[i * w + j] for i in range(self.n)])
+
+    def row(self, i):
+        w = len(self.fields)
+        return dict(zip(self.fields, self.data[i * w:(i + 1) * w]))
+
+
+class SilRig:
+    """FlightComputer wired to a SimClock, ReplaySensors and CaptureMotors."""
+    def __init__(self, log, loop_hz=100, arm=False, throttle=0.0):
+        self.log = log
+        self.clock = SimClock(log.t_us[0] if len(log) else 0)
+        self.sensors = ReplaySensors(log)
+        self.motors = CaptureMotors()
+        self.fc = FlightComputer(loop_hz=loop_hz, sensors=self.sensors,
+                                 motors=self.motors, clock=self.clock)
+        self.fc.set_telemetry_sink(None)
+        if arm:
+            self.fc.arm()
+            self.fc.set_throttle(throttle)
+
+    def run(self, start=0, count=None):
+        log = self.log
+        end = len(log) if count is None else min(len(log), start + count)
+        n = max(0, end - start)
+        w = len(OUTPUT_FIELDS)
+        data = array('f', [0.0]) * (n * w)
+        clock = self.clock
+        sensors = self.sensors
+        step = self.fc.step
+        t = log.t_us
+        k = 0
+        for i in range(start, end):
+            clock.now = t[i]
+            sensors.index = i
+            o = step()
+            m = o.mix
+            data[k] = o.dt
+            data[k + 1] = o.roll_deg
+            data[k + 2] = o.pitch_deg
+            data[k + 3] = o.yaw_deg
+            data[k + 4] = o.yaw_rate_dps
+            data[k + 5] = o.u_roll
+            data[k + 6] = o.u_pitch
+            data[k + 7] = o.u_yaw
+            data[k + 8] = o.throttle
+            data[k + 9] = m[0]
+            data[k + 10] = m[1]
+            data[k + 11] = m[2]
+            data[k + 12] = m[3]
+            data[k + 13] = _NAN if o.alt_m is None else o.alt_m
+            k += w
+        return ReplayResult(data, n)
+
+
+def run_replay(log, loop_hz=100, arm=False, throttle=0.0):
+    """Replay a whole log through a fresh FlightComputer; returns ReplayResult."""
+    return SilRig(log, loop_hz=loop_hz, arm=arm, throttle=throttle).run()
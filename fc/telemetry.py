@@ -0,0 +1,240 @@
+"""Non-blocking binary telemetry.
+
+The control loop commits fixed-layout 64-byte records into a preallocated ring
+buffer (no string formatting, no I/O). A low-priority drain later copies the
+pending records to USB serial or UDP, optionally decimated, and never waits
+for the link: if the sink is not ready the records stay queued, and when the
+ring is full the oldest records are overwritten.
+
+Record layout (little-endian):
+    u8  magic (0xA5)
+    u8  type (REC_*)
+    u16 seq
+    u32 ts_us (ticks_us(), 30-bit)
+    f32 x 14 values (meaning depends on type, see *_FIELDS)
+"""
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+try:
+    import select
+except ImportError:
+    select = None
+
+import sys
+
+REC_MAGIC = 0xA5
+REC_OUTPUTS = 1
+REC_STATS = 2
+
+REC_HEADER_FMT = '<BBHI'
+REC_HEADER_SIZE = 8
+REC_NVALUES = 14
+REC_SIZE = REC_HEADER_SIZE + 4 * REC_NVALUES  # 64 bytes
+# Whole record in one pack_into(): header and values
+REC_FMT = '<BBHI%df' % REC_NVALUES
+# MicroPython's ticks_us() period; a small int, unlike 0xFFFFFFFF. On the
+# desktop it wraps perf_counter() microseconds into the same range.
+_TICKS_MASK = const(0x3FFFFFFF)
+
+OUTPUT_FIELDS = (
+    'dt', 'roll_deg', 'pitch_deg', 'yaw_deg', 'yaw_rate_dps',
+    'u_roll', 'u_pitch', 'u_yaw', 'throttle',
+    'm_l1', 'm_l2', 'm_r1', 'm_r2', 'alt_m',
+)
+STATS_FIELDS = (
+    'loops', 'overruns', 'busy_mean_us', 'busy_max_us', 'period_max_us',
+    'sensors_us', 'ahrs_us', 'pid_us', 'mixer_us', 'motors_us', 'led_us',
+    'jitter_gt_1ms', 'dropped', 'reserved',
+)
+_FIELDS = {REC_OUTPUTS: OUTPUT_FIELDS, REC_STATS: STATS_FIELDS}
+
+
+class TelemetryRing:
+    """Single-producer/single-consumer ring of fixed-size records.
+
+    Fill `values` (array('f', 14)) in place, then call commit().
+    """
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self._buf = bytearray(capacity * REC_SIZE)
+        self._mv = memoryview(self._buf)
+        self.values = array('f', [0.0] * REC_NVALUES)
+        self._head = 0   # total records committed
+        self._tail = 0   # total records consumed
+        self._seq = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def commit(self, rtype, ts_us):
+        if self._head - self._tail >= self.capacity:
+            # Full: overwrite the oldest record
+            self._tail += 1
+            self.dropped += 1
+        off = (self._head % self.capacity) * REC_SIZE
+        # Values go through struct: MicroPython refuses to slice-assign an
+        # array('f') into a bytearray (item sizes differ). Explicit args,
+        # not *v, so no argument tuple is built.
+        v = self.values
+        struct.pack_into(REC_FMT, self._buf, off,
+                         REC_MAGIC, rtype, self._seq, ts_us & _TICKS_MASK,
+                         v[0], v[1], v[2], v[3], v[4], v[5], v[6],
+                         v[7], v[8], v[9], v[10], v[11], v[12], v[13])
+        self._seq = (self._seq + 1) & 0xFFFF
+        self._head += 1
+
+    def peek(self, max_records):
+        """Return (memoryview, count) over up to max_records contiguous records."""
+        n = self._head - self._tail
+        if n > max_records:
+            n = max_records
+        if n <= 0:
+            return None, 0
+        start = self._tail % self.capacity
+        if start + n > self.capacity:
+            n = self.capacity - start
+        off = start * REC_SIZE
+        return self._mv[off:off + n * REC_SIZE], n
+
+    def consume(self, n):
+        self._tail += n
+
+    def record_type(self, i):
+        """Type of the i-th pending record (0 = oldest)."""
+        return self._buf[((self._tail + i) % self.capacity) * REC_SIZE + 1]
+
+
+class UsbSerialWriter:
+    """Writes to USB-CDC stdout only when the host side can accept data."""
+    def __init__(self, stream=None):
+        if stream is None:
+            stream = getattr(sys.stdout, 'buffer', sys.stdout)
+        self._stream = stream
+        self._poll = None
+        if select is not None and hasattr(select, 'poll'):
+            try:
+                self._poll = select.poll()
+                self._poll.register(stream, select.POLLOUT)
+            except Exception:
+                self._poll = None
+
+    def ready(self):
+        if self._poll is None:
+            return True
+        try:
+            return bool(self._poll.poll(0))
+        except Exception:
+            return True
+
+    def write(self, data):
+        if not self.ready():
+            return 0
+        try:
+            n = self._stream.write(data)
+            return len(data) if n is None else n
+        except Exception:
+            return 0
+
+
+class UdpWriter:
+    """Sends records as UDP datagrams on a non-blocking socket."""
+    def __init__(self, sock, addr):
+        self._sock = sock
+        self._addr = addr
+        try:
+            sock.setblocking(False)
+        except Exception:
+            pass
+
+    def ready(self):
+        return True
+
+    def write(self, data):
+        try:
+            self._sock.sendto(data, self._addr)
+            return len(data)
+        except OSError:
+            return 0
+
+
+class TelemetryDrain:
+    """Low-priority consumer: forwards pending records to a writer.
+
+    decimate=N forwards every Nth REC_OUTPUTS record (stats records are always
+    sent). max_records bounds the records written per call.
+    """
+    def __init__(self, ring, writer=None, decimate=1, max_records=16):
+        self.ring = ring
+        self.writer = writer
+        self.decimate = max(1, int(decimate))
+        self.max_records = max_records
+        self._skip = 0
+        self.sent = 0
+
+    def drain(self):
+        ring = self.ring
+        w = self.writer
+        if w is None:
+            ring.consume(len(ring))
+            return 0
+        budget = self.max_records
+        sent = 0
+        while budget > 0 and len(ring):
+            if not w.ready():
+                break
+            decimated = self.decimate > 1 and ring.record_type(0) == REC_OUTPUTS
+            if decimated and self._skip:
+                # Skipping costs no I/O, so it does not count against budget
+                self._skip -= 1
+                ring.consume(1)
+                continue
+            # Without decimation send a contiguous run in one write
+            mv, n = ring.peek(1 if self.decimate > 1 else budget)
+            if w.write(mv) <= 0:
+                break
+            if decimated:
+                self._skip = self.decimate - 1
+            ring.consume(n)
+            budget -= n
+            sent += n
+        self.sent += sent
+        return sent
+
+
+def decode_records(data):
+    """Host-side decoder: bytes -> list of dicts. Resyncs on the magic byte."""
+    out = []
+    i = 0
+    n = len(data)
+    vfmt = '<%df' % REC_NVALUES
+    while i + REC_SIZE <= n:
+        if data[i] != REC_MAGIC:
+            i += 1
+            continue
+        magic, rtype, seq, ts = struct.unpack_from(REC_HEADER_FMT, data, i)
+        vals = struct.unpack_from(vfmt, data, i + REC_HEADER_SIZE)
+        names = _FIELDS.get(rtype)
+        rec = {'type': rtype, 'seq': seq, 'ts_us': ts}
+        if names:
+            for k, v in zip(names, vals):
+                rec[k] = v
+        else:
+            rec['values'] = vals
+        out.append(rec)
+        i += REC_SIZE
+    return out
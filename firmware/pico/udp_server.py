@@ -158,6 +158,35 @@ def _validate_payload(raw: str, secret: str | None) -> tuple[str, bool]:
     return payload, True
 
 
+def decode_controls(
+    msg: str,
+    auth_key: str | None,
+    expect_signature: bool,
+    *,
+    deadzone: float = 0.05,
+    expo: float = 0.2,
+) -> tuple[float, float, float, float, bool]:
+    """Authenticate, parse and shape one control datagram.
+
+    Returns (throttle, roll, pitch, yaw, signed); raises ValueError on bad packets.
+    """
+    payload, signed = _validate_payload(msg, auth_key)
+    t, r, p, y = parse_packet(payload, expect_signature=expect_signature)
+    t, r, p, y = process_controls(t, r, p, y, deadzone=deadzone, expo=expo)
+    return t, r, p, y, signed
+
+
+def connect_wlan(cfg: dict[str, str], use_ap: bool = False):
+    """Bring up Wi-Fi from a loaded credentials dict (AP or STA mode)."""
+    if use_ap:
+        ap_ssid = cfg.get("ap_ssid")
+        ap_pw = cfg.get("ap_password")
+        if not ap_ssid or not ap_pw:
+            raise RuntimeError("AP credentials missing in config")
+        return start_ap(ap_ssid, ap_pw)
+    return connect_sta(cfg["sta_ssid"], cfg["sta_password"])
+
+
 def run_server(
     *,
     port: int = UDP_PORT,
@@ -168,20 +197,10 @@ def run_server(
     config_path: str = CONFIG_PATH,
 ):
     cfg = _load_config(config_path)
-    ap_ssid = cfg.get("ap_ssid")
-    ap_pw = cfg.get("ap_password")
-    sta_ssid = cfg["sta_ssid"]
-    sta_pw = cfg["sta_password"]
     auth_key = cfg.get("udp_key")
     if expect_signature is None:
         expect_signature = bool(auth_key)
-
-    if use_ap:
-        if not ap_ssid or not ap_pw:
-            raise RuntimeError("AP credentials missing in config")
-        wlan = start_ap(ap_ssid, ap_pw)
-    else:
-        wlan = connect_sta(sta_ssid, sta_pw)
+    wlan = connect_wlan(cfg, use_ap)
 
     addr = ("0.0.0.0", port)
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -238,9 +257,9 @@ def run_server(
                 s.sendto(build_ack().encode(), src)
                 continue
             try:
-                payload, signed = _validate_payload(msg, auth_key)
-                t, r, p, y = parse_packet(payload, expect_signature=expect_signature)
-                t, r, p, y = process_controls(t, r, p, y, deadzone=deadzone, expo=expo)
+                t, r, p, y, signed = decode_controls(
+                    msg, auth_key, expect_signature, deadzone=deadzone, expo=expo
+                )
                 t_out = smoother.on_valid(t)
                 last_ok_ms = now_ms
                 m1, m2, m3, m4 = quad_x_mixer(t_out, r, p, y)
@@ -1,11 +1,16 @@
 try:
     from fc.flight_computer import FlightComputer
+    from drivers import registry
 except ImportError as e:
     print("Import error:", e)
     raise
 
 if __name__ == '__main__':
     fc = FlightComputer(loop_hz=100)
+    print("Boot to armable: {} ms (hardware from {})".format(
+        fc.boot_us // 1000, getattr(fc.sensors, 'hw_source', '?')))
+    for line in registry.report():
+        print("  import", line)
     try:
         fc.run(seconds=10)  # Run for 10s; set to None for continuous
     except KeyboardInterrupt:
@@ -39,6 +39,9 @@ def main() -> int:
     # Ensure project root on path for imports
     if str(root) not in sys.path:
         sys.path.insert(0, str(root))
+    # ...and tests/ for the shared helpers (tests/fc_helpers.py)
+    if str(tests_dir) not in sys.path:
+        sys.path.insert(0, str(tests_dir))
 
     # 1) Run unittest-style tests
     suite = unittest.defaultTestLoader.discover(str(tests_dir))
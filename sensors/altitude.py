@@ -0,0 +1,57 @@
+"""Pressure -> altitude without pow() in the loop.
+
+The ISA formula h = 44330 * (1 - (p / p0) ** 0.1903) costs a soft-float pow
+on the RP2040 (no FPU). AltitudeLUT tabulates it once over the pressure ratio
+r = p / p0 and linearly interpolates: one multiply to form r, one index and
+one lerp per read.
+
+Default table: 250 segments over r = 0.60..1.10 (about -810 m to +4100 m
+relative to p0), 1 KB of float32. Maximum error against the exact formula is
+8.6 mm over that range (worst near r = 0.60, where the curve bends most); see
+benchmarks/altitude_bench.py. r = 1.0 is a table knot, so p0 itself reads 0 m.
+Outside the table the exact formula is used.
+"""
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+SEA_LEVEL_PA = 101325.0
+_K = 44330.0
+_E = 0.1903
+
+
+def altitude_exact(p_pa, p0_pa=SEA_LEVEL_PA):
+    """ISA altitude in metres of pressure p_pa above the p0_pa reference."""
+    return _K * (1.0 - (p_pa / p0_pa) ** _E)
+
+
+class AltitudeLUT:
+    """Table-interpolated ISA altitude with a settable reference pressure.
+
+    p0_pa defaults to sea level (altitude_m is then MSL); set_ground() with
+    the pressure at take-off gives height above ground.
+    """
+    def __init__(self, p0_pa=SEA_LEVEL_PA, r_min=0.60, r_max=1.10, segments=250):
+        self.r_min = r_min
+        self.r_max = r_max
+        self.segments = segments
+        self._step = (r_max - r_min) / segments
+        self._inv_step = segments / (r_max - r_min)
+        self._h = array('f', [_K * (1.0 - (r_min + i * self._step) ** _E)
+                              for i in range(segments + 1)])
+        self.set_ground(p0_pa)
+
+    def set_ground(self, p0_pa):
+        self.p0_pa = float(p0_pa)
+        self._inv_p0 = 1.0 / self.p0_pa
+
+    def altitude(self, p_pa):
+        r = p_pa * self._inv_p0
+        x = (r - self.r_min) * self._inv_step
+        if x < 0.0 or x >= self.segments:
+            return _K * (1.0 - r ** _E)
+        i = int(x)
+        h = self._h
+        h0 = h[i]
+        return h0 + (h[i + 1] - h0) * (x - i)
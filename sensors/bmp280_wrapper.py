@@ -5,85 +5,159 @@ except ImportError:
 
 import math
 
-try:
-    from drivers.bmp280 import BMP280 as BMP280Driver
-except ImportError:
-    BMP280Driver = None
+# The BMP280 driver is imported on demand, once its chip ID answers
+from drivers import registry
+
+from . import hw_cache
+from .sample import (SensorSample, ticks_us, VALID_BARO_TEMP, VALID_PRESSURE,
+                     VALID_ALTITUDE, VALID_BARO)
+from .altitude import AltitudeLUT
+
+BMP280_OS_ULTRAHIGH = 4  # drivers.bmp280.BMP280_OS_ULTRAHIGH
 
-DEFAULT_ADDRS = (0x76, 0x77)
 
 class Bmp280Sensor:
-    def __init__(self, i2c, addr=None):
+    def __init__(self, i2c, addr=None, hw=None):
+        """hw: hw_cache entry from a previous boot; a matching chip ID
+        builds the recorded driver directly. Otherwise the chip ID is read
+        at addr (default 0x76, then 0x77). self.hw is the entry for the
+        chip in use (None when simulated)."""
         self._i2c = i2c
         self._driver = None
         self._addr = addr
-        # Only attempt driver usage if the driver module is available AND we have an I2C object
-        if BMP280Driver is not None and self._i2c is not None:
-            # Pick address if not specified
-            if self._addr is None:
-                try:
-                    found = set(self._i2c.scan())
-                except Exception:
-                    found = set()
-                pick = next((a for a in DEFAULT_ADDRS if a in found), None)
-                self._addr = pick if pick is not None else DEFAULT_ADDRS[0]
-            # Try common constructor signatures
-            try:
-                self._driver = BMP280Driver(self._i2c, addr=self._addr)
-            except TypeError:
-                try:
-                    self._driver = BMP280Driver(self._i2c)
-                except Exception:
-                    self._driver = None
+        self._scratch = SensorSample()
+        self.split_phase = False
+        self.alt = AltitudeLUT()
+        self.hw = None
+        self.hw_cached = False
+        if i2c is None:
+            return
+        sp = registry.spec('bmp280')
+        if hw is not None and addr is None and hw.get('lib') == sp.lib and hw_cache.verify(i2c, hw):
+            drv, _ = registry.create(i2c, sp, hw['addr'], hw.get('ctor'))
+            if drv is not None:
+                self._driver = drv
+                self._addr = hw['addr']
+                self.hw = hw
+                self.hw_cached = True
+                return
+        found = registry.identify(i2c, registry.BARO, addr)
+        if found is None:
+            return
+        sp, a, who = found
+        drv, ctor_name = registry.create(i2c, sp, a)
+        if drv is not None:
+            self._driver = drv
+            self._addr = a
+            self.hw = hw_cache.entry(sp.lib, ctor_name, a, sp.id_reg, who)
 
     def read(self):
         # Returns dict: temperature_c, pressure_pa, altitude_m
+        s = self.read_into(self._scratch)
+        v = s.valid
+        return {
+            'temperature_c': s.temperature_c if v & VALID_BARO_TEMP else None,
+            'pressure_pa': s.pressure_pa if v & VALID_PRESSURE else None,
+            'altitude_m': s.altitude_m if v & VALID_ALTITUDE else None,
+        }
+
+    def read_into(self, s):
+        """Update s.temperature_c/pressure_pa/altitude_m in place and return s.
+
+        Sets the VALID_BARO_* bits of s.valid and stamps s.baro_us.
+        """
         if self._driver:
             t = None
             p = None
             try:
-                t = getattr(self._driver, 'temperature', None)
-                p = getattr(self._driver, 'pressure', None)
-                if callable(t):
-                    t = t()
-                if callable(p):
-                    p = p()
+                measure = getattr(self._driver, 'measure', None)
+                if measure is not None:
+                    # One coherent conversion (cached until the next one)
+                    t, p = measure()
+                else:
+                    t = getattr(self._driver, 'temperature', None)
+                    p = getattr(self._driver, 'pressure', None)
+                    if callable(t):
+                        t = t()
+                    if callable(p):
+                        p = p()
             except Exception:
                 t = None
                 p = None
-            # Normalize units
-            # Normalize type if it's a number
-            if isinstance(p, (int, float)):
-                p = float(p)
-            else:
-                p = None
-            if p is not None:
-                # If hPa, convert to Pa
-                try:
-                    if p < 2000.0:
-                        p = p * 100.0
-                except Exception:
-                    pass
-            alt = None
-            if p is not None:
-                # Barometric formula (ISA)
-                try:
-                    alt = 44330.0 * (1.0 - (p / 101325.0) ** 0.1903)
-                except Exception:
-                    alt = None
-            return {
-                'temperature_c': t,
-                'pressure_pa': p,
-                'altitude_m': alt,
-            }
+            return self._fill(s, t, p)
         # Simulated fallback
         ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
         phase = (ms % 10000) / 10000.0
         t = 25.0 + 2.0 * math.sin(2 * math.pi * phase)
         p = 101325.0 + 200.0 * math.sin(2 * math.pi * phase)
-        alt = 44330.0 * (1.0 - (p / 101325.0) ** 0.1903)
-        return {
-            'temperature_c': t,
-            'pressure_pa': p,
-            'altitude_m': alt,
-        }
+        s.temperature_c = t
+        s.pressure_pa = p
+        s.altitude_m = self.alt.altitude(p)
+        s.valid |= VALID_BARO
+        s.baro_us = ticks_us()
+        return s
+
+    def _fill(self, s, t, p):
+        # Normalize type if it's a number
+        if isinstance(p, (int, float)):
+            p = float(p)
+        else:
+            p = None
+        if p is not None:
+            # If hPa, convert to Pa
+            try:
+                if p < 2000.0:
+                    p = p * 100.0
+            except Exception:
+                pass
+        v = s.valid & ~VALID_BARO
+        if p is not None:
+            s.pressure_pa = p
+            v |= VALID_PRESSURE
+            # Barometric formula (ISA), table-interpolated
+            try:
+                s.altitude_m = self.alt.altitude(p)
+                v |= VALID_ALTITUDE
+            except Exception:
+                pass
+        if isinstance(t, (int, float)):
+            s.temperature_c = t
+            v |= VALID_BARO_TEMP
+        s.valid = v
+        s.baro_us = ticks_us()
+        return s
+
+    def set_ground_pressure(self, p_pa):
+        """Reference pressure for altitude_m (default sea level, 101325 Pa)."""
+        self.alt.set_ground(p_pa)
+
+    # Split-phase forced mode: step_into() triggers a conversion and returns
+    # immediately; a later call collects it read_wait_ms on and starts the next.
+    def enable_split_phase(self, oversampling=BMP280_OS_ULTRAHIGH):
+        d = self._driver
+        if d is not None and hasattr(d, 'start_measurement'):
+            d.oversample(oversampling)
+            d.sleep()
+        self.split_phase = True
+
+    def disable_split_phase(self):
+        self.split_phase = False
+
+    def step_into(self, s):
+        """Advance the start/collect cycle; True when s got a new reading."""
+        d = self._driver
+        if not d or not hasattr(d, 'start_measurement'):
+            self.read_into(s)
+            return True
+        try:
+            if d.converting:
+                r = d.collect()
+                if r is None:
+                    return False
+                self._fill(s, r[0], r[1])
+                d.start_measurement()
+                return True
+            d.start_measurement()
+        except Exception:
+            pass
+        return False
@@ -0,0 +1,78 @@
+"""Local NED frame from fixed-point GPS coordinates.
+
+Fixes come in as integers (lat/lon 1e-7 deg, altitude mm). The offset from
+home is formed in integers first, which is exact, and only then scaled to
+metres with factors precomputed once per home point (cos(lat) for east).
+A 32-bit float then only has to hold a local distance, not a global
+coordinate: at 1 km from home the rounding error is below 0.1 mm, while a
+float32 latitude in degrees only resolves about half a metre.
+
+Flat-earth (equirectangular) projection: fine within a few km of home.
+
+Small-int range: MicroPython's small int holds +/-2^30 (about 1.07e9), so a
+longitude beyond about +/-107.37 deg (much of the Americas and east Asia)
+arrives from the receiver already as a heap-allocated long int, and each
+subtraction from it allocates another. The result is still exact and the
+difference from home fits a small int again, but there the per-fix
+to_ned() costs one small allocation. Latitudes (<= 9e8) always fit.
+"""
+import math
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+from .sample import VALID_GPS_POS, VALID_GPS_ALT
+
+# WGS-84 equatorial radius; metres per 1e-7 deg of latitude
+_R_EARTH_M = 6378137.0
+M_PER_E7 = _R_EARTH_M * math.pi / 180.0 * 1e-7
+
+
+class LocalFrame:
+    """North-east-down offsets (m) from a home fix given in 1e-7 deg / mm."""
+    def __init__(self, lat_e7=0, lon_e7=0, alt_mm=0):
+        self.ned = array('f', (0.0, 0.0, 0.0))
+        self.set_home(lat_e7, lon_e7, alt_mm)
+
+    def set_home(self, lat_e7, lon_e7, alt_mm=0):
+        self.home_lat_e7 = int(lat_e7)
+        self.home_lon_e7 = int(lon_e7)
+        self.home_alt_mm = int(alt_mm)
+        self.k_north = M_PER_E7
+        self.k_east = M_PER_E7 * math.cos(math.radians(lat_e7 * 1e-7))
+        self._inv_k_east = 1.0 / self.k_east if self.k_east > 1e-12 else 0.0
+
+    def to_ned(self, lat_e7, lon_e7, alt_mm=None, out=None):
+        """Fill out (default self.ned) with north, east, down in metres.
+
+        lon_e7 - home beyond +/-107.37 deg is a long-int subtraction on
+        MicroPython (one allocation per call, see module docstring).
+        """
+        if out is None:
+            out = self.ned
+        out[0] = (lat_e7 - self.home_lat_e7) * self.k_north
+        dlon = lon_e7 - self.home_lon_e7
+        # Shortest way across the antimeridian
+        if dlon > 1800000000:
+            dlon -= 3600000000
+        elif dlon < -1800000000:
+            dlon += 3600000000
+        out[1] = dlon * self.k_east
+        out[2] = 0.0 if alt_mm is None else (self.home_alt_mm - alt_mm) * 0.001
+        return out
+
+    def from_ned(self, north_m, east_m):
+        """Inverse for waypoints: (lat_e7, lon_e7) of a NED offset from home."""
+        lat = self.home_lat_e7 + int(round(north_m / self.k_north))
+        lon = self.home_lon_e7 + int(round(east_m * self._inv_k_east))
+        return lat, lon
+
+    def sample_ned(self, s, out=None):
+        """to_ned() for a SensorSample's gps_* fields; None without a position."""
+        v = s.valid
+        if not v & VALID_GPS_POS:
+            return None
+        return self.to_ned(s.gps_lat_e7, s.gps_lon_e7,
+                           s.gps_alt_mm if v & VALID_GPS_ALT else None, out)
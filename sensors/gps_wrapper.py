@@ -12,16 +12,23 @@ try:
 except Exception:
 	NEO6M = None  # type: ignore
 
+from .sample import (ticks_us, VALID_GPS_POS, VALID_GPS_ALT, VALID_GPS_SPEED,
+	VALID_GPS)
+
 
 class GpsSensor:
 	def __init__(self, uart=None):
 		self._gps = NEO6M(uart=uart) if NEO6M else None
+		self._stale = True
+
+	def configure_ubx(self, rate_hz: float = 5, **kw) -> bool:
+		"""Switch the receiver to binary UBX output (see NEO6M.configure_ubx)."""
+		return self._gps.configure_ubx(rate_hz, **kw) if self._gps else False
 
 	def read(self) -> Dict[str, Any]:
 		if self._gps:
-			# Poll up to a couple lines and then return the current fix snapshot
-			for _ in range(2):
-				self._gps.poll()
+			# Drain pending UART data, then return the current fix snapshot
+			self._gps.poll()
 			return self._gps.read_fix()
 		return {
 			'type': None,
@@ -31,3 +38,64 @@ class GpsSensor:
 			'alt_m': None,
 			'sats': 0,
 		}
+
+	def read_into(self, s):
+		"""Update the gps_* fields of s in place; only rebuilds the fix when
+		new sentences arrived since the last call (then stamps s.gps_us).
+		Fields the receiver did not report keep their value with their
+		VALID_GPS_* bit cleared."""
+		if self._gps:
+			if self._gps.poll() is not None:
+				self._stale = True
+			if not self._stale:
+				return s
+			self._stale = False
+			s.gps_us = ticks_us()
+			nav = getattr(self._gps, 'nav', None)
+			if nav is not None and nav.have_pos:
+				# UBX: integers straight from the receiver, no fix dict.
+				# Without a 2D/3D fix the position is zero or stale: keep
+				# the previous values and clear their bits
+				fix = nav.fix_ok and nav.fix_type >= 2
+				s.gps_has_fix = fix
+				s.gps_sats = nav.num_sv
+				if not fix:
+					s.valid &= ~VALID_GPS
+					return s
+				s.gps_lat_e7 = nav.lat_e7
+				# A long int beyond +/-107.37 deg on MicroPython (see sensors/geo.py)
+				s.gps_lon_e7 = nav.lon_e7
+				s.gps_alt_mm = nav.hmsl_mm
+				s.gps_speed_mm_s = nav.gspeed_mm_s
+				s.gps_lat = nav.lat_e7 * 1e-7
+				s.gps_lon = nav.lon_e7 * 1e-7
+				s.gps_alt_m = nav.hmsl_mm / 1000.0
+				s.valid |= VALID_GPS
+				return s
+			fix = self._gps.read_fix()
+			s.gps_has_fix = fix.get('has_fix', False)
+			s.gps_sats = fix.get('sats', 0)
+			v = s.valid & ~VALID_GPS
+			lat_e7 = fix.get('lat_e7')
+			lon_e7 = fix.get('lon_e7')
+			if lat_e7 is not None and lon_e7 is not None:
+				s.gps_lat_e7 = lat_e7
+				s.gps_lon_e7 = lon_e7
+				s.gps_lat = fix.get('lat')
+				s.gps_lon = fix.get('lon')
+				v |= VALID_GPS_POS
+			alt_mm = fix.get('alt_mm')
+			if alt_mm is not None:
+				s.gps_alt_mm = alt_mm
+				s.gps_alt_m = fix.get('alt_m')
+				v |= VALID_GPS_ALT
+			speed = fix.get('speed_mm_s')
+			if speed is not None:
+				s.gps_speed_mm_s = speed
+				v |= VALID_GPS_SPEED
+			s.valid = v
+			return s
+		s.gps_has_fix = False
+		s.gps_sats = 0
+		s.valid &= ~VALID_GPS
+		return s
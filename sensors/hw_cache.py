@@ -0,0 +1,58 @@
+"""Persisted hardware discovery.
+
+The first boot probes the bus as before and records what it found in a small
+JSON file on flash. For each device the file stores the driver module and
+class, the I2C address and the ID register with the value it returned.
+Later boots read that back, check each device with one ID-register read and
+construct the recorded driver directly. A missing file or any mismatch
+falls back to the full probe, which rewrites the file.
+"""
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+from drivers.registry import read_id
+
+HW_CACHE_PATH = 'hw_cache.json'
+HW_CACHE_VERSION = 1
+
+
+def load(path=HW_CACHE_PATH):
+    """Recorded devices ({'imu': entry, 'baro': entry}) or None."""
+    try:
+        with open(path, 'r') as f:
+            hw = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(hw, dict) or hw.get('version') != HW_CACHE_VERSION:
+        return None
+    return hw
+
+
+def save(hw, path=HW_CACHE_PATH):
+    """Write the discovery record; False if the filesystem refused."""
+    rec = {'version': HW_CACHE_VERSION}
+    for k in hw:
+        if hw[k] is not None:
+            rec[k] = hw[k]
+    try:
+        with open(path, 'w') as f:
+            f.write(json.dumps(rec))
+        return True
+    except OSError:
+        return False
+
+
+def entry(lib, ctor, addr, id_reg, who):
+    return {'lib': lib, 'ctor': ctor, 'addr': addr, 'id_reg': id_reg, 'who': who}
+
+
+def verify(i2c, e):
+    """True when the recorded device still answers with the recorded ID."""
+    if i2c is None or not e:
+        return False
+    try:
+        return read_id(i2c, e['addr'], e['id_reg']) == e['who']
+    except (KeyError, TypeError):
+        return False
@@ -0,0 +1,245 @@
+"""Persisted IMU calibration.
+
+Gyro bias is the mean rate over a stretch of samples taken at rest; a
+streaming Welford mean/variance rejects the stretch (and starts over) as soon
+as the board moves. Accel offset and scale come from the 6-position method:
+the still average with each axis pointing up and down gives, per axis,
+offset = (up + down) / 2 and scale = 2 / (up - down).
+
+The result is a small JSON file on flash. ImuSensor.set_calibration() hands
+it to the driver, which converts it once into raw-count offsets and per-axis
+multipliers used by its decode (read_all(), read_fifo()).
+"""
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+try:
+    import utime as time
+except ImportError:
+    import time
+
+from .sample import SensorSample, VALID_ACCEL, VALID_GYRO
+
+IMU_CAL_PATH = 'imu_cal.json'
+IMU_CAL_VERSION = 1
+
+# Orientation slots for AccelSixPosition: axis * 2 + (0 up, 1 down)
+POSITIONS = ('+X up', '-X up', '+Y up', '-Y up', '+Z up', '-Z up')
+
+
+class Welford3:
+    """Streaming mean and variance of three channels."""
+    def __init__(self):
+        self.mean = [0.0, 0.0, 0.0]
+        self._m2 = [0.0, 0.0, 0.0]
+        self.n = 0
+
+    def reset(self):
+        m = self.mean
+        m2 = self._m2
+        for i in range(3):
+            m[i] = 0.0
+            m2[i] = 0.0
+        self.n = 0
+
+    def add(self, x, y, z):
+        n = self.n + 1
+        self.n = n
+        m = self.mean
+        m2 = self._m2
+        d = x - m[0]; m[0] += d / n; m2[0] += d * (x - m[0])
+        d = y - m[1]; m[1] += d / n; m2[1] += d * (y - m[1])
+        d = z - m[2]; m[2] += d / n; m2[2] += d * (z - m[2])
+
+    def var(self, i):
+        return self._m2[i] / (self.n - 1) if self.n > 1 else 0.0
+
+    def max_std(self):
+        return max(0.0, self.var(0), self.var(1), self.var(2)) ** 0.5
+
+
+class _Still:
+    """Averages `samples` consecutive readings, restarting on motion: a
+    reading more than max_dev from the running mean, or a finished window
+    whose standard deviation exceeds max_std. rejected counts restarts."""
+    def __init__(self, samples, max_std, max_dev):
+        self.samples = samples
+        self.max_std = max_std
+        self.max_dev = max_dev
+        self.w = Welford3()
+        self.rejected = 0
+
+    def reset(self):
+        self.w.reset()
+
+    def add(self, x, y, z):
+        """True once a still window is complete (mean in self.w.mean)."""
+        w = self.w
+        if w.n:
+            m = w.mean
+            d = self.max_dev
+            if abs(x - m[0]) > d or abs(y - m[1]) > d or abs(z - m[2]) > d:
+                self.rejected += 1
+                w.reset()
+                return False
+        w.add(x, y, z)
+        if w.n < self.samples:
+            return False
+        if w.max_std() > self.max_std:
+            self.rejected += 1
+            w.reset()
+            return False
+        return True
+
+
+class GyroBias(_Still):
+    """Gyro bias (dps) from samples taken at rest."""
+    def __init__(self, samples=500, max_std_dps=0.25, max_dev_dps=2.0):
+        _Still.__init__(self, samples, max_std_dps, max_dev_dps)
+        self.bias = None
+
+    def add(self, gx, gy, gz):
+        if self.bias is not None:
+            return True
+        if not _Still.add(self, gx, gy, gz):
+            return False
+        m = self.w.mean
+        self.bias = (m[0], m[1], m[2])
+        return True
+
+
+class AccelSixPosition(_Still):
+    """Accel offset (g) and scale from the board resting on each face.
+
+    Feed readings with add(); each still window is classified by its
+    dominant axis and stored in that orientation's slot (overwriting an
+    earlier capture). missing() lists what is left; result() gives
+    (offset, scale) once all six are in.
+    """
+    def __init__(self, samples=200, max_std_g=0.01, max_dev_g=0.05, min_g=0.8):
+        _Still.__init__(self, samples, max_std_g, max_dev_g)
+        self.min_g = min_g
+        self.means = [None] * 6
+
+    def add(self, ax, ay, az):
+        """Slot index of a newly captured position, else None."""
+        if not _Still.add(self, ax, ay, az):
+            return None
+        m = tuple(self.w.mean)
+        self.w.reset()
+        i = 0
+        if abs(m[1]) > abs(m[i]):
+            i = 1
+        if abs(m[2]) > abs(m[i]):
+            i = 2
+        if abs(m[i]) < self.min_g:
+            return None  # tilted: no axis carries gravity
+        slot = i * 2 + (0 if m[i] > 0 else 1)
+        self.means[slot] = m
+        return slot
+
+    def missing(self):
+        return [POSITIONS[i] for i in range(6) if self.means[i] is None]
+
+    def result(self):
+        """((ox, oy, oz), (sx, sy, sz)) or None until every slot is filled."""
+        if self.missing():
+            return None
+        off = []
+        scale = []
+        for i in range(3):
+            up = self.means[i * 2][i]
+            down = self.means[i * 2 + 1][i]
+            off.append((up + down) * 0.5)
+            scale.append(2.0 / (up - down))
+        return tuple(off), tuple(scale)
+
+
+def record(lib=None, gyro_bias_dps=None, accel_offset_g=None, accel_scale=None):
+    """Calibration record as stored on flash (missing parts stay None)."""
+    return {'lib': lib,
+            'gyro_bias_dps': list(gyro_bias_dps) if gyro_bias_dps else None,
+            'accel_offset_g': list(accel_offset_g) if accel_offset_g else None,
+            'accel_scale': list(accel_scale) if accel_scale else None}
+
+
+def _vec_ok(v):
+    return v is None or (isinstance(v, list) and len(v) == 3)
+
+
+def load(path=IMU_CAL_PATH):
+    """The stored calibration record, or None."""
+    try:
+        with open(path, 'r') as f:
+            cal = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cal, dict) or cal.get('version') != IMU_CAL_VERSION:
+        return None
+    for k in ('gyro_bias_dps', 'accel_offset_g', 'accel_scale'):
+        if not _vec_ok(cal.get(k)):
+            return None
+    return cal
+
+
+def save(cal, path=IMU_CAL_PATH):
+    """Write the calibration record; False if the filesystem refused."""
+    rec = {'version': IMU_CAL_VERSION}
+    for k in cal:
+        rec[k] = cal[k]
+    try:
+        with open(path, 'w') as f:
+            f.write(json.dumps(rec))
+        return True
+    except OSError:
+        return False
+
+
+def _sleep_ms(ms):
+    if hasattr(time, 'sleep_ms'):
+        time.sleep_ms(ms)
+    else:
+        time.sleep(ms / 1000.0)
+
+
+def calibrate_gyro(imu, est=None, max_reads=5000, period_ms=2):
+    """Estimate the gyro bias with the board at rest; None if it kept moving
+    for max_reads samples. The driver's gyro correction is cleared first and
+    the accel part of imu.cal kept; the new bias is not applied here."""
+    est = est or GyroBias()
+    prev = imu.cal
+    cal = prev or {}
+    imu.set_calibration(record(cal.get('lib'), None, cal.get('accel_offset_g'),
+                               cal.get('accel_scale')))
+    s = SensorSample()
+    try:
+        for _ in range(max_reads):
+            imu.read_into(s)
+            if s.valid & VALID_GYRO:
+                g = s.gyro_dps
+                if est.add(g[0], g[1], g[2]):
+                    return est.bias
+            _sleep_ms(period_ms)
+        return None
+    finally:
+        imu.set_calibration(prev)
+
+
+def capture_accel(imu, est, max_reads=5000, period_ms=2):
+    """Read until est captures one still position; its slot, or None.
+
+    Call with the driver's accel correction cleared
+    (imu.set_calibration(None)) so the raw readings are captured.
+    """
+    s = SensorSample()
+    for _ in range(max_reads):
+        imu.read_into(s)
+        if s.valid & VALID_ACCEL:
+            a = s.accel_g
+            slot = est.add(a[0], a[1], a[2])
+            if slot is not None:
+                return slot
+        _sleep_ms(period_ms)
+    return None
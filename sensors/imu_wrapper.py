@@ -5,102 +5,342 @@ except ImportError:
 
 import math
 
-# Try ICM-20948 first (prefer local drivers.icm20948)
 try:
-    from drivers import icm20948 as icm20948_mod
-except Exception:
-    try:
-        icm20948_mod = __import__('icm20948')
-    except Exception:
-        icm20948_mod = None
-
-# Then fall back to MPU9250 (prefer drivers package, then plain module)
-try:
-    from drivers import mpu9250 as mpu9250_mod
-except Exception:
-    try:
-        mpu9250_mod = __import__('mpu9250')
-    except Exception:
-        mpu9250_mod = None
+    from machine import Pin
+except ImportError:
+    Pin = None
+
+# IMU drivers are imported on demand, once their WHO_AM_I answers
+from drivers import registry
+
+from . import hw_cache
+from .sample import (SensorSample, ticks_us as _ticks_us, VALID_ACCEL, VALID_GYRO,
+                     VALID_MAG, VALID_IMU_TEMP, VALID_IMU)
+
+_NAN = float('nan')
+_IMU_ALL = VALID_IMU | VALID_MAG | VALID_IMU_TEMP
+
+
+def _set3(v, x, y, z):
+    # Missing axes (driver returned None) become NaN rather than a new tuple;
+    # returns True when all three were present
+    v[0] = _NAN if x is None else x
+    v[1] = _NAN if y is None else y
+    v[2] = _NAN if z is None else z
+    return x is not None and y is not None and z is not None
+
 
 class ImuSensor:
-    def __init__(self, i2c):
+    def __init__(self, i2c, hw=None):
+        """hw: hw_cache entry from a previous boot; when the device still
+        answers with the recorded WHO_AM_I the recorded driver is built
+        directly, otherwise the drivers are probed. self.hw is the entry for
+        the driver in use (None when simulated)."""
         self._i2c = i2c
         self._drv = None
         self._lib = None
-        # Try ICM-20948 drivers with common signatures
-        if icm20948_mod is not None:
-            for ctor_name in ('ICM20948', 'ICM20948_I2C', 'ICM20948i2c'):
-                try:
-                    ctor = getattr(icm20948_mod, ctor_name)
-                except Exception:
-                    ctor = None
-                if ctor:
-                    try:
-                        self._drv = ctor(i2c)
-                        self._lib = 'icm20948'
-                        break
-                    except Exception:
-                        pass
-        # Try MPU9250
-        if self._drv is None and mpu9250_mod is not None:
-            for ctor_name in ('MPU9250', 'Mpu9250'):
-                try:
-                    ctor = getattr(mpu9250_mod, ctor_name)
-                except Exception:
-                    ctor = None
-                if ctor:
-                    try:
-                        self._drv = ctor(i2c)
-                        self._lib = 'mpu9250'
-                        break
-                    except Exception:
-                        pass
+        self._scratch = SensorSample()
+        self.hw = None
+        self.cal = None  # imu_cal record applied in the driver decode
+        self.hw_cached = hw is not None and self._from_cache(i2c, hw)
+        if not self.hw_cached:
+            self._probe(i2c)
+        # Burst read (accel+temp+gyro in one transaction) when the driver has it
+        self._read_all = getattr(self._drv, 'read_all', None) if self._drv is not None else None
+        self._has_mag = self._lib == 'mpu9250' and getattr(self._drv, 'has_mag', True)
+        self._read_mag = getattr(self._drv, 'read_mag', None) if self._has_mag else None
+        self.mag_enabled = True  # SensorHub clears it when nobody reads mag_uT
+        # FIFO mode (enable_fifo): every sample since the last read
+        self._fifo = False
+        self.fifo_n = 0
+        self.fifo_samples = None
+        # Data-ready IRQ mode (enable_irq)
+        self._irq_pin = None
+        self._on_ready = None
+        self.irq_count = 0
+        self.irq_ts_us = 0      # edge time of the newest data-ready pulse
+        self.sample_ts_us = 0   # edge time of the sample last read
+        self.missed = 0         # data-ready pulses not followed by a read
+        self._irq_seen = 0
+
+    def _probe(self, i2c):
+        # Identify the chip by WHO_AM_I, then import and build its driver only
+        found = registry.identify(i2c, registry.IMU)
+        if found is None:
+            return
+        sp, addr, who = found
+        drv, ctor_name = registry.create(i2c, sp, addr)
+        if drv is None:
+            return
+        self._drv = drv
+        self._lib = sp.lib
+        self.hw = hw_cache.entry(sp.lib, ctor_name, addr, sp.id_reg, who)
+
+    def _from_cache(self, i2c, e):
+        sp = registry.spec(e.get('lib'))
+        if sp is None or sp.kind != registry.IMU or not hw_cache.verify(i2c, e):
+            return False
+        drv, _ = registry.create(i2c, sp, e['addr'], e.get('ctor'))
+        if drv is None:
+            return False
+        self._drv = drv
+        self._lib = sp.lib
+        self.hw = e
+        return True
+
+    def set_calibration(self, cal):
+        """Apply an imu_cal record (None clears it) in the driver's decode.
+
+        Returns False when the driver cannot correct its samples or the
+        record was made on a different IMU; the driver is then left
+        uncalibrated.
+        """
+        self.cal = None
+        fn = getattr(self._drv, 'set_calibration', None) if self._drv is not None else None
+        if fn is None:
+            return False
+        if cal is None or cal.get('lib') not in (None, self._lib):
+            fn()
+            return cal is None
+        fn(cal.get('gyro_bias_dps'), cal.get('accel_offset_g'), cal.get('accel_scale'))
+        self.cal = cal
+        return True
+
+    def enable_irq(self, pin, rate_hz=None, on_ready=None, active_low=False):
+        """Sample on the IMU data-ready interrupt.
+
+        pin: GPIO number (config.pins.IMU_INT_PIN) or a Pin-like object with
+        irq(). The handler is registered as a hard IRQ where the port
+        supports it, so it must not allocate; on_ready is called from it.
+        Each edge stamps irq_ts_us and calls on_ready(ts_us) so the
+        control task can run phase-locked to fresh data; read_into() then
+        records the edge time in sample_ts_us. Returns False without an IRQ
+        capable driver/pin.
+        """
+        enable = getattr(self._drv, 'enable_data_ready_int', None) if self._drv is not None else None
+        if enable is None:
+            return False
+        if isinstance(pin, int):
+            if Pin is None:
+                return False
+            pin = Pin(pin, Pin.IN)
+        enable(rate_hz, active_low)
+        self._on_ready = on_ready
+        self._irq_seen = self.irq_count
+        trigger = None
+        if Pin is not None:
+            trigger = Pin.IRQ_FALLING if active_low else Pin.IRQ_RISING
+        try:
+            # Hard IRQ: _irq runs at the edge rather than whenever the VM
+            # next schedules it, so irq_ts_us is the data-ready time
+            pin.irq(trigger=trigger, handler=self._irq, hard=True)
+        except TypeError:
+            # Port without hard= (soft IRQ only)
+            pin.irq(trigger=trigger, handler=self._irq)
+        self._irq_pin = pin
+        return True
+
+    def disable_irq(self):
+        if self._irq_pin is None:
+            return
+        self._irq_pin.irq(handler=None)
+        self._irq_pin = None
+        self._on_ready = None
+        self._drv.disable_data_ready_int()
+
+    def _irq(self, _pin):
+        # Hard ISR: timestamp and notify only, no allocation; the bus read
+        # happens in the task
+        self.irq_ts_us = _ticks_us()
+        self.irq_count += 1
+        cb = self._on_ready
+        if cb is not None:
+            cb(self.irq_ts_us)
+
+    def enable_fifo(self, rate_hz=1000, max_samples=32):
+        """Switch to hardware-FIFO reads if the driver supports them.
+
+        read_into() then averages all samples queued since the previous call
+        (oversampling); the raw samples are left in fifo_samples
+        (ax, ay, az, gx, gy, gz per sample, fifo_n of them) for filters that
+        run at the sensor rate. Returns the sample rate, or None.
+        """
+        enable = getattr(self._drv, 'enable_fifo', None) if self._drv is not None else None
+        if enable is None:
+            return None
+        rate = enable(rate_hz, max_samples)
+        self.fifo_samples = self._drv.fifo_data
+        self._fifo = True
+        return rate
+
+    def disable_fifo(self):
+        if self._fifo:
+            self._drv.disable_fifo()
+        self._fifo = False
+        self.fifo_n = 0
+        self.fifo_samples = None
+
+    def _mag_into(self, s):
+        rm = self._read_mag
+        if rm is None:
+            mx, my, mz = self._drv.mag
+            if _set3(s.mag_uT, mx, my, mz):
+                s.valid |= VALID_MAG
+            else:
+                s.valid &= ~VALID_MAG
+            return
+        # The AK8963 updates at 100 Hz, so a faster loop mostly finds no new
+        # sample (read_mag() -> None): keep the last field and its valid bit.
+        # Only a failed bus transaction invalidates it.
+        try:
+            if rm(s.mag_uT) is not None:
+                s.valid |= VALID_MAG
+        except OSError:
+            s.valid &= ~VALID_MAG
+
+    def _read_fifo_into(self, s):
+        n = self._drv.read_fifo()
+        self.fifo_n = n
+        if n == 0:
+            return s  # nothing new; keep the previous sample
+        d = self.fifo_samples
+        ax = ay = az = gx = gy = gz = 0.0
+        for i in range(0, n * 6, 6):
+            ax += d[i]; ay += d[i + 1]; az += d[i + 2]
+            gx += d[i + 3]; gy += d[i + 4]; gz += d[i + 5]
+        k = 1.0 / n
+        a = s.accel_g
+        a[0] = ax * k; a[1] = ay * k; a[2] = az * k
+        g = s.gyro_dps
+        g[0] = gx * k; g[1] = gy * k; g[2] = gz * k
+        s.valid |= VALID_IMU
+        s.imu_us = self._stamp()
+        return s
 
     def read(self):
         # Returns dict: accel_g(x,y,z), gyro_dps(x,y,z), mag_uT(x,y,z), temp_c
+        s = self.read_into(self._scratch)
+        return {
+            'accel_g': tuple(s.accel_g),
+            'gyro_dps': tuple(s.gyro_dps),
+            'mag_uT': tuple(s.mag_uT) if s.valid & VALID_MAG else (_NAN, _NAN, _NAN),
+            'temp_c': s.imu_temp_c if s.valid & VALID_IMU_TEMP else None,
+        }
+
+    def _stamp(self):
+        # Data-ready edge time when IRQ driven, else the time of the read
+        return self.sample_ts_us if self._irq_pin is not None else _ticks_us()
+
+    def read_into(self, s):
+        """Update s.accel_g/gyro_dps/mag_uT/imu_temp_c in place and return s.
+
+        Sets the VALID_ACCEL/GYRO/MAG/IMU_TEMP bits of s.valid and stamps
+        s.imu_us. If the driver's reads fail, the bits are cleared and the
+        previous values left in place; simulated data is only produced when
+        no driver was found.
+        """
+        if self._irq_pin is not None:
+            n = self.irq_count
+            if n - self._irq_seen > 1:
+                self.missed += n - self._irq_seen - 1
+            self._irq_seen = n
+            self.sample_ts_us = self.irq_ts_us
+        if self._fifo:
+            try:
+                self._read_fifo_into(s)
+                if self._has_mag and self.mag_enabled:
+                    self._mag_into(s)
+                else:
+                    s.valid &= ~VALID_MAG
+                return s
+            except Exception:
+                pass
+        if self._read_all is not None:
+            try:
+                d = self._read_all()
+                a = s.accel_g
+                a[0] = d[0]; a[1] = d[1]; a[2] = d[2]
+                g = s.gyro_dps
+                g[0] = d[3]; g[1] = d[4]; g[2] = d[5]
+                s.imu_temp_c = d[6]
+                s.valid |= VALID_IMU | VALID_IMU_TEMP
+                if not self._has_mag:
+                    _set3(s.mag_uT, None, None, None)
+                    s.valid &= ~VALID_MAG
+                elif self.mag_enabled:
+                    self._mag_into(s)
+                else:
+                    s.valid &= ~VALID_MAG
+                s.imu_us = self._stamp()
+                return s
+            except Exception:
+                pass
         if self._drv is not None:
             try:
                 if self._lib == 'icm20948':
                     # Try common attribute names
                     ax, ay, az = self._get_tuple(self._drv, ['accel', 'acceleration'])
                     gx, gy, gz = self._get_tuple(self._drv, ['gyro', 'gyroscope'])
-                    mx, my, mz = self._get_tuple(self._drv, ['mag', 'magnetic'])
+                    mx, my, mz = (self._get_tuple(self._drv, ['mag', 'magnetic'])
+                                  if self.mag_enabled else (None, None, None))
                     temp = self._get_scalar(self._drv, ['temperature', 'temp'])
                 elif self._lib == 'mpu9250':
                     ax, ay, az = getattr(self._drv, 'acceleration', (None, None, None))
                     gx, gy, gz = getattr(self._drv, 'gyro', (None, None, None))
-                    mx, my, mz = getattr(self._drv, 'mag', (None, None, None))
+                    mx, my, mz = (getattr(self._drv, 'mag', (None, None, None))
+                                  if self.mag_enabled and self._read_mag is None
+                                  else (None, None, None))
                     temp = getattr(self._drv, 'temperature', None)
                 else:
                     ax=ay=az=gx=gy=gz=mx=my=mz=temp=None
-                return {
-                    'accel_g': (ax, ay, az),
-                    'gyro_dps': (gx, gy, gz),
-                    'mag_uT': (mx, my, mz),
-                    'temp_c': temp,
-                }
+                v = s.valid & ~_IMU_ALL
+                if _set3(s.accel_g, ax, ay, az):
+                    v |= VALID_ACCEL
+                if _set3(s.gyro_dps, gx, gy, gz):
+                    v |= VALID_GYRO
+                if self._read_mag is not None:
+                    # Same no-new-data handling as the burst path
+                    if self.mag_enabled:
+                        s.valid = v | (s.valid & VALID_MAG)
+                        self._mag_into(s)
+                        v = s.valid
+                elif _set3(s.mag_uT, mx, my, mz):
+                    v |= VALID_MAG
+                if temp is not None:
+                    s.imu_temp_c = temp
+                    v |= VALID_IMU_TEMP
+                s.valid = v
+                s.imu_us = self._stamp()
+                return s
             except Exception:
                 pass
-        # Simulated fallback
+            # Hardware read failed: keep the previous values, marked invalid
+            s.valid &= ~_IMU_ALL
+            return s
+        # Simulated fallback (no driver at all)
         ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
         phase = (ms % 2000) / 2000.0
-        ax = 0.0 + 0.02 * math.sin(2 * math.pi * phase)
-        ay = 0.0 + 0.02 * math.cos(2 * math.pi * phase)
-        az = 1.0  # ~1g
-        gx = 0.5 * math.sin(2 * math.pi * phase)
-        gy = 0.5 * math.cos(2 * math.pi * phase)
-        gz = 0.0
-        mx = 30.0 * math.sin(2 * math.pi * phase)
-        my = 0.0
-        mz = 15.0 * math.cos(2 * math.pi * phase)
-        temp = 30.0
-        return {
-            'accel_g': (ax, ay, az),
-            'gyro_dps': (gx, gy, gz),
-            'mag_uT': (mx, my, mz),
-            'temp_c': temp,
-        }
+        w = 2 * math.pi * phase
+        a = s.accel_g
+        a[0] = 0.0 + 0.02 * math.sin(w)
+        a[1] = 0.0 + 0.02 * math.cos(w)
+        a[2] = 1.0  # ~1g
+        g = s.gyro_dps
+        g[0] = 0.5 * math.sin(w)
+        g[1] = 0.5 * math.cos(w)
+        g[2] = 0.0
+        if self.mag_enabled:
+            m = s.mag_uT
+            m[0] = 30.0 * math.sin(w)
+            m[1] = 0.0
+            m[2] = 15.0 * math.cos(w)
+            s.valid |= VALID_MAG
+        else:
+            s.valid &= ~VALID_MAG
+        s.imu_temp_c = 30.0
+        s.valid |= VALID_IMU | VALID_IMU_TEMP
+        s.imu_us = self._stamp()
+        return s
 
     def _get_tuple(self, drv, names):
         for n in names:
@@ -0,0 +1,113 @@
+"""Preallocated sensor sample shared by SensorHub and its consumers.
+
+SensorHub owns one SensorSample and the wrappers update it in place, so a
+steady-state read does not build dicts or tuples. Vector fields are
+array('f', 3) objects that are written element-wise.
+
+Scalars always hold a number; `valid` says which of them carry a real
+measurement (VALID_* bits) and imu_us/baro_us/gps_us record when each
+sensor last refreshed its fields (ticks_us). A failed read clears the bit
+and leaves the previous value in place.
+"""
+try:
+    import utime as time
+except ImportError:
+    import time
+
+try:
+    from array import array
+except ImportError:
+    from uarray import array
+
+VALID_ACCEL = 0x001
+VALID_GYRO = 0x002
+VALID_MAG = 0x004
+VALID_IMU_TEMP = 0x008
+VALID_BARO_TEMP = 0x010
+VALID_PRESSURE = 0x020
+VALID_ALTITUDE = 0x040
+VALID_GPS_POS = 0x080     # gps_lat/lon and gps_lat_e7/lon_e7
+VALID_GPS_ALT = 0x100     # gps_alt_m / gps_alt_mm
+VALID_GPS_SPEED = 0x200   # gps_speed_mm_s
+
+VALID_IMU = VALID_ACCEL | VALID_GYRO
+VALID_BARO = VALID_BARO_TEMP | VALID_PRESSURE | VALID_ALTITUDE
+VALID_GPS = VALID_GPS_POS | VALID_GPS_ALT | VALID_GPS_SPEED
+
+
+def ticks_us():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+
+class SensorSample:
+    __slots__ = (
+        'ts_ms', 'valid', 'imu_us', 'baro_us', 'gps_us',
+        'accel_g', 'gyro_dps', 'mag_uT', 'imu_temp_c',
+        'temperature_c', 'pressure_pa', 'altitude_m',
+        'gps_has_fix', 'gps_lat', 'gps_lon', 'gps_alt_m', 'gps_sats',
+        # Fixed-point GPS: 1e-7 deg, mm, mm/s
+        'gps_lat_e7', 'gps_lon_e7', 'gps_alt_mm', 'gps_speed_mm_s',
+    )
+
+    def __init__(self):
+        self.ts_ms = 0
+        self.valid = 0
+        self.imu_us = 0
+        self.baro_us = 0
+        self.gps_us = 0
+        self.accel_g = array('f', (0.0, 0.0, 1.0))
+        self.gyro_dps = array('f', (0.0, 0.0, 0.0))
+        self.mag_uT = array('f', (0.0, 0.0, 0.0))
+        self.imu_temp_c = 0.0
+        self.temperature_c = 0.0
+        self.pressure_pa = 0.0
+        self.altitude_m = 0.0
+        self.gps_has_fix = False
+        self.gps_lat = 0.0
+        self.gps_lon = 0.0
+        self.gps_alt_m = 0.0
+        self.gps_sats = 0
+        self.gps_lat_e7 = 0
+        self.gps_lon_e7 = 0   # long int on MicroPython beyond +/-107.37 deg (2^30)
+        self.gps_alt_mm = 0
+        self.gps_speed_mm_s = 0
+
+    def has(self, bits):
+        """True when every bit in `bits` is valid."""
+        return self.valid & bits == bits
+
+    def as_dict(self):
+        """Dict snapshot in the legacy SensorHub.read() format (allocates).
+
+        Fields without a valid measurement are None, as before.
+        """
+        v = self.valid
+
+        def ok(bit, x):
+            return x if v & bit else None
+
+        return {
+            'ts_ms': self.ts_ms,
+            'valid': v,
+            'imu_us': self.imu_us,
+            'baro_us': self.baro_us,
+            'gps_us': self.gps_us,
+            'accel_g': tuple(self.accel_g),
+            'gyro_dps': tuple(self.gyro_dps),
+            'mag_uT': tuple(self.mag_uT),
+            'imu_temp_c': ok(VALID_IMU_TEMP, self.imu_temp_c),
+            'temperature_c': ok(VALID_BARO_TEMP, self.temperature_c),
+            'pressure_pa': ok(VALID_PRESSURE, self.pressure_pa),
+            'altitude_m': ok(VALID_ALTITUDE, self.altitude_m),
+            'gps_has_fix': self.gps_has_fix,
+            'gps_lat': ok(VALID_GPS_POS, self.gps_lat),
+            'gps_lon': ok(VALID_GPS_POS, self.gps_lon),
+            'gps_alt_m': ok(VALID_GPS_ALT, self.gps_alt_m),
+            'gps_sats': self.gps_sats,
+            'gps_lat_e7': ok(VALID_GPS_POS, self.gps_lat_e7),
+            'gps_lon_e7': ok(VALID_GPS_POS, self.gps_lon_e7),
+            'gps_alt_mm': ok(VALID_GPS_ALT, self.gps_alt_mm),
+            'gps_speed_mm_s': ok(VALID_GPS_SPEED, self.gps_speed_mm_s),
+        }
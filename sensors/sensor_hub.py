@@ -3,34 +3,232 @@ try:
 except ImportError:
     import time
 
+from drivers import registry
 from .imu_wrapper import ImuSensor
 from .bmp280_wrapper import Bmp280Sensor
-from .gps_wrapper import GpsSensor
+from . import hw_cache as _hw_cache
+from . import imu_cal as _imu_cal
+from .sample import (SensorSample, ticks_us, VALID_ACCEL, VALID_GYRO, VALID_MAG,
+                     VALID_IMU_TEMP, VALID_BARO_TEMP, VALID_PRESSURE,
+                     VALID_ALTITUDE, VALID_GPS_POS, VALID_GPS_ALT, VALID_GPS_SPEED)
+
+SENSE_IMU = 0x1
+SENSE_BARO = 0x2
+SENSE_GPS = 0x4
+SENSE_ALL = SENSE_IMU | SENSE_BARO | SENSE_GPS
+
+# Sample field -> (sensor that refreshes it, VALID_* bit; 0 = always valid)
+FIELDS = {
+    'accel_g': (SENSE_IMU, VALID_ACCEL),
+    'gyro_dps': (SENSE_IMU, VALID_GYRO),
+    'mag_uT': (SENSE_IMU, VALID_MAG),
+    'imu_temp_c': (SENSE_IMU, VALID_IMU_TEMP),
+    'temperature_c': (SENSE_BARO, VALID_BARO_TEMP),
+    'pressure_pa': (SENSE_BARO, VALID_PRESSURE),
+    'altitude_m': (SENSE_BARO, VALID_ALTITUDE),
+    'gps_has_fix': (SENSE_GPS, 0),
+    'gps_sats': (SENSE_GPS, 0),
+    'gps_lat': (SENSE_GPS, VALID_GPS_POS),
+    'gps_lon': (SENSE_GPS, VALID_GPS_POS),
+    'gps_lat_e7': (SENSE_GPS, VALID_GPS_POS),
+    'gps_lon_e7': (SENSE_GPS, VALID_GPS_POS),
+    'gps_alt_m': (SENSE_GPS, VALID_GPS_ALT),
+    'gps_alt_mm': (SENSE_GPS, VALID_GPS_ALT),
+    'gps_speed_mm_s': (SENSE_GPS, VALID_GPS_SPEED),
+}
+
+_SENSORS = (SENSE_IMU, SENSE_BARO, SENSE_GPS)
+
+
+def _ticks_diff(a, b):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(a, b)
+    return a - b
+
+
+class Subscription:
+    """Fields a consumer reads and how often (hz=None: on every update())."""
+    __slots__ = ('fields', 'hz', 'period_us', 'sensors', '_hub')
+
+    def __init__(self, hub, fields, hz):
+        self._hub = hub
+        self.fields = fields
+        self.hz = hz
+        self.period_us = 0 if hz is None else int(1000000 / hz)
+        m = 0
+        for f in fields:
+            m |= FIELDS[f][0]
+        self.sensors = m
+
+    def cancel(self):
+        self._hub.unsubscribe(self)
+
 
 class SensorHub:
-    def __init__(self, i2c):
-        self.imu = ImuSensor(i2c)
-        self.baro = Bmp280Sensor(i2c)
-        self.gps = GpsSensor()
+    def __init__(self, i2c, hw_cache=None, imu_cal=None):
+        """hw_cache: path of the discovery record (sensors/hw_cache.py).
+        Devices recorded there are verified by ID and built directly; the
+        file is rewritten when the probe finds something different.
+        imu_cal: path of the IMU calibration (sensors/imu_cal.py), applied
+        to the IMU driver when present."""
+        t0 = ticks_us()
+        hw = _hw_cache.load(hw_cache) if hw_cache and i2c is not None else None
+        self.imu = ImuSensor(i2c, hw=hw.get('imu') if hw else None)
+        self.baro = Bmp280Sensor(i2c, hw=hw.get('baro') if hw else None)
+        # GPS wrapper (and its NMEA/UBX driver) is imported on first use
+        self._gps = None
+        self.hw = {'imu': self.imu.hw, 'baro': self.baro.hw}
+        self.hw_source = 'probe'
+        if hw is not None and self.imu.hw_cached and self.baro.hw_cached:
+            self.hw_source = 'cache'
+        elif hw_cache and i2c is not None and (self.hw['imu'] or self.hw['baro']):
+            if hw is None or any(hw.get(k) != self.hw[k] for k in self.hw):
+                _hw_cache.save(self.hw, hw_cache)
+        self.discovery_us = _ticks_diff(ticks_us(), t0)
+        cal = _imu_cal.load(imu_cal) if imu_cal and i2c is not None else None
+        if cal is not None:
+            self.imu.set_calibration(cal)
+        # One preallocated sample, refreshed in place per sensor so the
+        # scheduler can update IMU, baro and GPS at independent rates
+        self.sample = SensorSample()
+        # Subscriptions: update() only reads sensors somebody consumes, at
+        # the fastest rate asked for; none at all means read everything
+        self.subscriptions = []
+        self._period_us = [None, None, None]   # per sensor; None = unused
+        self._last_us = [None, None, None]     # last read by update()
+        self.skipped = [0, 0, 0]               # update() calls that skipped it
+
+    @property
+    def gps(self):
+        g = self._gps
+        if g is None:
+            g = self._gps = registry.timed_import('sensors.gps_wrapper', 'gps').GpsSensor()
+        return g
+
+    @gps.setter
+    def gps(self, g):
+        self._gps = g
+
+    # Subscriptions
+    def subscribe(self, fields, hz=None):
+        """Declare that a consumer reads `fields` (SensorSample attribute
+        names) at `hz`; hz=None means on every update(). Returns a
+        Subscription (cancel() or unsubscribe() to drop it)."""
+        if isinstance(fields, str):
+            fields = (fields,)
+        for f in fields:
+            if f not in FIELDS:
+                raise ValueError('unknown sample field: %s' % f)
+        if hz is not None and hz <= 0:
+            raise ValueError('hz must be > 0')
+        sub = Subscription(self, tuple(fields), hz)
+        self.subscriptions.append(sub)
+        self._plan()
+        return sub
+
+    def unsubscribe(self, sub):
+        if sub in self.subscriptions:
+            self.subscriptions.remove(sub)
+            self._plan()
+
+    def _plan(self):
+        periods = [None, None, None]
+        mag = False
+        for sub in self.subscriptions:
+            for i, bit in enumerate(_SENSORS):
+                if sub.sensors & bit:
+                    p = periods[i]
+                    periods[i] = sub.period_us if p is None else min(p, sub.period_us)
+            if 'mag_uT' in sub.fields:
+                mag = True
+        self._period_us = periods
+        # No mag consumer: skip the magnetometer transaction in the IMU read
+        self.imu.mag_enabled = mag or not self.subscriptions
+
+    def _due(self, i, now_us):
+        period = self._period_us[i]
+        if period is None:
+            return False
+        last = self._last_us[i]
+        # 1/8 period of slack so loop jitter does not skip a whole period
+        if last is None or _ticks_diff(now_us, last) >= period - (period >> 3):
+            return True
+        self.skipped[i] += 1
+        return False
+
+    def age_us(self, field, now_us=None):
+        """Microseconds since `field` was last refreshed; None if it holds
+        no valid measurement."""
+        try:
+            sensor, bit = FIELDS[field]
+        except KeyError:
+            raise ValueError('unknown sample field: %s' % field)
+        s = self.sample
+        if bit and not s.valid & bit:
+            return None
+        if sensor == SENSE_IMU:
+            stamp = s.imu_us
+        elif sensor == SENSE_BARO:
+            stamp = s.baro_us
+        else:
+            stamp = s.gps_us
+        return _ticks_diff(ticks_us() if now_us is None else now_us, stamp)
+
+    # Reads
+    def read_imu(self):
+        return self.imu.read_into(self.sample)
+
+    def read_baro(self):
+        if self.baro.split_phase:
+            self.baro.step_into(self.sample)
+            return self.sample
+        return self.baro.read_into(self.sample)
+
+    def read_gps(self):
+        return self.gps.read_into(self.sample)
+
+    def update(self, now_us=None, sensors=SENSE_ALL):
+        """Refresh self.sample in place (no allocation) and return it.
+
+        Only the sensors in `sensors` that a subscription needs and that are
+        due are read; the other fields keep their cached values (see
+        age_us()). Without subscriptions every sensor in `sensors` is read.
+        """
+        s = self.sample
+        s.ts_ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        if self.subscriptions:
+            if now_us is None:
+                now_us = ticks_us()
+            last = self._last_us
+            if sensors & SENSE_IMU and self._due(0, now_us):
+                last[0] = now_us
+                self.read_imu()
+            if sensors & SENSE_BARO and self._due(1, now_us):
+                last[1] = now_us
+                self.read_baro()
+            if sensors & SENSE_GPS and self._due(2, now_us):
+                last[2] = now_us
+                self.read_gps()
+            return s
+        if sensors & SENSE_IMU:
+            self.read_imu()
+        if sensors & SENSE_BARO:
+            self.read_baro()
+        if sensors & SENSE_GPS:
+            self.read_gps()
+        return s
 
     def read(self):
-        ts_ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
-        imu = self.imu.read()
-        baro = self.baro.read()
-        gps = self.gps.read()
-        sample = {
-            'ts_ms': ts_ms,
-            'accel_g': imu.get('accel_g'),
-            'gyro_dps': imu.get('gyro_dps'),
-            'mag_uT': imu.get('mag_uT'),
-            'imu_temp_c': imu.get('temp_c'),
-            'temperature_c': baro.get('temperature_c'),
-            'pressure_pa': baro.get('pressure_pa'),
-            'altitude_m': baro.get('altitude_m'),
-            'gps_has_fix': gps.get('has_fix'),
-            'gps_lat': gps.get('lat'),
-            'gps_lon': gps.get('lon'),
-            'gps_alt_m': gps.get('alt_m'),
-            'gps_sats': gps.get('sats'),
-        }
-        return sample
+        """Read every sensor regardless of subscriptions; legacy dict."""
+        s = self.sample
+        s.ts_ms = time.ticks_ms() if hasattr(time, 'ticks_ms') else int(time.time() * 1000)
+        imu = self.imu
+        mag = imu.mag_enabled
+        imu.mag_enabled = True
+        try:
+            self.read_imu()
+        finally:
+            imu.mag_enabled = mag
+        self.read_baro()
+        self.read_gps()
+        return s.as_dict()
@@ -0,0 +1 @@
+"""Desktop simulation tools (not deployed to the Pico)."""
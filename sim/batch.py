@@ -0,0 +1,253 @@
+"""NumPy batch simulator: N quadcopters (one per gain set) stepped at once.
+
+The controller path mirrors FlightComputer.step() operation for operation so
+results match the scalar firmware classes bit for bit:
+
+    BatchAHRS  <- control.attitude.ComplementaryAHRS.update_xyz
+    BatchPID   <- control.pid.PID.update
+    quad_x_mix <- FlightComputer._mixer_stage (incl. the float32 mix array)
+
+QuadModel is a simple per-axis rigid-body model (angular rate driven by the
+motor differential, linear drag) that closes the loop for gain searches.
+Desktop only; requires numpy.
+"""
+import numpy as np
+
+
+class BatchPID:
+    """Vectorized control.pid.PID. Gains and limits may be scalars or arrays
+    of shape (n,)."""
+    def __init__(self, n, kp=0.0, ki=0.0, kd=0.0, i_limit=None, out_limit=None):
+        self.n = n
+        self.kp = np.broadcast_to(np.asarray(kp, dtype=np.float64), (n,))
+        self.ki = np.broadcast_to(np.asarray(ki, dtype=np.float64), (n,))
+        self.kd = np.broadcast_to(np.asarray(kd, dtype=np.float64), (n,))
+        self.i_limit = i_limit
+        self.out_limit = out_limit
+        self.i = np.zeros(n)
+        self.prev_err = np.zeros(n)
+        self.has_prev = np.zeros(n, dtype=bool)
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = slice(None)
+        self.i[mask] = 0.0
+        self.prev_err[mask] = 0.0
+        self.has_prev[mask] = False
+
+    def update(self, err, dt):
+        if dt <= 0:
+            return np.zeros(self.n)
+        p = self.kp * err
+        self.i += self.ki * err * dt
+        if self.i_limit is not None:
+            self.i = np.maximum(-self.i_limit, np.minimum(self.i, self.i_limit))
+        d = np.where(self.has_prev, self.kd * (err - self.prev_err) / dt, 0.0)
+        self.prev_err = np.array(err, dtype=np.float64)
+        self.has_prev[:] = True
+        out = p + self.i + d
+        if self.out_limit is not None:
+            out = np.maximum(-self.out_limit, np.minimum(out, self.out_limit))
+        return out
+
+
+class BatchAHRS:
+    """Vectorized control.attitude.ComplementaryAHRS (degrees)."""
+    def __init__(self, n, alpha=0.98):
+        self.n = n
+        self.alpha = alpha
+        self.roll = np.zeros(n)
+        self.pitch = np.zeros(n)
+        self.yaw = np.zeros(n)
+
+    def update_xyz(self, ax, ay, az, gx, gy, gz, dt):
+        roll_g = self.roll + gx * dt
+        pitch_g = self.pitch + gy * dt
+        yaw_g = self.yaw + gz * dt
+        roll_a = np.degrees(np.arctan2(ay, az))
+        pitch_a = np.degrees(np.arctan2(-ax, np.sqrt(ay*ay + az*az)))
+        a = self.alpha
+        self.roll = a * roll_g + (1 - a) * roll_a
+        self.pitch = a * pitch_g + (1 - a) * pitch_a
+        self.yaw = yaw_g
+
+
+def quad_x_mix(throttle, u_roll, u_pitch, u_yaw, out=None):
+    """Quad-X mixer of FlightComputer._mixer_stage. Returns (n, 4) float32
+    [l1, l2, r1, r2] clamped to [-1, 1], like the firmware's array('f')."""
+    l1 = throttle + (+u_roll) + (+u_pitch) + (-u_yaw)
+    l2 = throttle + (+u_roll) + (-u_pitch) + (+u_yaw)
+    r1 = throttle + (-u_roll) + (+u_pitch) + (+u_yaw)
+    r2 = throttle + (-u_roll) + (-u_pitch) + (-u_yaw)
+    if out is None:
+        out = np.empty((np.shape(l1)[0], 4), dtype=np.float32)
+    out[:, 0] = np.clip(l1, -1.0, 1.0)
+    out[:, 1] = np.clip(l2, -1.0, 1.0)
+    out[:, 2] = np.clip(r1, -1.0, 1.0)
+    out[:, 3] = np.clip(r2, -1.0, 1.0)
+    return out
+
+
+class BatchFlightLoop:
+    """AHRS -> PID -> mixer of FlightComputer.step() for n gain sets.
+
+    Gain arguments default to the FlightComputer values and may be arrays.
+    """
+    def __init__(self, n, kp=0.8, ki=0.0, kd=0.02, yaw_kp=0.4, yaw_ki=0.0,
+                 yaw_kd=0.01, alpha=0.98, throttle=0.0):
+        self.n = n
+        self.ahrs = BatchAHRS(n, alpha)
+        self.pid_roll = BatchPID(n, kp, ki, kd, out_limit=1.0)
+        self.pid_pitch = BatchPID(n, kp, ki, kd, out_limit=1.0)
+        self.pid_yaw = BatchPID(n, yaw_kp, yaw_ki, yaw_kd, out_limit=1.0)
+        self.throttle = max(0.0, min(1.0, throttle))
+        self.u_roll = np.zeros(n)
+        self.u_pitch = np.zeros(n)
+        self.u_yaw = np.zeros(n)
+        self.mix = np.zeros((n, 4), dtype=np.float32)
+
+    def step(self, ax, ay, az, gx, gy, gz, dt):
+        ahrs = self.ahrs
+        ahrs.update_xyz(ax, ay, az, gx, gy, gz, dt)
+        self.u_roll = self.pid_roll.update(0.0 - ahrs.roll, dt)
+        self.u_pitch = self.pid_pitch.update(0.0 - ahrs.pitch, dt)
+        self.u_yaw = self.pid_yaw.update(0.0 - gz, dt)
+        quad_x_mix(self.throttle, self.u_roll, self.u_pitch, self.u_yaw, self.mix)
+        return self.mix
+
+
+class QuadModel:
+    """Per-axis rigid-body quad: body rates (deg/s) accelerate with the motor
+    differential and decay with linear drag; gravity seen by the IMU follows
+    roll/pitch so the accel-based AHRS correction is exercised."""
+    def __init__(self, n, roll_dps2=3000.0, pitch_dps2=3000.0, yaw_dps2=600.0,
+                 drag=2.0, roll0_deg=0.0, pitch0_deg=0.0):
+        self.n = n
+        self.k = (roll_dps2, pitch_dps2, yaw_dps2)
+        self.drag = drag
+        self.roll = np.full(n, float(roll0_deg))
+        self.pitch = np.full(n, float(pitch0_deg))
+        self.yaw = np.zeros(n)
+        self.p = np.zeros(n)
+        self.q = np.zeros(n)
+        self.r = np.zeros(n)
+
+    def imu(self):
+        """Noise-free (ax, ay, az) in g and (gx, gy, gz) in deg/s."""
+        rr = np.radians(self.roll)
+        pr = np.radians(self.pitch)
+        cp = np.cos(pr)
+        return -np.sin(pr), np.sin(rr) * cp, np.cos(rr) * cp, self.p, self.q, self.r
+
+    def step(self, mix, dt):
+        m = mix.astype(np.float64)
+        kr, kp, ky = self.k
+        tau_roll = (m[:, 0] + m[:, 1]) - (m[:, 2] + m[:, 3])
+        tau_pitch = (m[:, 0] + m[:, 2]) - (m[:, 1] + m[:, 3])
+        tau_yaw = (m[:, 1] + m[:, 2]) - (m[:, 0] + m[:, 3])
+        drag = self.drag
+        self.p = self.p + (kr * tau_roll - drag * self.p) * dt
+        self.q = self.q + (kp * tau_pitch - drag * self.q) * dt
+        self.r = self.r + (ky * tau_yaw - drag * self.r) * dt
+        self.roll = self.roll + self.p * dt
+        self.pitch = self.pitch + self.q * dt
+        self.yaw = self.yaw + self.r * dt
+
+
+def gain_grid(**axes):
+    """Cartesian product of gain values: gain_grid(kp=[..], kd=[..]) returns
+    a dict of equally long flat arrays, one entry per combination."""
+    names = list(axes)
+    mesh = np.meshgrid(*[np.asarray(axes[k], dtype=np.float64) for k in names], indexing='ij')
+    return {k: g.ravel() for k, g in zip(names, mesh)}
+
+
+def simulate(n, seconds=3.0, loop_hz=100, roll0_deg=15.0, pitch0_deg=-10.0,
+             gyro_noise_dps=0.0, seed=0, throttle=0.5, model=None, **gains):
+    """Run n closed-loop quads from an initial tilt and score each gain set.
+
+    Returns a dict of (n,) arrays: rms_deg (roll+pitch attitude error),
+    max_deg, final_deg and sat_frac (fraction of motor commands at +-1).
+    """
+    dt = 1.0 / float(loop_hz)
+    steps = int(seconds * loop_hz)
+    loop = BatchFlightLoop(n, throttle=throttle, **gains)
+    if model is None:
+        model = QuadModel(n, roll0_deg=roll0_deg, pitch0_deg=pitch0_deg)
+    # Start the estimator where the model is, as after a settled boot
+    loop.ahrs.roll[:] = model.roll
+    loop.ahrs.pitch[:] = model.pitch
+    rng = np.random.default_rng(seed) if gyro_noise_dps else None
+    sq = np.zeros(n)
+    peak = np.zeros(n)
+    sat = np.zeros(n)
+    for _ in range(steps):
+        ax, ay, az, gx, gy, gz = model.imu()
+        if rng is not None:
+            gx = gx + rng.normal(0.0, gyro_noise_dps, n)
+            gy = gy + rng.normal(0.0, gyro_noise_dps, n)
+            gz = gz + rng.normal(0.0, gyro_noise_dps, n)
+        mix = loop.step(ax, ay, az, gx, gy, gz, dt)
+        model.step(mix, dt)
+        e2 = model.roll * model.roll + model.pitch * model.pitch
+        sq += e2
+        peak = np.maximum(peak, e2)
+        sat += np.count_nonzero(np.abs(mix) >= 1.0, axis=1)
+    return {
+        'rms_deg': np.sqrt(sq / max(1, steps)),
+        'max_deg': np.sqrt(peak),
+        'final_deg': np.sqrt(model.roll * model.roll + model.pitch * model.pitch),
+        'sat_frac': sat / (4.0 * max(1, steps)),
+    }
+
+
+def compare_with_firmware(log, gain_sets, loop_hz=100, throttle=0.5):
+    """Replay a fc.sil.SensorLog through one FlightComputer per gain set and
+    through a BatchFlightLoop holding all of them; return the largest absolute
+    difference in attitude, PID outputs and motor mix (0.0 = bit-identical).
+
+    gain_sets: list of dicts with kp/ki/kd/yaw_kp/yaw_ki/yaw_kd/alpha keys
+    (missing keys take the FlightComputer defaults).
+    """
+    from fc.sil import SilRig
+
+    defaults = dict(kp=0.8, ki=0.0, kd=0.02, yaw_kp=0.4, yaw_ki=0.0, yaw_kd=0.01, alpha=0.98)
+    sets = [dict(defaults, **g) for g in gain_sets]
+    n = len(sets)
+    rigs = []
+    for g in sets:
+        rig = SilRig(log, loop_hz=loop_hz, arm=True, throttle=throttle)
+        fc = rig.fc
+        for pid, pre in ((fc.pid_roll, ''), (fc.pid_pitch, ''), (fc.pid_yaw, 'yaw_')):
+            pid.kp = g[pre + 'kp']
+            pid.ki = g[pre + 'ki']
+            pid.kd = g[pre + 'kd']
+        fc.ahrs.alpha = g['alpha']
+        rigs.append(rig)
+    col = lambda k: np.array([g[k] for g in sets])
+    loop = BatchFlightLoop(n, kp=col('kp'), ki=col('ki'), kd=col('kd'),
+                           yaw_kp=col('yaw_kp'), yaw_ki=col('yaw_ki'),
+                           yaw_kd=col('yaw_kd'), alpha=col('alpha'),
+                           throttle=throttle)
+    # The firmware sees the log through float32 sample arrays
+    rows = np.asarray(log.values, dtype=np.float32).astype(np.float64).reshape(len(log), -1)
+    worst = 0.0
+    for i in range(len(log)):
+        dt = None
+        for rig in rigs:
+            rig.clock.now = log.t_us[i]
+            rig.sensors.index = i
+            dt = rig.fc.step().dt
+        r = rows[i]
+        mix = loop.step(np.full(n, r[0]), np.full(n, r[1]), np.full(n, r[2]),
+                        np.full(n, r[3]), np.full(n, r[4]), np.full(n, r[5]), dt)
+        ref = np.array([[f.ahrs.roll, f.ahrs.pitch, f.ahrs.yaw, f.u_roll, f.u_pitch,
+                         f.u_yaw] + list(f.mix) for f in (rig.fc for rig in rigs)])
+        got = np.column_stack((loop.ahrs.roll, loop.ahrs.pitch, loop.ahrs.yaw,
+                               loop.u_roll, loop.u_pitch, loop.u_yaw,
+                               mix.astype(np.float64)))
+        diff = np.abs(ref - got)
+        if np.isnan(diff).any():
+            return float('inf')
+        worst = max(worst, float(diff.max()))
+    return worst
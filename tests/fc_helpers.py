@@ -0,0 +1,32 @@
+"""Shared test helpers: a FlightComputer built without hardware.
+
+Not a test module (no test_ prefix); imported by the tests that drive
+FlightComputer.step() or its scheduler.
+"""
+from unittest.mock import patch
+
+import fc.flight_computer as flight_computer
+
+
+class FakeMotors:
+    """MotorQuad stand-in; `last` is the last set_quadsigned() command."""
+    def __init__(self):
+        self.disarmed = True
+        self.last = None
+
+    def arm(self):
+        self.disarmed = False
+
+    def disarm(self):
+        self.disarmed = True
+
+    def set_quadsigned(self, l1, l2, r1, r2):
+        self.last = (l1, l2, r1, r2)
+
+
+def make_fc(loop_hz=100, **kwargs):
+    """FlightComputer on FakeMotors with no I2C bus (simulated sensors unless
+    `sensors` is given)."""
+    with patch.object(flight_computer, 'get_i2c', return_value=None), \
+         patch.object(flight_computer, 'MotorQuad', FakeMotors):
+        return flight_computer.FlightComputer(loop_hz=loop_hz, **kwargs)
@@ -0,0 +1,124 @@
+"""FlightComputer.step() must not build new containers or grow the heap.
+
+CPython has no gc.mem_alloc(), and its own argument tuples and free lists
+hide a dict or tuple per step from tracemalloc. Allocations are therefore
+counted on the bytecode step() executes: every instruction that builds an
+object on MicroPython's heap (tuple, list, dict, set, slice, string,
+closure, *args call, long-int constant). tracemalloc still checks that no
+memory is kept.
+"""
+import dis
+import gc
+import os
+import sys
+import tracemalloc
+
+from fc_helpers import make_fc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS = os.path.join(ROOT, 'tests')
+
+_ALLOCATING_OPS = frozenset((
+    'BUILD_TUPLE', 'BUILD_LIST', 'BUILD_MAP', 'BUILD_SET', 'BUILD_STRING',
+    'BUILD_SLICE', 'BUILD_CONST_KEY_MAP', 'LIST_APPEND', 'LIST_EXTEND',
+    'LIST_TO_TUPLE', 'MAP_ADD', 'SET_ADD', 'SET_UPDATE', 'DICT_UPDATE',
+    'DICT_MERGE', 'MAKE_FUNCTION', 'CALL_FUNCTION_EX', 'FORMAT_VALUE',
+    'RETURN_GENERATOR',
+))
+_SMALL_INT = 1 << 30  # MicroPython small ints are 31-bit
+
+
+def _make_fc():
+    fc = make_fc()
+    fc.set_telemetry_sink(None)
+    return fc
+
+
+def _allocating(ins):
+    if ins.opname in _ALLOCATING_OPS:
+        return True
+    v = ins.argval
+    return (ins.opname == 'LOAD_CONST' and isinstance(v, int)
+            and not isinstance(v, bool) and not -_SMALL_INT <= v < _SMALL_INT)
+
+
+def allocations(fn):
+    """Run fn() and list (file, line, op) for each allocating instruction
+    executed in firmware code (tests/ and the stdlib are not counted)."""
+    hits = []
+    by_code = {}
+
+    def trace(frame, event, arg):
+        path = frame.f_code.co_filename
+        if not path.startswith(ROOT) or path.startswith(TESTS):
+            return None
+        frame.f_trace_opcodes = True
+        if event == 'opcode':
+            ins = by_code.get(frame.f_code)
+            if ins is None:
+                ins = {i.offset: i for i in dis.get_instructions(frame.f_code)}
+                by_code[frame.f_code] = ins
+            i = ins.get(frame.f_lasti)
+            if i is not None and _allocating(i):
+                hits.append((os.path.relpath(path, ROOT), frame.f_lineno,
+                             i.opname, i.argrepr))
+        return trace
+
+    sys.settrace(trace)
+    try:
+        fn()
+    finally:
+        sys.settrace(None)
+    return hits
+
+
+def test_step_updates_state_objects_in_place():
+    fc = _make_fc()
+    sample = fc.sensors.sample
+    accel = sample.accel_g
+    out1 = fc.step()
+    out2 = fc.step()
+    assert out1 is out2 is fc.out
+    assert fc.sensors.sample is sample and sample.accel_g is accel
+    assert out2['alt_m'] == out2.alt_m
+    assert len(out2.mix) == 4
+
+
+def test_step_allocates_nothing():
+    fc = _make_fc()
+    fc.step()
+    for _ in range(3):
+        hits = allocations(fc.step)
+        assert hits == [], hits
+
+
+def test_allocation_counter_sees_one_object_per_step():
+    # One dict, one tuple and a long-int mask, compiled as if the code
+    # lived in fc/ (test code itself is not traced)
+    src = ("def step(fc):\n"
+           "    fc.last = {'ts': (fc.dt, fc._last_tick & 0xFFFFFFFF)}\n")
+    ns = {}
+    exec(compile(src, os.path.join(ROOT, 'fc', 'leaky.py'), 'exec'), ns)
+    fc = _make_fc()
+    hits = allocations(lambda: ns['step'](fc))
+    assert [h[2] for h in hits] == ['LOAD_CONST', 'BUILD_TUPLE', 'BUILD_MAP'], hits
+    assert all(h[0] == os.path.join('fc', 'leaky.py') for h in hits)
+
+
+def test_step_heap_does_not_grow():
+    fc = _make_fc()
+    for _ in range(200):
+        fc.step()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(1000):
+            fc.step()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Anything kept per step would add tens of kB here; allow only the few
+    # counters whose int objects grow in size
+    assert after - before < 2048, after - before
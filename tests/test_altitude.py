@@ -0,0 +1,39 @@
+from benchmarks.altitude_bench import max_error
+from sensors.altitude import AltitudeLUT, SEA_LEVEL_PA, altitude_exact
+from sensors.bmp280_wrapper import Bmp280Sensor
+from sensors.sample import SensorSample
+
+
+def test_lut_max_error_below_documented_bound():
+    err, at = max_error(AltitudeLUT())
+    assert err < 0.009, (err, at)
+
+
+def test_lut_matches_exact_at_flight_pressures():
+    lut = AltitudeLUT()
+    for p in (101325.0, 100000.0, 95000.0, 90000.0, 80000.0, 70000.0):
+        assert abs(lut.altitude(p) - altitude_exact(p)) < 0.01
+    assert abs(lut.altitude(SEA_LEVEL_PA)) < 1e-6
+
+
+def test_out_of_table_falls_back_to_exact():
+    lut = AltitudeLUT()
+    for p in (30000.0, 60000.0, 111457.5, 120000.0):
+        assert lut.altitude(p) == altitude_exact(p)
+
+
+def test_ground_reference_gives_height_above_takeoff():
+    lut = AltitudeLUT()
+    lut.set_ground(95000.0)
+    assert abs(lut.altitude(95000.0)) < 1e-6
+    assert abs(lut.altitude(94000.0) - altitude_exact(94000.0, 95000.0)) < 0.01
+    assert lut.altitude(94000.0) > 80.0
+
+
+def test_wrapper_uses_ground_pressure():
+    baro = Bmp280Sensor(i2c=None)
+    s = baro.read_into(SensorSample())
+    assert abs(s.altitude_m - altitude_exact(s.pressure_pa)) < 0.01
+    baro.set_ground_pressure(s.pressure_pa)
+    s = baro.read_into(s)
+    assert abs(s.altitude_m) < 5.0  # simulated pressure drifts slowly
@@ -0,0 +1,80 @@
+import asyncio
+import socket
+
+from fc.async_runtime import FlightRuntime
+from fc.flight_computer import FlightComputer
+from fc.sil import CaptureMotors, ReplaySensors, synthetic_log
+
+
+def _make_runtime(**kw):
+    fc = FlightComputer(loop_hz=200, sensors=ReplaySensors(synthetic_log(seconds=0.1)),
+                        motors=CaptureMotors())
+    fc.set_telemetry_sink(None)
+    fc.arm()
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(('127.0.0.1', 0))
+    return fc, rx, FlightRuntime(fc, rx, deadzone=0.0, expo=0.0, **kw)
+
+
+async def _send_later(tx, addr, delay_s, msg):
+    await asyncio.sleep(delay_s)
+    tx.sendto(msg, addr)
+
+
+def test_udp_command_reaches_motors_with_bounded_latency():
+    fc, rx, rt = _make_runtime()
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tx.settimeout(1.0)
+    try:
+        async def scenario():
+            sender = asyncio.ensure_future(
+                _send_later(tx, rx.getsockname(), 0.05, b'DRN,0.5,0.2,-0.1,0\n'))
+            await rt.main(0.2)
+            await sender
+        asyncio.run(scenario())
+        ack, _ = tx.recvfrom(64)
+    finally:
+        tx.close()
+        rx.close()
+    assert ack.startswith(b'ACK')
+    assert rt.packets == 1 and rt.bad_packets == 0
+    assert abs(fc.sp_roll_deg - 0.2 * rt.max_angle_deg) < 1e-9
+    assert abs(fc.sp_pitch_deg + 0.1 * rt.max_angle_deg) < 1e-9
+    assert abs(fc.throttle_out - 0.5) < 1e-9
+    assert fc.motors.commands > 0
+    assert fc.motors.disarmed  # runtime disarms on exit
+    lat = rt.latency.snapshot()
+    assert lat['count'] == 1
+    # One link poll (2 ms) plus one control period (5 ms), with slack for CI
+    assert 0 <= lat['max_us'] < 50000, lat
+    d = rt.stats()['deadlines']
+    assert d['control']['runs'] > 20
+    assert set(d) >= {'control', 'link', 'housekeeping', 'telemetry'}
+
+
+def test_link_loss_ramps_throttle_down():
+    fc, rx, rt = _make_runtime(failsafe_ms=30, soft_land_ms=60)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        tx.sendto(b'0.6,0,0,0\n', rx.getsockname())
+        asyncio.run(rt.main(0.25))
+    finally:
+        tx.close()
+        rx.close()
+    assert rt.packets == 1
+    assert rt.failsafe
+    assert fc._throttle == 0.0
+
+
+def test_bad_packets_are_counted_and_ignored():
+    fc, rx, rt = _make_runtime()
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        tx.sendto(b'garbage\n', rx.getsockname())
+        tx.sendto(b'1,2\n', rx.getsockname())
+        asyncio.run(rt.main(0.05))
+    finally:
+        tx.close()
+        rx.close()
+    assert rt.bad_packets == 2 and rt.packets == 0
+    assert rt.latency.count == 0
@@ -0,0 +1,113 @@
+import struct
+from unittest.mock import patch
+
+import drivers.bmp280 as bmp280
+from drivers.bmp280 import BMP280
+from sensors.bmp280_wrapper import Bmp280Sensor
+
+# Datasheet section 3.12 worked example: calibration + raw readings
+_CAL = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+_T_RAW = 519888
+_P_RAW = 415148
+
+
+class Bmp280I2C:
+    """BMP280 register file at 0x76; counts data-register burst reads."""
+    def __init__(self):
+        self.f = bytearray(256)
+        self.f[0x88:0x88 + 24] = struct.pack('<HhhHhhhhhhhh', *_CAL)
+        self.f[0xD0] = 0x58  # chip ID
+        self.set_raw(_T_RAW, _P_RAW)
+        self.data_reads = 0
+
+    def set_raw(self, t_raw, p_raw):
+        self.f[0xF7:0xFA] = bytes((p_raw >> 12, p_raw >> 4 & 0xFF, (p_raw & 0xF) << 4))
+        self.f[0xFA:0xFD] = bytes((t_raw >> 12, t_raw >> 4 & 0xFF, (t_raw & 0xF) << 4))
+
+    def scan(self):
+        return [0x76]
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(self.f[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        if reg == 0xF7:
+            self.data_reads += 1
+        buf[:] = self.f[reg:reg + len(buf)]
+
+    def writeto_mem(self, addr, reg, data):
+        self.f[reg:reg + len(data)] = data
+
+
+class Clock:
+    def __init__(self):
+        self.us = 0
+
+    def __call__(self):
+        return self.us
+
+
+def _bmp(use_case=bmp280.BMP280_CASE_HANDHELD_DYN):
+    i2c = Bmp280I2C()
+    return i2c, BMP280(i2c, use_case=use_case)
+
+
+def test_compensation_matches_datasheet_example():
+    _, bmp = _bmp()
+    t, p = bmp.measure()
+    assert abs(t - 25.08) < 0.005
+    assert abs(p - 100653.27) < 1.0
+
+
+def test_one_bus_read_per_normal_mode_conversion():
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        i2c, bmp = _bmp()  # normal mode, standard oversampling, 0.5 ms standby
+        # ctrl_meas: T x1, P x4 -> 1.25 + 2.3 + 9.2 + 0.575 ms, plus standby
+        assert bmp._period_us == 1250 + 2300 + 9200 + 575 + 500
+        first = bmp.measure()
+        for _ in range(10):
+            assert bmp.temperature == first[0]
+            assert bmp.pressure == first[1]
+            assert bmp.measure() == first
+        assert i2c.data_reads == 1
+        i2c.set_raw(_T_RAW + 2000, _P_RAW)
+        clock.us += bmp._period_us - 1
+        assert bmp.measure() == first
+        clock.us += 1
+        assert bmp.measure()[0] > first[0]
+        assert i2c.data_reads == 2
+
+
+def test_standby_change_updates_period():
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        _, bmp = _bmp()
+        bmp.standby = bmp280.BMP280_STANDBY_1000
+        assert bmp._period_us == bmp._meas_us + 1000000
+
+
+def test_forced_mode_reads_once_per_trigger():
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        i2c, bmp = _bmp(bmp280.BMP280_CASE_WEATHER)
+        assert bmp._period_us == 0
+        bmp.measure()
+        clock.us += 10000000
+        bmp.measure()
+        assert i2c.data_reads == 1  # no trigger, no new data
+        bmp.force_measure()
+        bmp.measure()  # conversion still running: cached
+        assert i2c.data_reads == 1
+        clock.us += bmp._conv_us()
+        bmp.measure()
+        assert i2c.data_reads == 2
+
+
+def test_wrapper_reads_bus_once():
+    i2c = Bmp280I2C()
+    s = Bmp280Sensor(i2c)
+    out = s.read()
+    assert i2c.data_reads == 1
+    assert abs(out['temperature_c'] - 25.08) < 0.005
+    assert abs(out['pressure_pa'] - 100653.27) < 1.0
@@ -0,0 +1,104 @@
+import struct
+from unittest.mock import patch
+
+import drivers.bmp280 as bmp280
+from sensors.bmp280_wrapper import Bmp280Sensor
+from sensors.sample import SensorSample, VALID_PRESSURE, VALID_ALTITUDE
+
+_CAL = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+
+
+class Bmp280I2C:
+    """BMP280 register file at 0x76 that logs every bus transaction."""
+    def __init__(self):
+        self.f = bytearray(256)
+        self.f[0x88:0x88 + 24] = struct.pack('<HhhHhhhhhhhh', *_CAL)
+        self.f[0xD0] = 0x58  # chip ID
+        p_raw, t_raw = 415148, 519888
+        self.f[0xF7:0xFD] = bytes((p_raw >> 12, p_raw >> 4 & 0xFF, (p_raw & 0xF) << 4,
+                                   t_raw >> 12, t_raw >> 4 & 0xFF, (t_raw & 0xF) << 4))
+        self.log = []
+
+    def scan(self):
+        return [0x76]
+
+    def readfrom_mem(self, addr, reg, n):
+        self.log.append(('r', reg))
+        return bytes(self.f[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        self.log.append(('r', reg))
+        buf[:] = self.f[reg:reg + len(buf)]
+
+    def writeto_mem(self, addr, reg, data):
+        self.log.append(('w', reg, bytes(data)))
+        self.f[reg:reg + len(data)] = data
+
+
+class Clock:
+    def __init__(self):
+        self.us = 0
+
+    def __call__(self):
+        return self.us
+
+
+def test_driver_start_poll_collect():
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        i2c = Bmp280I2C()
+        bmp = bmp280.BMP280(i2c)
+        bmp.oversample(bmp280.BMP280_OS_ULTRAHIGH)
+        assert bmp.read_wait_ms == 44
+        del i2c.log[:]
+        due = bmp.start_measurement()
+        assert due == 44000
+        # One write: ctrl_meas with P x16, T x2, forced mode
+        assert i2c.log == [('w', 0xF4, bytes(((2 << 5) | (5 << 2) | 1,)))]
+        for step in range(43):
+            clock.us = step * 1000
+            assert not bmp.measurement_ready()
+            assert bmp.collect() is None
+        assert len(i2c.log) == 1  # waiting never touches the bus (no STATUS polls)
+        clock.us = due
+        t, p = bmp.collect()
+        assert abs(t - 25.08) < 0.005
+        assert i2c.log[1:] == [('r', 0xF7)]
+        assert not bmp.converting
+        assert bmp.collect() is None
+
+
+def test_wrapper_step_keeps_a_conversion_in_flight():
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        i2c = Bmp280I2C()
+        baro = Bmp280Sensor(i2c)
+        baro.enable_split_phase()
+        s = SensorSample()
+        assert baro.step_into(s) is False  # kicks the first conversion
+        assert not s.valid & VALID_PRESSURE
+        updates = 0
+        for ms in range(1, 200):
+            clock.us = ms * 1000
+            if baro.step_into(s):
+                updates += 1
+        # One result per 44 ms conversion, collected on the tick it is due
+        assert updates == 4
+        assert abs(s.pressure_pa - 100653.27) < 1.0
+        assert s.has(VALID_PRESSURE | VALID_ALTITUDE)
+        assert baro._driver.converting
+        reads = [e for e in i2c.log if e[0] == 'r' and e[1] == 0xF3]
+        assert reads == []
+
+
+def test_hub_read_baro_uses_split_phase():
+    from sensors.sensor_hub import SensorHub
+    clock = Clock()
+    with patch.object(bmp280, '_ticks_us', clock):
+        hub = SensorHub(Bmp280I2C())
+        hub.baro.enable_split_phase()
+        hub.read_baro()
+        assert not hub.sample.valid & VALID_PRESSURE
+        clock.us = 50000
+        hub.read_baro()
+        assert hub.sample.valid & VALID_PRESSURE
@@ -0,0 +1,132 @@
+from drivers import icm20948, mpu9250
+from drivers.bmp280 import BMP280
+from drivers.icm20948 import ICM20948
+from drivers.mpu6050 import MPU6050
+from drivers.mpu9250 import MPU9250
+
+
+class BufferTrackingI2C:
+    """Register file per address; records which buffers cross the bus.
+
+    Steady-state driver calls must only use readfrom_mem_into/writeto_mem
+    with buffers the driver allocated once, so the sets of buffer ids stop
+    growing after a warm-up pass and readfrom_mem is never called.
+    """
+    def __init__(self):
+        self.regs = {}
+        self.alloc_reads = 0
+        # id -> buffer; holding the buffer stops its id being recycled
+        self.read_bufs = {}
+        self.write_bufs = {}
+
+    def _file(self, addr):
+        return self.regs.setdefault(addr, bytearray(256))
+
+    def readfrom_mem(self, addr, reg, n):
+        self.alloc_reads += 1
+        return bytes(self._file(addr)[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        self.read_bufs[id(buf)] = buf
+        f = self._file(addr)
+        for i in range(len(buf)):
+            buf[i] = f[reg + i]
+
+    def writeto_mem(self, addr, reg, data):
+        self.write_bufs[id(data)] = data
+        f = self._file(addr)
+        if reg != 0x7F:  # keep the ICM bank select from clobbering data
+            f[reg:reg + len(data)] = data
+
+    def snapshot(self):
+        return (self.alloc_reads, frozenset(self.read_bufs), frozenset(self.write_bufs))
+
+
+def _steady(i2c, fn, n=20):
+    fn()  # warm-up: lazily created state settles here
+    before = i2c.snapshot()
+    for _ in range(n):
+        fn()
+    assert i2c.snapshot() == before
+
+
+def test_bmp280_bus_paths_reuse_buffers():
+    i2c = BufferTrackingI2C()
+    bmp = BMP280(i2c)
+
+    def cycle():
+        bmp._gauge()
+        bmp.force_measure()
+        bmp.standby
+        bmp.is_measuring
+        bmp.press_os
+    _steady(i2c, cycle)
+
+
+def test_mpu9250_bus_paths_reuse_buffers():
+    i2c = BufferTrackingI2C()
+    i2c._file(0x0C)[0x02] = 0x01  # AK8963 ST1: data ready
+    imu = MPU9250(i2c)
+    out = imu.data
+
+    def cycle():
+        imu.read_all(out)
+        imu.read_mag()
+        imu.acceleration
+        imu.gyro
+        imu.temperature
+    _steady(i2c, cycle)
+
+
+def test_mpu9250_fifo_drain_reuses_views():
+    i2c = BufferTrackingI2C()
+    imu = MPU9250(i2c)
+    imu.enable_fifo(rate_hz=1000, max_samples=8)
+    f = i2c._file(0x68)
+
+    def cycle():
+        # 2 then 3 whole frames queued: each count gets its own fixed view
+        for frames in (2, 3):
+            f[mpu9250.REG_FIFO_COUNTH + 1] = frames * mpu9250.FIFO_FRAME
+            assert imu.read_fifo() == frames
+    _steady(i2c, cycle)
+
+
+def test_icm20948_bus_paths_reuse_buffers():
+    i2c = BufferTrackingI2C()
+    i2c._file(0x68)[0x00] = 0xEA
+    imu = ICM20948(i2c)
+    out = imu.data
+
+    def cycle():
+        imu.read_all(out)
+        imu.acceleration
+        imu.gyro
+        imu.temperature
+    _steady(i2c, cycle)
+
+
+def test_icm20948_fifo_drain_reuses_views():
+    i2c = BufferTrackingI2C()
+    i2c._file(0x68)[0x00] = 0xEA
+    imu = ICM20948(i2c)
+    imu.enable_fifo(rate_hz=1000, max_samples=8)
+    f = i2c._file(0x68)
+
+    def cycle():
+        for frames in (2, 3):
+            f[icm20948.REG_FIFO_COUNTH + 1] = frames * icm20948.FIFO_FRAME
+            assert imu.read_fifo() == frames
+    _steady(i2c, cycle)
+
+
+def test_mpu6050_bus_paths_reuse_buffers():
+    i2c = BufferTrackingI2C()
+    imu = MPU6050(0, 0, 0, i2c=i2c)
+
+    def cycle():
+        imu.Write_Mpu6050_REG(0x19, 4)
+        imu.MPU_Get_Gyroscope()
+        imu.MPU_Get_Accelerometer()
+        imu.Read_Mpu6050_REG(0x75)
+    _steady(i2c, cycle)
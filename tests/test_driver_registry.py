@@ -0,0 +1,109 @@
+"""Driver registry: chips are identified by ID and only their drivers load."""
+from unittest.mock import patch
+
+from drivers import registry
+from sensors.imu_wrapper import ImuSensor
+from sensors.sample import VALID_IMU, VALID_MAG
+from sensors.bmp280_wrapper import Bmp280Sensor
+from sensors.sensor_hub import SensorHub
+
+
+class IdI2C:
+    """Answers at `present` addresses from per-address register files."""
+    def __init__(self, regs=None):
+        self.regs = {a: bytearray(256) for a in (regs or {})}
+        for a, values in (regs or {}).items():
+            for reg, v in values.items():
+                self.regs[a][reg] = v
+        self.reads = []
+
+    def readfrom_mem(self, addr, reg, n):
+        self.reads.append((addr, reg))
+        if addr not in self.regs:
+            raise OSError(19)
+        return bytes(self.regs[addr][reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        buf[:] = self.readfrom_mem(addr, reg, len(buf))
+
+    def writeto_mem(self, addr, reg, data):
+        if addr not in self.regs:
+            raise OSError(19)
+        self.regs[addr][reg:reg + len(data)] = data
+
+
+def _fresh():
+    """Empty module cache, recording which driver modules get imported."""
+    imported = []
+    real = registry._import
+
+    def record(name):
+        imported.append(name)
+        return real(name)
+    return imported, patch.dict(registry._modules, clear=True), patch.object(registry, '_import', record)
+
+
+def test_icm_board_loads_only_icm_driver():
+    imported, mods, imp = _fresh()
+    with mods, imp:
+        imu = ImuSensor(IdI2C({0x68: {0x00: 0xEA}}))
+        assert imu._lib == 'icm20948'
+        assert imported == ['drivers.icm20948']
+        assert registry.loaded() == ['icm20948']
+    assert 'icm20948' in registry.stats
+    assert any(line.startswith('icm20948: ') for line in registry.report())
+
+
+def test_mpu_board_loads_only_mpu_driver():
+    imported, mods, imp = _fresh()
+    with mods, imp:
+        imu = ImuSensor(IdI2C({0x69: {0x75: 0x73}, 0x0C: {}}))
+        assert imu._lib == 'mpu9250' and imu._drv.addr == 0x69
+        assert imported == ['drivers.mpu9250']
+
+
+def test_gy91_clone_with_mpu6500_runs_without_mag():
+    # MPU-6500 answers WHO_AM_I 0x70 and has no AK8963 at 0x0C
+    i2c = IdI2C({0x68: {0x75: 0x70, 0x3F: 0x40}})
+    imu = ImuSensor(i2c)
+    assert imu._lib == 'mpu9250' and imu.hw['who'] == 0x70
+    assert not imu._drv.has_mag
+    s = imu.read_into(imu._scratch)
+    assert s.has(VALID_IMU) and not s.valid & VALID_MAG
+    assert s.accel_g[2] == 1.0
+
+
+def test_absent_hardware_imports_nothing():
+    imported, mods, imp = _fresh()
+    i2c = IdI2C()
+    with mods, imp:
+        imu = ImuSensor(i2c)
+        baro = Bmp280Sensor(i2c)
+        assert imu._drv is None and baro._driver is None
+        assert imported == []
+    # One ID read per silent address, not one per driver
+    assert i2c.reads == [(0x68, 0x75), (0x69, 0x75), (0x76, 0xD0), (0x77, 0xD0)]
+
+
+def test_unknown_id_is_not_driven():
+    imported, mods, imp = _fresh()
+    with mods, imp:
+        assert registry.identify(IdI2C({0x68: {0x75: 0x12}}), registry.IMU) is None
+        assert imported == []
+
+
+def test_baro_at_second_address_and_explicit_addr():
+    i2c = IdI2C({0x77: {0xD0: 0x58}})
+    sp, addr, who = registry.identify(i2c, registry.BARO)
+    assert (sp.lib, addr, who) == ('bmp280', 0x77, 0x58)
+    assert registry.identify(i2c, registry.BARO, addr=0x76) is None
+    assert Bmp280Sensor(i2c)._addr == 0x77
+
+
+def test_hub_imports_gps_only_when_read():
+    hub = SensorHub(i2c=None)
+    hub.subscribe(('accel_g', 'altitude_m'))
+    hub.update()
+    assert hub._gps is None
+    hub.read_gps()
+    assert hub._gps is not None and 'gps' in registry.stats
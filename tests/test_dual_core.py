@@ -0,0 +1,92 @@
+"""Dual-core handoff tests (CPython threads stand in for core 1)."""
+import sys
+import threading
+import time
+from array import array
+
+from fc.dual_core import SampleSeqlock, SensorCore, SAMPLE_FIELDS
+from sensors.sensor_hub import SensorHub
+
+from fc_helpers import make_fc
+
+
+def test_seqlock_reader_never_sees_torn_sample_under_contention():
+    n = 10
+    lock = SampleSeqlock(n)
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        k = 0
+        while not stop.is_set():
+            k += 1
+            buf = lock.back()
+            for i in range(n):
+                buf[i] = float(k)
+            lock.publish(k)
+
+    def reader():
+        out = array('f', [0.0] * n)
+        ts_out = [0]
+        last = -1
+        for _ in range(20000):
+            seq = lock.read_into(out, ts_out)
+            ts = ts_out[0]
+            first = out[0]
+            if any(v != first for v in out):
+                errors.append(('torn', list(out)))
+                return
+            if first != float(ts) or seq < last:
+                errors.append(('order', seq, ts, first))
+                return
+            last = seq
+
+    old = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        w = threading.Thread(target=writer)
+        readers = [threading.Thread(target=reader) for _ in range(2)]
+        w.start()
+        for r in readers:
+            r.start()
+        for r in readers:
+            r.join()
+        stop.set()
+        w.join()
+    finally:
+        sys.setswitchinterval(old)
+    assert not errors, errors[0]
+    assert lock.seq > 0
+
+
+def test_sensor_core_publishes_hub_samples():
+    hub = SensorHub(i2c=None)
+    core = SensorCore(hub, imu_hz=2000, baro_div=4)
+    core.start()
+    try:
+        deadline = time.time() + 2.0
+        while core.samples < 20 and time.time() < deadline:
+            time.sleep(0.001)
+    finally:
+        core.stop()
+    assert core.samples >= 20 and not core.running
+    assert core.read()
+    assert core.snapshot_ts != 0
+    snap = dict(zip(SAMPLE_FIELDS, core.snapshot))
+    assert abs(snap['az'] - 1.0) < 1e-6
+    assert snap['pressure_pa'] > 90000.0
+
+
+def test_flight_computer_consumes_sensor_core():
+    fc = make_fc()
+    fc.set_telemetry_sink(None)
+    core = fc.start_sensor_core(imu_hz=1000, baro_div=10)
+    try:
+        while core.samples < 15:
+            time.sleep(0.001)
+        out = fc.step()
+    finally:
+        fc.stop_sensor_core()
+    assert fc.sensor_core is None
+    assert out['alt_m'] is not None
+    assert fc.sensors.sample.accel_g[2] > 0.9
@@ -0,0 +1,142 @@
+"""control/filters.py: frequency response, float vs fixed-point agreement,
+in-place updates and the flight-loop gyro filter."""
+import math
+from array import array
+from control import filters
+from control.filters import LowPass1, LowPass1Q, Biquad, BiquadQ, lowpass_biquad, notch
+
+from fc_helpers import make_fc
+
+FS = 1000
+
+
+def _sine(f_hz, n, amp=1.0):
+    return [amp * math.sin(2 * math.pi * f_hz * k / FS) for k in range(n)]
+
+
+def _gain(filt, f_hz, amp=1.0, n=2000):
+    """Steady-state output/input amplitude on axis 1 for a sine at f_hz."""
+    xs = _sine(f_hz, n, amp)
+    peak = 0.0
+    for k, x in enumerate(xs):
+        y = filt.update((0.0, x, -x))
+        if k >= n // 2:
+            peak = max(peak, abs(y[1]))
+    return peak / amp
+
+
+def test_first_order_dc_and_cutoff():
+    f = LowPass1(50, FS)
+    for _ in range(500):
+        y = f.update((1.0, -2.0, 3.0))
+    assert all(math.isclose(a, b, rel_tol=1e-5) for a, b in zip(y, (1.0, -2.0, 3.0)))
+    g = _gain(LowPass1(50, FS), 50)
+    assert 0.6 < g < 0.8       # ~-3 dB at the cutoff
+    assert _gain(LowPass1(50, FS), 400) < 0.2
+
+
+def test_biquad_lowpass_response():
+    assert _gain(lowpass_biquad(100, FS), 10) > 0.99
+    assert abs(_gain(lowpass_biquad(100, FS), 100) - 0.707) < 0.03
+    assert _gain(lowpass_biquad(100, FS), 400) < 0.05
+
+
+def test_notch_removes_center_only():
+    assert _gain(notch(200, FS), 200) < 0.02
+    assert _gain(notch(200, FS), 20) > 0.95
+    assert _gain(notch(200, FS), 450) > 0.95
+    # Retuned in place to a new motor frequency
+    f = notch(200, FS)
+    filters.set_notch(f, 300, FS)
+    assert _gain(f, 300) < 0.02 and _gain(f, 200) > 0.5
+
+
+def test_fixed_point_tracks_float():
+    amp = 20000  # raw counts, close to full scale
+    for fl, fx in ((LowPass1(80, FS), LowPass1Q(80, FS)),
+                   (lowpass_biquad(100, FS), lowpass_biquad(100, FS, fixed=True)),
+                   (notch(200, FS), notch(200, FS, fixed=True))):
+        assert isinstance(fx, (LowPass1Q, BiquadQ))
+        worst = 0
+        for x in _sine(37, 600, amp):
+            x += 3000 * math.sin(x)  # some broadband content
+            a = fl.update((x, -x, 0.0))
+            b = fx.update((int(x), int(-x), 0))
+            worst = max(worst, abs(a[0] - b[0]), abs(a[1] - b[1]))
+            assert b[2] == 0
+        assert worst < 0.01 * amp, (type(fx).__name__, worst)
+
+
+def test_fixed_point_stays_in_small_int_range():
+    # Full-scale square wave: every DF1 product, and their running sum in
+    # any order, must fit 31-bit ints, including a low cutoff's overshoot
+    lim = 1 << 30
+    qs = (lowpass_biquad(100, FS, fixed=True), lowpass_biquad(5, FS, fixed=True),
+          notch(150, FS, fixed=True))
+    assert [q.shift for q in qs] == [13, 13, 12]
+    for k in range(1200):
+        x = 32767 if (k // 150) % 2 else -32768
+        for q in qs:
+            for i in range(3):
+                terms = (q.b0 * x, q.b1 * q.x1[i], q.b2 * q.x2[i],
+                         q.a1 * q.y1[i], q.a2 * q.y2[i], q.e[i])
+                assert sum(abs(t) for t in terms) < lim
+            q.update((x, x, x))
+
+
+def test_fixed_point_dc_gain_at_low_cutoff():
+    # Quantisation leaves 1 + a1 + a2 only a few counts at low cutoffs; the
+    # DC gain must still be 1 and error feedback must settle on the input
+    for q in (lowpass_biquad(5, FS, fixed=True), lowpass_biquad(10, FS, fixed=True),
+              lowpass_biquad(20, FS, fixed=True), notch(150, FS, fixed=True)):
+        for _ in range(3000):
+            y = q.update((10000, -10000, 7))
+        tail = [0, 0, 0]
+        for _ in range(1000):
+            y = q.update((10000, -10000, 7))
+            for i in range(3):
+                tail[i] += y[i]
+        for t, want in zip(tail, (10000, -10000, 7)):
+            assert abs(t / 1000 - want) < 0.05, (q.b0, q.shift, tail)
+
+
+def test_update_in_place_and_reset():
+    v = array('f', [1.0, 2.0, 3.0])
+    f = Biquad(1.0, 0.0, 0.0, 0.0, 0.0)   # identity
+    assert f.update(v) is f.out and tuple(f.out) == (1.0, 2.0, 3.0)
+    lp = lowpass_biquad(50, FS)
+    assert lp.update(v, v) is v and v[0] < 1.0
+    lp.reset()
+    assert tuple(lp.s1) == (0.0, 0.0, 0.0)
+    bq = lowpass_biquad(50, FS, fixed=True)
+    bq.update((100, 200, 300))
+    bq.reset()
+    assert tuple(bq.e) == (0, 0, 0) and tuple(bq.y1) == (0, 0, 0)
+    q = LowPass1Q(50, FS)
+    assert tuple(q.update((100, 200, 300))) == (100, 200, 300)
+    q.reset()
+    assert tuple(q.update((-5, 0, 5))) == (-5, 0, 5)
+
+
+def test_flight_computer_gyro_filter():
+    plain = make_fc()
+    fc = make_fc(gyro_lpf_hz=20, dterm_lpf_hz=30)
+    assert plain.gyro_filter is None and plain.pid_roll.d_lpf_hz is None
+    assert isinstance(fc.gyro_filter, Biquad) and fc.pid_roll.d_lpf_hz == 30
+    fc.set_telemetry_sink(None)
+    fc.step()
+    assert fc.att_yaw_rate == fc.gyro_filter.out[2]
+    # Rebuilt for the scheduler's control rate; dropped above Nyquist
+    fc.build_scheduler(control_hz=500)
+    b = lowpass_biquad(20, 500)
+    assert math.isclose(fc.gyro_filter.b0, b.b0)
+    fc.gyro_lpf_hz = 300
+    fc.build_scheduler(control_hz=500)
+    assert fc.gyro_filter is None
+
+
+def test_filter_bench_runs():
+    from benchmarks.filter_bench import main
+    res = main(rounds=1)
+    assert len(res) == 3
+    assert all(us_f > 0 and us_q > 0 for us_f, us_q in res.values())
@@ -0,0 +1,71 @@
+from array import array
+
+from drivers.gps_neo6m import parse_nmea_line
+from sensors.geo import LocalFrame, M_PER_E7
+from sensors.gps_wrapper import GpsSensor
+from sensors.sample import SensorSample
+
+RMC = "$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A"
+GGA = "$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47"
+
+
+def test_nmea_integer_fields():
+	rmc = parse_nmea_line(RMC)
+	assert (rmc['lat_e7'], rmc['lon_e7']) == (481173000, 115166667)
+	assert rmc['speed_mm_s'] == 11524  # 22.4 kn
+	gga = parse_nmea_line(GGA)
+	assert gga['alt_mm'] == 545400
+	# NEO-6M prints five decimals of minutes; south/west are negative
+	m = parse_nmea_line("$GPGGA,000000,3351.12345,S,15112.54321,W,1,05,1.2,-12.3,M,,M,,")
+	assert m['lat_e7'] == -(330000000 + (5112345 * 200 + 60) // 120)
+	assert m['lon_e7'] == -(1510000000 + (1254321 * 200 + 60) // 120)
+	assert m['alt_mm'] == -12300
+
+
+def test_ned_offsets_are_exact_in_float32():
+	home = LocalFrame(481173020, 115166667, 545400)
+	# One receiver LSB north (1e-7 deg ~ 11 mm) is still resolved
+	n, e, d = home.to_ned(481173021, 115166667, 545400)
+	assert abs(n - M_PER_E7) < 1e-6 and e == 0.0 and d == 0.0
+	# 1 km north-east: float32 result within 0.1 mm of the double math
+	lat, lon = home.from_ned(1000.0, 1000.0)
+	n, e, d = home.to_ned(lat, lon, 535400)
+	assert abs(n - (lat - 481173020) * M_PER_E7) < 1e-4
+	assert abs(n - 1000.0) < 0.012 and abs(e - 1000.0) < 0.012
+	assert abs(d - 10.0) < 1e-6
+	# Whereas float32 degrees cannot even represent a 10 cm step
+	f = array('f', [48.1173020, 48.1173020 + 0.1 / (M_PER_E7 * 1e7)])
+	assert f[0] == f[1]
+
+
+def test_east_scale_uses_cos_lat():
+	eq = LocalFrame(0, 0)
+	sixty = LocalFrame(600000000, 0)
+	assert abs(sixty.k_east / eq.k_east - 0.5) < 1e-9
+	assert abs(sixty.to_ned(600000000, 10000)[1] - 10000 * M_PER_E7 * 0.5) < 1e-3
+
+
+def test_antimeridian_wrap():
+	fr = LocalFrame(0, 1799999990)
+	assert abs(fr.to_ned(0, -1799999990)[1] - 20 * M_PER_E7) < 1e-6
+
+
+class LineUART:
+	def __init__(self, lines):
+		self.lines = list(lines)
+
+	def readline(self):
+		return self.lines.pop(0).encode() if self.lines else None
+
+
+def test_sample_gets_integer_fix():
+	gps = GpsSensor(uart=LineUART([RMC, GGA]))
+	s = SensorSample()
+	gps.read_into(s)
+	gps.read_into(s)
+	assert (s.gps_lat_e7, s.gps_lon_e7, s.gps_alt_mm, s.gps_speed_mm_s) == (
+		481173000, 115166667, 545400, 11524)
+	home = LocalFrame(481173000, 115166667, 545400)
+	assert tuple(home.sample_ned(s)) == (0.0, 0.0, 0.0)
+	assert home.sample_ned(SensorSample()) is None
+	assert s.as_dict()['gps_lat_e7'] == 481173000
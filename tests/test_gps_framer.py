@@ -0,0 +1,96 @@
+from drivers.gps_neo6m import NEO6M, GpsFramer
+from sensors.gps_wrapper import GpsSensor
+from sensors.sample import SensorSample
+
+RMC = b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n"
+GGA = b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\r\n"
+
+
+class StreamUART:
+	"""Non-blocking UART stand-in: any()/readinto() over queued bytes."""
+	def __init__(self):
+		self.rx = bytearray()
+		self.reads = 0
+
+	def push(self, data):
+		self.rx += data
+
+	def any(self):
+		return len(self.rx)
+
+	def readinto(self, buf, nbytes=None):
+		n = min(len(buf) if nbytes is None else nbytes, len(self.rx))
+		buf[:n] = self.rx[:n]
+		del self.rx[:n]
+		self.reads += 1
+		return n
+
+	def readline(self):
+		raise AssertionError('poll() must not block on readline()')
+
+
+def test_sentences_split_across_polls():
+	u = StreamUART()
+	gps = NEO6M(uart=u)
+	stream = RMC + GGA
+	got = []
+	for i in range(0, len(stream), 7):
+		u.push(stream[i:i + 7])
+		msg = gps.poll()
+		if msg:
+			got.append(msg['type'])
+	assert got == ['RMC', 'GGA']
+	fix = gps.read_fix()
+	assert fix['has_fix'] and fix['sats'] == 8
+	assert abs(fix['lat'] - 48.1173) < 1e-4
+
+
+def test_bad_checksum_and_noise_are_dropped():
+	fr = GpsFramer()
+	bad = RMC.replace(b'*6A', b'*6B')
+	fr.feed(b'\x00garbage' + bad + b'$GPGGA,no,checksum\r\n' + GGA)
+	out = []
+	while fr.pending:
+		line = fr.next_sentence()
+		if line:
+			out.append(line)
+	assert out == [GGA[:GGA.index(b'*')].decode()]
+	assert fr.bad_checksum == 2 and fr.sentences == 1
+
+
+def test_overlong_sentence_is_dropped():
+	fr = GpsFramer()
+	fr.feed(b'$GP' + b'X' * 100 + b'*00\r\n' + RMC)
+	lines = []
+	while fr.pending:
+		line = fr.next_sentence()
+		if line:
+			lines.append(line)
+	assert len(lines) == 1 and lines[0].startswith('$GPRMC')
+	assert fr.overruns == 1
+
+
+def test_poll_cost_is_bounded():
+	u = StreamUART()
+	gps = NEO6M(uart=u, rx_size=256)
+	u.push((RMC + GGA) * 20)  # ~2.7 kB backlog
+	gps.poll(budget=128)
+	fr = gps.framer
+	# At most one ring's worth drained, at most `budget` bytes framed
+	assert len((RMC + GGA) * 20) - len(u.rx) == 256
+	assert fr.pending == 256 - 128
+	polls = 1
+	while u.any() or fr.pending:
+		gps.poll(budget=128)
+		polls += 1
+	assert fr.sentences == 40 and fr.bad_checksum == 0
+	assert polls >= len((RMC + GGA) * 20) // 256
+
+
+def test_wrapper_polls_once_per_read():
+	u = StreamUART()
+	u.push(RMC + GGA)
+	gps = GpsSensor(uart=u)
+	s = gps.read_into(SensorSample())
+	assert s.gps_has_fix and s.gps_sats == 8
+	assert abs(s.gps_alt_m - 545.4) < 1e-6
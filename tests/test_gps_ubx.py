@@ -0,0 +1,150 @@
+import struct
+
+from drivers.gps_neo6m import (NEO6M, GpsFramer, FRAME_UBX, CLS_NAV, NAV_POSLLH,
+	NAV_VELNED, NAV_SOL, NAV_PVT, UBX_NAV_PVT, ubx_frame)
+from sensors.gps_wrapper import GpsSensor
+from sensors.geo import LocalFrame
+from sensors.sample import SensorSample, VALID_GPS
+
+GGA = b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\r\n"
+
+LAT_E7 = 481173000
+LON_E7 = 115166667
+
+
+def _posllh():
+	return ubx_frame(CLS_NAV, NAV_POSLLH, struct.pack('<IiiiiII',
+		1000, LON_E7, LAT_E7, 592300, 545400, 2500, 4000))
+
+
+def _velned():
+	# cm/s and 1e-5 deg
+	return ubx_frame(CLS_NAV, NAV_VELNED, struct.pack('<IiiiIIiII',
+		1000, 100, -50, 20, 113, 112, 8440000, 30, 100000))
+
+
+def _sol(fix_type=3, flags=0x0D, num_sv=9, pdop=145):
+	p = bytearray(52)
+	struct.pack_into('<IihBB', p, 0, 1000, 0, 1700, fix_type, flags)
+	struct.pack_into('<HBB', p, 44, pdop, 0, num_sv)
+	return ubx_frame(CLS_NAV, NAV_SOL, bytes(p))
+
+
+def _pvt(fix_type=3, flags=0x01, lat_e7=LAT_E7, lon_e7=LON_E7):
+	p = bytearray(92)
+	struct.pack_into('<IHBBBBBBIiBBBBiiiiIIiiiiiIIH', p, 0,
+		2000, 2024, 5, 1, 12, 0, 0, 0x07, 30, 0,
+		fix_type, flags, 0, 12,
+		lon_e7, lat_e7, 592300, 545400, 2500, 4000,
+		1000, -500, 200, 1118, 8440000, 300, 100000, 120)
+	return ubx_frame(CLS_NAV, NAV_PVT, bytes(p))
+
+
+class StreamUART:
+	def __init__(self):
+		self.rx = bytearray()
+		self.tx = bytearray()
+
+	def any(self):
+		return len(self.rx)
+
+	def readinto(self, buf, nbytes=None):
+		n = min(len(buf) if nbytes is None else nbytes, len(self.rx))
+		buf[:n] = self.rx[:n]
+		del self.rx[:n]
+		return n
+
+	def write(self, data):
+		self.tx += data
+		return len(data)
+
+
+def test_cfg_rate_frame_matches_reference_bytes():
+	# Widely published CFG-RATE 200 ms / 5 Hz command
+	assert ubx_frame(0x06, 0x08, struct.pack('<HHH', 200, 1, 1)) == bytes.fromhex(
+		'B562060806 00C8000100 0100DE6A'.replace(' ', ''))
+
+
+def test_configure_ubx_disables_nmea_and_sets_rate():
+	u = StreamUART()
+	gps = NEO6M(uart=u)
+	assert gps.configure_ubx(rate_hz=5)
+	fr = GpsFramer()
+	fr.feed(bytes(u.tx))
+	sent = []
+	while fr.pending:
+		if fr.next_frame() == FRAME_UBX:
+			sent.append((fr.ubx_cls, fr.ubx_id, bytes(fr.ubx_buf[:fr.ubx_len])))
+	msgs = [p for c, i, p in sent if (c, i) == (0x06, 0x01)]
+	assert [m for m in msgs if m[0] == 0xF0] == [bytes((0xF0, k, 0)) for k in range(6)]
+	assert [m for m in msgs if m[0] == CLS_NAV] == [
+		bytes((CLS_NAV, NAV_POSLLH, 1)), bytes((CLS_NAV, NAV_VELNED, 1)), bytes((CLS_NAV, NAV_SOL, 1))]
+	assert sent[-1] == (0x06, 0x08, struct.pack('<HHH', 200, 1, 1))
+
+
+def test_neo6_nav_set_decodes_into_fix():
+	u = StreamUART()
+	gps = NEO6M(uart=u)
+	u.rx += GGA + _posllh() + _velned() + _sol() + ubx_frame(0x05, 0x01, bytes((0x06, 0x08)))
+	msg = gps.poll()
+	assert msg is gps.nav
+	nav = gps.nav
+	assert (nav.lat_e7, nav.lon_e7, nav.hmsl_mm) == (LAT_E7, LON_E7, 545400)
+	assert (nav.vel_n_mm_s, nav.vel_e_mm_s, nav.vel_d_mm_s, nav.gspeed_mm_s) == (1000, -500, 200, 1120)
+	assert nav.fix_type == 3 and nav.fix_ok and nav.num_sv == 9 and nav.pdop_e2 == 145
+	assert gps.acks == 1
+	fix = gps.read_fix()
+	assert fix['type'] == 'UBX' and fix['has_fix']
+	assert abs(fix['lat'] - 48.1173) < 1e-7 and abs(fix['alt_m'] - 545.4) < 1e-9
+	assert abs(fix['course_deg'] - 84.4) < 1e-9
+
+
+def test_nav_pvt_and_checksum_rejection():
+	u = StreamUART()
+	gps = NEO6M(uart=u)
+	bad = bytearray(_pvt())
+	bad[20] ^= 0xFF
+	u.rx += bytes(bad)
+	assert gps.poll() is None and gps.framer.bad_checksum == 1
+	u.rx += _pvt()
+	assert gps.poll() is gps.nav
+	nav = gps.nav
+	assert nav.lat_e7 == LAT_E7 and nav.gspeed_mm_s == 1118 and nav.num_sv == 12
+	assert nav.fix_ok and nav.pdop_e2 == 120
+
+
+def test_frames_split_across_polls_and_wrapper():
+	u = StreamUART()
+	gps = GpsSensor(uart=u)
+	stream = _posllh() + _sol()
+	s = SensorSample()
+	for i in range(0, len(stream), 5):
+		u.rx += stream[i:i + 5]
+		gps.read_into(s)
+	assert s.gps_has_fix and s.gps_sats == 9
+	assert abs(s.gps_lat - 48.1173) < 1e-7
+
+
+def test_no_fix_pvt_is_not_valid():
+	u = StreamUART()
+	gps = GpsSensor(uart=u)
+	s = SensorSample()
+	u.rx += _pvt()
+	gps.read_into(s)
+	assert s.has(VALID_GPS) and s.gps_lat_e7 == LAT_E7
+	# Receiver lost the fix and reports a zero position
+	u.rx += _pvt(fix_type=0, flags=0, lat_e7=0, lon_e7=0)
+	gps.read_into(s)
+	assert not s.gps_has_fix and s.valid & VALID_GPS == 0
+	assert s.gps_lat_e7 == LAT_E7 and s.gps_lon_e7 == LON_E7
+	assert s.as_dict()['gps_lat'] is None
+	frame = LocalFrame()
+	frame.set_home(LAT_E7, LON_E7, 545400)
+	assert frame.sample_ned(s) is None
+
+
+def test_pvt_config_set():
+	u = StreamUART()
+	NEO6M(uart=u).configure_ubx(rate_hz=10, nav_msgs=UBX_NAV_PVT, disable_nmea=False)
+	assert bytes(ubx_frame(0x06, 0x01, bytes((CLS_NAV, NAV_PVT, 1)))) in bytes(u.tx)
+	assert bytes(ubx_frame(0x06, 0x08, struct.pack('<HHH', 100, 1, 1))) in bytes(u.tx)
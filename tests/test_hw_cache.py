@@ -0,0 +1,124 @@
+import json
+import os
+import struct
+import tempfile
+
+from drivers.icm20948 import ICM20948
+from sensors import hw_cache
+from sensors.sensor_hub import SensorHub
+
+_CAL = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+
+
+class BoardI2C:
+    """IMU at 0x68 (banked ICM-20948, or MPU-9250 + AK8963) and a BMP280;
+    absent addresses NACK."""
+    def __init__(self, bmp_addr=0x76, imu='icm'):
+        self.files = {}
+        self.bank = 0
+        self.present = {0x68, bmp_addr}
+        if imu == 'icm':
+            self.file(0x68)[0x00] = 0xEA
+        else:
+            self.file(0x68)[0x75] = 0x71
+            self.present.add(0x0C)
+        b = self.file(bmp_addr)
+        b[0xD0] = 0x58
+        b[0x88:0x88 + 24] = struct.pack('<HhhHhhhhhhhh', *_CAL)
+        self.transactions = 0
+        self.scans = 0
+
+    def file(self, addr, bank=0):
+        return self.files.setdefault((addr, bank), bytearray(256))
+
+    def _f(self, addr):
+        self.transactions += 1
+        if addr not in self.present:
+            raise OSError(19)
+        return self.file(addr, self.bank if addr == 0x68 else 0)
+
+    def scan(self):
+        # machine.I2C.scan() addresses every 7-bit address 0x08..0x77
+        self.scans += 1
+        self.transactions += 112
+        return sorted(self.present)
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(self._f(addr)[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        f = self._f(addr)
+        for i in range(len(buf)):
+            buf[i] = f[reg + i]
+
+    def writeto_mem(self, addr, reg, data):
+        f = self._f(addr)
+        if addr == 0x68 and reg == 0x7F:
+            self.bank = data[0] >> 4 & 3
+            return
+        f[reg:reg + len(data)] = data
+
+
+def _tmp(name='hw.json'):
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def test_first_boot_probes_and_records():
+    path = _tmp()
+    hub = SensorHub(BoardI2C(), hw_cache=path)
+    assert hub.hw_source == 'probe'
+    with open(path) as f:
+        rec = json.load(f)
+    assert rec['version'] == hw_cache.HW_CACHE_VERSION
+    assert rec['imu'] == {'lib': 'icm20948', 'ctor': 'ICM20948', 'addr': 0x68,
+                          'id_reg': 0x00, 'who': 0xEA}
+    assert rec['baro'] == {'lib': 'bmp280', 'ctor': 'BMP280', 'addr': 0x76,
+                           'id_reg': 0xD0, 'who': 0x58}
+
+
+def test_next_boot_uses_cache_without_scan():
+    path = _tmp()
+    cold = BoardI2C()
+    SensorHub(cold, hw_cache=path)
+    warm = BoardI2C()
+    hub = SensorHub(warm, hw_cache=path)
+    assert hub.hw_source == 'cache'
+    assert hub.imu.hw_cached and hub.baro.hw_cached
+    assert isinstance(hub.imu._drv, ICM20948)
+    assert warm.scans == 0 and cold.scans == 0
+    assert warm.transactions < cold.transactions
+    assert hub.discovery_us >= 0
+
+
+def test_mismatch_falls_back_and_rewrites():
+    path = _tmp()
+    SensorHub(BoardI2C(), hw_cache=path)
+    moved = BoardI2C(bmp_addr=0x77)
+    hub = SensorHub(moved, hw_cache=path)
+    assert hub.hw_source == 'probe' and not hub.baro.hw_cached
+    assert hub.imu.hw_cached and hub.baro.hw['addr'] == 0x77
+    assert hw_cache.load(path)['baro']['addr'] == 0x77
+    assert SensorHub(BoardI2C(bmp_addr=0x77), hw_cache=path).hw_source == 'cache'
+
+
+def test_wrong_chip_id_is_not_trusted():
+    path = _tmp()
+    SensorHub(BoardI2C(), hw_cache=path)
+    hub = SensorHub(BoardI2C(imu='mpu'), hw_cache=path)
+    assert not hub.imu.hw_cached and hub.hw_source == 'probe'
+    assert hub.imu._lib == 'mpu9250'
+    assert hw_cache.load(path)['imu'] == {'lib': 'mpu9250', 'ctor': 'MPU9250', 'addr': 0x68,
+                                          'id_reg': 0x75, 'who': 0x71}
+
+
+def test_bad_file_and_no_bus():
+    path = _tmp()
+    with open(path, 'w') as f:
+        f.write('{not json')
+    assert hw_cache.load(path) is None
+    assert SensorHub(BoardI2C(), hw_cache=path).hw_source == 'probe'
+    assert hw_cache.load(path) is not None
+    other = _tmp('none.json')
+    hub = SensorHub(None, hw_cache=other)
+    assert hub.hw == {'imu': None, 'baro': None}
+    assert hw_cache.load(other) is None
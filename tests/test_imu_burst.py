@@ -0,0 +1,116 @@
+import math
+
+import sensors.imu_wrapper as imu_wrapper
+from drivers.icm20948 import ICM20948
+from drivers.mpu9250 import MPU9250
+
+
+class RegFileI2C:
+    """256-byte register file per address; counts read transactions."""
+    def __init__(self):
+        self.regs = {}
+        self.reads = 0
+
+    def _file(self, addr):
+        return self.regs.setdefault(addr, bytearray(256))
+
+    def poke16(self, addr, reg, v):
+        v &= 0xFFFF
+        f = self._file(addr)
+        f[reg] = v >> 8
+        f[reg + 1] = v & 0xFF
+
+    def readfrom_mem(self, addr, reg, n):
+        self.reads += 1
+        return bytes(self._file(addr)[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        self.reads += 1
+        f = self._file(addr)
+        for i in range(len(buf)):
+            buf[i] = f[reg + i]
+
+    def writeto_mem(self, addr, reg, data):
+        self._file(addr)[reg:reg + len(data)] = data
+
+
+def _mpu_bus():
+    i2c = RegFileI2C()
+    i2c.regs.setdefault(0x68, bytearray(256))[0x75] = 0x71  # WHO_AM_I
+    for reg, v in ((0x3B, 16384), (0x3D, -8192), (0x3F, 4096),   # accel
+                   (0x41, 3339),                                 # temp
+                   (0x43, 131), (0x45, -262), (0x47, 1310)):     # gyro
+        i2c.poke16(0x68, reg, v)
+    return i2c
+
+
+def _icm_bus():
+    i2c = RegFileI2C()
+    i2c.regs.setdefault(0x68, bytearray(256))[0x00] = 0xEA
+    for reg, v in ((0x2D, 16384), (0x2F, -8192), (0x31, 4096),   # accel
+                   (0x33, 131), (0x35, -262), (0x37, 1310),      # gyro
+                   (0x39, 3339)):                                # temp
+        i2c.poke16(0x68, reg, v)
+    return i2c
+
+
+EXPECTED = (1.0, -0.5, 0.25, 1.0, -2.0, 10.0, 3339 / 333.87 + 21.0)
+
+
+def _check(d):
+    for got, want in zip(d, EXPECTED):
+        assert math.isclose(got, want, rel_tol=1e-5), (tuple(d), EXPECTED)
+
+
+def test_mpu9250_read_all_single_transaction():
+    i2c = _mpu_bus()
+    imu = MPU9250(i2c)
+    i2c.reads = 0
+    d = imu.read_all()
+    assert i2c.reads == 1
+    _check(d)
+    # Matches the per-register properties
+    assert tuple(round(v, 4) for v in d[:3]) == tuple(round(v, 4) for v in imu.acceleration)
+    assert tuple(round(v, 4) for v in d[3:6]) == tuple(round(v, 4) for v in imu.gyro)
+    assert d is imu.data and imu.read_all() is d
+
+
+def test_icm20948_read_all_single_transaction():
+    i2c = _icm_bus()
+    imu = ICM20948(i2c)
+    i2c.reads = 0
+    d = imu.read_all()
+    assert i2c.reads == 1
+    _check(d)
+    assert math.isclose(d[6], imu.temperature, rel_tol=1e-5)
+
+
+def test_read_all_without_readfrom_mem_into():
+    class PlainI2C(RegFileI2C):
+        readfrom_mem_into = None
+    i2c = PlainI2C()
+    i2c.regs[0x68] = _icm_bus().regs[0x68]
+    imu = ICM20948(i2c)
+    _check(imu.read_all())
+
+
+def test_imu_wrapper_uses_burst_read():
+    i2c = _icm_bus()
+    sensor = imu_wrapper.ImuSensor(i2c)
+    assert sensor._lib == 'icm20948'
+    i2c.reads = 0
+    s = sensor.read_into(sensor._scratch)
+    assert i2c.reads == 1
+    _check(tuple(s.accel_g) + tuple(s.gyro_dps) + (s.imu_temp_c,))
+
+
+def test_imu_wrapper_mpu9250_burst_plus_mag():
+    i2c = _mpu_bus()
+    sensor = imu_wrapper.ImuSensor(i2c)
+    assert sensor._lib == 'mpu9250'
+    i2c.reads = 0
+    out = sensor.read()
+    # One burst for accel/temp/gyro plus the AK8963 status poll (no data ready)
+    assert i2c.reads == 2
+    assert math.isclose(out['gyro_dps'][2], 10.0, rel_tol=1e-5)
+    assert all(math.isnan(v) for v in out['mag_uT'])
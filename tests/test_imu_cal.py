@@ -0,0 +1,176 @@
+"""IMU calibration: Welford still detection, 6-position accel fit, decode-path
+correction in the drivers and the flash record."""
+import math
+import os
+import random
+import statistics
+import struct
+import tempfile
+
+from drivers import mpu9250
+from drivers.icm20948 import ICM20948
+from drivers.mpu9250 import MPU9250
+from sensors import imu_cal
+from sensors.imu_wrapper import ImuSensor
+from sensors.sensor_hub import SensorHub
+
+
+class RegI2C:
+    """Register file per address; the MPU FIFO drains from fifo."""
+    def __init__(self):
+        self.regs = {}
+        self.fifo = bytearray()
+
+    def f(self, addr):
+        return self.regs.setdefault(addr, bytearray(256))
+
+    def poke16(self, addr, reg, v):
+        self.f(addr)[reg:reg + 2] = struct.pack('>h', v)
+
+    def readfrom_mem(self, addr, reg, n):
+        if addr == 0x68 and reg == mpu9250.REG_FIFO_R_W:
+            d = bytes(self.fifo[:n])
+            del self.fifo[:n]
+            return d
+        if addr == 0x68 and reg == mpu9250.REG_FIFO_COUNTH:
+            return struct.pack('>H', len(self.fifo))[:n]
+        return bytes(self.f(addr)[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        buf[:] = self.readfrom_mem(addr, reg, len(buf))
+
+    def writeto_mem(self, addr, reg, data):
+        self.f(addr)[reg:reg + len(data)] = data
+
+
+def _mpu_bus(accel=(0, 0, 16384), gyro=(0, 0, 0)):
+    i2c = RegI2C()
+    i2c.f(0x68)[0x75] = 0x71
+    i2c.f(0x0C)
+    for i in range(3):
+        i2c.poke16(0x68, 0x3B + 2 * i, accel[i])
+        i2c.poke16(0x68, 0x43 + 2 * i, gyro[i])
+    return i2c
+
+
+def _tmp(name='cal.json'):
+    return os.path.join(tempfile.mkdtemp(), name)
+
+
+def test_welford_matches_batch_statistics():
+    rng = random.Random(1)
+    xs = [(rng.gauss(1, 0.1), rng.gauss(-2, 0.5), rng.gauss(0, 2)) for _ in range(200)]
+    w = imu_cal.Welford3()
+    for x in xs:
+        w.add(*x)
+    for i in range(3):
+        col = [x[i] for x in xs]
+        assert math.isclose(w.mean[i], statistics.fmean(col), abs_tol=1e-9)
+        assert math.isclose(w.var(i), statistics.variance(col), rel_tol=1e-9)
+
+
+def test_gyro_bias_rejects_motion():
+    rng = random.Random(2)
+    est = imu_cal.GyroBias(samples=100)
+    bias = (0.8, -1.5, 0.3)
+    done = False
+    for k in range(400):
+        if done:
+            break
+        g = [b + rng.gauss(0, 0.05) for b in bias]
+        if k == 50:
+            g[2] += 30.0  # bumped
+        done = est.add(*g)
+    assert done and est.rejected == 1
+    for got, want in zip(est.bias, bias):
+        assert abs(got - want) < 0.03
+    # A window that wanders within max_dev but is too noisy is not accepted
+    noisy = imu_cal.GyroBias(samples=50, max_std_dps=0.1, max_dev_dps=5.0)
+    assert not any(noisy.add(rng.gauss(0, 1.0), 0.0, 0.0) for _ in range(50))
+    assert noisy.rejected == 1 and noisy.bias is None
+
+
+def test_accel_six_position_recovers_offset_and_scale():
+    off = (0.03, -0.02, 0.05)
+    gain = (1.02, 0.98, 1.01)   # sensor reads gain * true + off
+    est = imu_cal.AccelSixPosition(samples=20)
+    # Tilted 45 deg: no axis carries gravity, nothing captured
+    for _ in range(20):
+        r = est.add(0.70, 0.0, 0.70)
+    assert r is None and len(est.missing()) == 6
+    for axis in range(3):
+        for sign in (1, -1):
+            true = [0.0, 0.0, 0.0]
+            true[axis] = sign
+            r = None
+            for _ in range(20):
+                r = est.add(*[gain[i] * true[i] + off[i] for i in range(3)])
+            assert r == axis * 2 + (0 if sign > 0 else 1)
+    o, s = est.result()
+    for i in range(3):
+        assert math.isclose(o[i], off[i], abs_tol=1e-9)
+        assert math.isclose(s[i], 1.0 / gain[i], rel_tol=1e-9)
+
+
+def test_driver_decode_applies_integer_offsets():
+    i2c = _mpu_bus(accel=(16384 + 164, -8192, 4096), gyro=(131 + 66, -262, 1310))
+    imu = MPU9250(i2c)
+    imu.set_calibration(gyro_bias_dps=(0.5, 0.0, 0.0),
+                        accel_offset_g=(0.01, 0.0, 0.0), accel_scale=(1.0, 2.0, 1.0))
+    assert all(isinstance(v, int) for v in imu._cal_off)
+    d = imu.read_all()
+    assert math.isclose(d[0], 1.0, abs_tol=1e-3)
+    assert math.isclose(d[1], -1.0, rel_tol=1e-6)
+    assert math.isclose(d[3], 1.0, abs_tol=1e-2)
+    assert math.isclose(d[4], -2.0, rel_tol=1e-6)
+    assert tuple(round(v, 4) for v in d[:3]) == tuple(round(v, 4) for v in imu.acceleration)
+    assert tuple(round(v, 4) for v in d[3:6]) == tuple(round(v, 4) for v in imu.gyro)
+    # FIFO samples go through the same correction
+    imu.enable_fifo(rate_hz=500, max_samples=4)
+    i2c.fifo += struct.pack('>6h', 16384 + 164, -8192, 4096, 131 + 66, -262, 1310)
+    assert imu.read_fifo() == 1
+    for got, want in zip(imu.fifo_data[:6], d[:6]):
+        assert math.isclose(got, want, rel_tol=1e-6)
+    imu.set_calibration()
+    assert math.isclose(imu.read_all()[1], -0.5, rel_tol=1e-6)
+
+
+def test_icm_decode_and_wrong_lib_record():
+    i2c = RegI2C()
+    i2c.f(0x68)[0x00] = 0xEA
+    i2c.poke16(0x68, 0x33, 131)  # gyro x
+    sensor = ImuSensor(i2c)
+    assert isinstance(sensor._drv, ICM20948)
+    assert sensor.set_calibration(imu_cal.record('icm20948', gyro_bias_dps=(1.0, 0.0, 0.0)))
+    assert sensor.read()['gyro_dps'][0] == 0.0
+    assert not sensor.set_calibration(imu_cal.record('mpu9250', gyro_bias_dps=(1.0, 0.0, 0.0)))
+    assert sensor.cal is None and sensor.read()['gyro_dps'][0] == 1.0
+    assert not ImuSensor(None).set_calibration(imu_cal.record(gyro_bias_dps=(1, 2, 3)))
+
+
+def test_record_round_trip_and_hub_applies_it():
+    path = _tmp()
+    cal = imu_cal.record('mpu9250', (2.0, 0.0, -1.0), (0.0, 0.0, 0.25), (1.0, 1.0, 1.0))
+    assert imu_cal.save(cal, path)
+    assert imu_cal.load(path) == dict(cal, version=imu_cal.IMU_CAL_VERSION)
+    hub = SensorHub(_mpu_bus(gyro=(262, 0, -131)), imu_cal=path)
+    hub.update()
+    s = hub.sample
+    assert s.gyro_dps[0] == 0.0 and s.gyro_dps[2] == 0.0
+    assert math.isclose(s.accel_g[2], 0.75, rel_tol=1e-6)
+    with open(path, 'w') as f:
+        f.write('{"version": 1, "gyro_bias_dps": [1, 2]}')
+    assert imu_cal.load(path) is None
+    assert imu_cal.load(_tmp('missing.json')) is None
+
+
+def test_calibrate_gyro_reads_raw_and_restores_accel():
+    i2c = _mpu_bus(accel=(0, 0, 16384 + 1638), gyro=(66, -131, 0))
+    sensor = ImuSensor(i2c)
+    sensor.set_calibration(imu_cal.record('mpu9250', (9.0, 9.0, 9.0), (0.0, 0.0, 0.1)))
+    bias = imu_cal.calibrate_gyro(sensor, imu_cal.GyroBias(samples=20), period_ms=0)
+    assert math.isclose(bias[0], 66 / 131.0, rel_tol=1e-6)
+    assert math.isclose(bias[1], -1.0, rel_tol=1e-6)
+    # The previous record is back in place afterwards
+    assert sensor.cal['gyro_bias_dps'] == [9.0, 9.0, 9.0]
+    assert math.isclose(sensor.read()['accel_g'][2], 1.0, abs_tol=1e-4)
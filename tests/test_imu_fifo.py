@@ -0,0 +1,158 @@
+import math
+import struct
+
+import sensors.imu_wrapper as imu_wrapper
+from drivers import icm20948, mpu9250
+from drivers.icm20948 import ICM20948
+from drivers.mpu9250 import MPU9250
+
+
+class FifoI2C:
+    """Register file with a FIFO behind fifo_reg and its count at count_reg."""
+    def __init__(self, count_reg, fifo_reg, who=None):
+        self.mem = bytearray(256)
+        if who is not None:
+            self.mem[0] = who
+        self.count_reg = count_reg
+        self.fifo_reg = fifo_reg
+        self.fifo = bytearray()
+        self.writes = []
+        self.reads = 0
+
+    def push(self, accel_raw, gyro_raw):
+        self.fifo += struct.pack('>6h', *(tuple(accel_raw) + tuple(gyro_raw)))
+
+    def _read(self, reg, n):
+        self.reads += 1
+        if reg == self.fifo_reg:
+            d = bytes(self.fifo[:n])
+            del self.fifo[:n]
+            return d
+        if reg == self.count_reg:
+            c = len(self.fifo)
+            return bytes(((c >> 8) & 0x1F, c & 0xFF))[:n]
+        return bytes(self.mem[reg:reg + n])
+
+    def readfrom_mem(self, addr, reg, n):
+        return self._read(reg, n)
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        d = self._read(reg, len(buf))
+        for i in range(len(d)):
+            buf[i] = d[i]
+
+    def writeto_mem(self, addr, reg, data):
+        self.writes.append((reg, bytes(data)))
+        self.mem[reg:reg + len(data)] = data
+
+
+def _mpu():
+    i2c = FifoI2C(mpu9250.REG_FIFO_COUNTH, mpu9250.REG_FIFO_R_W)
+    return i2c, MPU9250(i2c)
+
+
+def _icm():
+    i2c = FifoI2C(icm20948.REG_FIFO_COUNTH, icm20948.REG_FIFO_R_W, who=0xEA)
+    return i2c, ICM20948(i2c)
+
+
+def test_mpu9250_fifo_config_and_drain():
+    i2c, imu = _mpu()
+    rate = imu.enable_fifo(rate_hz=500, max_samples=8)
+    assert rate == 500.0
+    assert (mpu9250.REG_SMPLRT_DIV, b'\x01') in i2c.writes
+    assert (mpu9250.REG_FIFO_EN, b'\x78') in i2c.writes
+    assert i2c.writes[-1] == (mpu9250.REG_USER_CTRL, b'\x40')
+    for k in range(5):
+        i2c.push((16384, 0, -8192), (131 * k, 0, -131))
+    i2c.reads = 0
+    n = imu.read_fifo()
+    assert n == 5 and i2c.reads == 2  # count + one bulk read
+    d = imu.fifo_data
+    for k in range(5):
+        row = d[k * 6:k * 6 + 6]
+        assert tuple(row) == (1.0, 0.0, -0.5, float(k), 0.0, -1.0)
+    assert imu.read_fifo() == 0
+
+
+def test_fifo_partial_frame_and_capacity():
+    i2c, imu = _mpu()
+    imu.enable_fifo(rate_hz=1000, max_samples=4)
+    for k in range(6):
+        i2c.push((k, 0, 0), (0, 0, 0))
+    i2c.fifo += b'\x01\x02\x03'  # half-written frame stays queued
+    assert imu.read_fifo() == 4
+    assert imu.fifo_data[18] == 3 / 16384.0
+    assert imu.read_fifo() == 2
+    assert imu.fifo_data[0] == 4 / 16384.0
+    assert len(i2c.fifo) == 3
+
+
+def test_fifo_overflow_resets():
+    i2c, imu = _mpu()
+    imu.enable_fifo(max_samples=8)
+    i2c.fifo += bytes(512)
+    i2c.writes.clear()
+    assert imu.read_fifo() == 0
+    assert imu.fifo_overflows == 1
+    assert (mpu9250.REG_USER_CTRL, b'\x04') in i2c.writes
+    i2c, imu = _icm()
+    imu.enable_fifo(max_samples=8)
+    i2c.fifo += bytes(512)
+    i2c.writes.clear()
+    assert imu.read_fifo() == 0
+    assert imu.fifo_overflows == 1
+    assert (icm20948.REG_FIFO_RST, b'\x1f') in i2c.writes
+
+
+def test_full_fifo_of_whole_frames_is_drained_not_reset():
+    # 42 frames = 504 bytes is the most the 512-byte FIFO holds without
+    # wrapping; only a count of 512 means frames were lost
+    for make, reset_reg in ((_mpu, mpu9250.REG_USER_CTRL),
+                            (_icm, icm20948.REG_FIFO_RST)):
+        i2c, imu = make()
+        imu.enable_fifo(rate_hz=1000, max_samples=64)
+        for k in range(42):
+            i2c.push((k, 0, 0), (0, 0, 0))
+        i2c.writes.clear()
+        assert imu.read_fifo() == 42
+        assert imu.fifo_overflows == 0 and i2c.fifo == b''
+        assert imu.fifo_data[41 * 6] == 41 / 16384.0
+        assert not any(reg == reset_reg for reg, _ in i2c.writes)
+
+
+def test_icm20948_fifo_uses_bank2_dividers():
+    i2c, imu = _icm()
+    rate = imu.enable_fifo(rate_hz=1100, max_samples=16)
+    assert rate == 1100.0
+    w = i2c.writes
+    i = w.index((icm20948.REG_BANK_SEL, b'\x20'))
+    j = w.index((icm20948.REG_BANK_SEL, b'\x00'), i)
+    assert (icm20948.REG_GYRO_SMPLRT_DIV, b'\x00') in w[i:j]
+    assert (icm20948.REG_ACCEL_SMPLRT_DIV_2, b'\x00') in w[i:j]
+    assert (icm20948.REG_FIFO_EN_2, b'\x1e') in w[j:]
+    for k in range(3):
+        i2c.push((0, 16384, 0), (0, 262, 0))
+    assert imu.read_fifo() == 3
+    assert tuple(imu.fifo_data[12:18]) == (0.0, 1.0, 0.0, 0.0, 2.0, 0.0)
+
+
+def test_imu_wrapper_averages_fifo_samples():
+    i2c = FifoI2C(icm20948.REG_FIFO_COUNTH, icm20948.REG_FIFO_R_W, who=0xEA)
+    sensor = imu_wrapper.ImuSensor(i2c)
+    assert sensor.enable_fifo(rate_hz=1000, max_samples=16)
+    s = sensor._scratch
+    for gx in (131, 262, 393, 524):
+        i2c.push((0, 0, 16384), (gx, 0, 0))
+    sensor.read_into(s)
+    assert sensor.fifo_n == 4
+    assert math.isclose(s.gyro_dps[0], 2.5, rel_tol=1e-6)
+    assert math.isclose(s.accel_g[2], 1.0, rel_tol=1e-6)
+    # Empty FIFO keeps the previous sample
+    sensor.read_into(s)
+    assert sensor.fifo_n == 0 and math.isclose(s.gyro_dps[0], 2.5, rel_tol=1e-6)
+
+
+def test_imu_wrapper_fifo_unsupported_without_driver():
+    sensor = imu_wrapper.ImuSensor(None)
+    assert sensor.enable_fifo() is None
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+from drivers import icm20948
+from fc.async_runtime import FlightRuntime
+from fc.flight_computer import FlightComputer
+from fc.sil import CaptureMotors
+from sensors.imu_wrapper import ImuSensor
+from sensors.sensor_hub import SensorHub
+
+
+class RegI2C:
+    def __init__(self):
+        self.mem = bytearray(256)
+        self.mem[0] = 0xEA  # ICM-20948 WHO_AM_I
+        self.mem[0x31] = 0x40  # az = 1 g
+        self.writes = []
+
+    def readfrom_mem(self, addr, reg, n):
+        if addr != 0x68:
+            raise OSError(19)
+        return bytes(self.mem[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        buf[:] = self.readfrom_mem(addr, reg, len(buf))
+
+    def writeto_mem(self, addr, reg, data):
+        if addr != 0x68:
+            raise OSError(19)
+        self.writes.append((reg, bytes(data)))
+        self.mem[reg:reg + len(data)] = data
+
+
+class FakePin:
+    def __init__(self):
+        self.handler = None
+        self.hard = None
+
+    def irq(self, trigger=None, handler=None, hard=False):
+        self.handler = handler
+        self.hard = hard
+
+    def fire(self):
+        if self.handler is not None:
+            self.handler(self)
+
+
+class SoftOnlyPin(FakePin):
+    """Port whose Pin.irq() has no hard= argument."""
+    def irq(self, trigger=None, handler=None):
+        self.handler = handler
+
+
+def test_imu_irq_configures_int_and_timestamps():
+    i2c = RegI2C()
+    imu = ImuSensor(i2c)
+    pin = FakePin()
+    seen = []
+    assert imu.enable_irq(pin, rate_hz=550, on_ready=seen.append)
+    assert (icm20948.REG_INT_ENABLE_1, b'\x01') in i2c.writes
+    assert (icm20948.REG_INT_PIN_CFG, b'\x10') in i2c.writes
+    assert (icm20948.REG_GYRO_SMPLRT_DIV, b'\x01') in i2c.writes
+    pin.fire()
+    pin.fire()
+    assert imu.irq_count == 2 and seen[-1] == imu.irq_ts_us
+    imu.read_into(imu._scratch)
+    assert imu.sample_ts_us == imu.irq_ts_us
+    assert imu.missed == 1
+    pin.fire()
+    imu.read_into(imu._scratch)
+    assert imu.missed == 1
+    imu.disable_irq()
+    assert pin.handler is None
+    assert i2c.writes[-2] == (icm20948.REG_INT_ENABLE_1, b'\x00')
+
+
+def test_imu_irq_is_hard_where_supported():
+    imu = ImuSensor(RegI2C())
+    pin = FakePin()
+    assert imu.enable_irq(pin)
+    assert pin.hard is True and pin.handler is not None
+    soft = SoftOnlyPin()
+    imu = ImuSensor(RegI2C())
+    assert imu.enable_irq(soft)
+    soft.fire()
+    assert soft.hard is None and imu.irq_count == 1
+
+
+def test_imu_irq_unavailable_without_driver():
+    imu = ImuSensor(None)
+    assert imu.enable_irq(FakePin()) is False
+
+
+def _make_fc():
+    fc = FlightComputer(loop_hz=200, sensors=SensorHub(RegI2C()), motors=CaptureMotors())
+    fc.set_telemetry_sink(None)
+    fc.stats_every_s = None
+    return fc
+
+
+def test_run_steps_once_per_data_ready_edge():
+    fc = _make_fc()
+    pin = FakePin()
+    assert fc.enable_imu_irq(pin=pin)
+    fires = 20
+
+    def pulses():
+        for _ in range(fires):
+            time.sleep(0.004)
+            pin.fire()
+    th = threading.Thread(target=pulses)
+    th.start()
+    fc.run(seconds=0.2)
+    th.join()
+    assert fc.loop_stats.loops == fires
+
+
+def test_async_control_task_is_released_by_irq():
+    fc = _make_fc()
+    pin = FakePin()
+    assert fc.enable_imu_irq(pin=pin)
+    rt = FlightRuntime(fc)
+
+    async def scenario():
+        async def pulses():
+            for _ in range(15):
+                await asyncio.sleep(0.004)
+                pin.fire()
+        p = asyncio.ensure_future(pulses())
+        await rt.main(0.15)
+        await p
+    asyncio.run(scenario())
+    d = rt.stats()['deadlines']['control']
+    assert d['runs'] == 15
+    assert d['missed'] == 0
+    assert fc.on_imu_ready is None
@@ -0,0 +1,71 @@
+"""Loop timing instrumentation tests (explicit timestamps, no hardware)."""
+import time
+
+from fc.loop_stats import LoopStats, STAGE_SENSORS, STAGE_AHRS, STAGE_NAMES
+
+from fc_helpers import make_fc
+
+
+def test_stage_min_max_mean():
+    st = LoopStats(loop_hz=1000)
+    for start, sensor_us in ((0, 100), (1000, 300), (2000, 200)):
+        st.begin(start)
+        st.stage(STAGE_SENSORS, start + sensor_us)
+        st.stage(STAGE_AHRS, start + sensor_us + 50)
+        st.end(start + sensor_us + 50)
+    s = st.snapshot()['stages']['sensors']
+    assert s['count'] == 3
+    assert s['min_us'] == 100 and s['max_us'] == 300
+    assert abs(s['mean_us'] - 200.0) < 1e-9
+    assert st.snapshot()['stages']['ahrs']['max_us'] == 50
+    assert st.snapshot()['stages']['pid']['count'] == 0
+
+
+def test_jitter_histogram_and_overruns():
+    st = LoopStats(loop_hz=1000)  # 1000 us budget
+    starts = (0, 1000, 2005, 3300, 9300)
+    for t in starts:
+        st.begin(t)
+        st.end(t + (1500 if t == 3300 else 100))
+    snap = st.snapshot()
+    edges = snap['jitter_edges_us']
+    hist = snap['jitter_hist']
+    assert len(hist) == len(edges) + 1
+    assert sum(hist) == len(starts) - 1
+    assert hist[0] == 2                 # 0 and 5 us off nominal
+    assert hist[4] == 1                 # 295 us -> [250, 500)
+    assert hist[-1] == 1                # 5000 us late
+    assert snap['overruns'] == 1
+    assert snap['period_us']['max'] == 6000
+    assert snap['busy_us']['max'] == 1500
+
+
+def test_flight_computer_step_records_every_stage():
+    fc = make_fc()
+    for _ in range(5):
+        fc.step()
+    snap = fc.timing_stats()
+    assert snap['loops'] == 5
+    for name in STAGE_NAMES:
+        assert snap['stages'][name]['count'] == 5, name
+    assert sum(snap['jitter_hist']) == 4
+    assert 'overruns=' in fc.loop_stats.summary()
+    fc.reset_timing_stats()
+    assert fc.timing_stats()['loops'] == 0
+
+
+class SlowButton:
+    """Arm button whose pin read takes 20 ms (released, pull-up)."""
+    def value(self):
+        time.sleep(0.02)
+        return 1
+
+
+def test_arm_button_time_is_not_charged_to_a_stage():
+    fc = make_fc()
+    fc.btn = SlowButton()
+    fc.step()
+    snap = fc.timing_stats()
+    for name in STAGE_NAMES:
+        assert snap['stages'][name]['max_us'] < 20000, name
+    assert snap['busy_us']['max'] >= 20000
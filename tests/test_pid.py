@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from control.filters import lpf_alpha
 from control.pid import PID
 
 
@@ -25,3 +28,32 @@ def test_pid_derivative_and_reset():
     out3 = pid.update(err=1.0, dt=0.1)
     # After reset, prev_err is None again, derivative term = 0
     assert out3 == 0.0
+
+
+def test_pid_derivative_low_pass():
+    raw = PID(kd=1.0)
+    filt = PID(kd=1.0, d_lpf_hz=20.0)
+    # Alternating +-0.1 error noise on a slow ramp, 1 kHz
+    out_raw = []
+    out_filt = []
+    for k in range(200):
+        err = 0.001 * k + (0.1 if k % 2 else -0.1)
+        out_raw.append(raw.update(err, 0.001))
+        out_filt.append(filt.update(err, 0.001))
+    assert max(abs(v) for v in out_raw[100:]) > 150.0
+    assert max(abs(v) for v in out_filt[100:]) < 15.0
+    filt.reset()
+    assert filt.d_rate == 0.0 and filt.update(1.0, 0.001) == 0.0
+
+
+def test_pid_d_filter_alpha_computed_once_per_dt():
+    pid = PID(kd=1.0, d_lpf_hz=30.0)
+    with patch('control.pid.lpf_alpha', wraps=lpf_alpha) as alpha:
+        for k in range(100):
+            pid.update(0.01 * k, 0.002)
+        assert alpha.call_count == 1
+        pid.update(1.0, 0.004)
+        pid.d_lpf_hz = 60.0
+        pid.update(1.0, 0.004)
+        assert alpha.call_count == 3
+    assert pid._alpha == lpf_alpha(60.0, 0.004)
@@ -0,0 +1,159 @@
+import struct
+
+import drivers.bmp280 as bmp280
+from drivers.icm20948 import ICM20948
+from drivers.mpu9250 import MPU9250
+
+_CAL = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+
+
+class LogI2C:
+    """Register file per address (ICM-20948 banks via 0x7F) with a bus log."""
+    def __init__(self, banked=False):
+        self.banked = banked
+        self.bank = 0
+        self.files = {}
+        self.log = []
+
+    def file(self, addr, bank=0):
+        return self.files.setdefault((addr, bank), bytearray(256))
+
+    def _f(self, addr):
+        return self.file(addr, self.bank if self.banked else 0)
+
+    def scan(self):
+        return [0x68, 0x76]
+
+    def readfrom_mem(self, addr, reg, n):
+        self.log.append(('r', addr, reg))
+        return bytes(self._f(addr)[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        self.log.append(('r', addr, reg))
+        f = self._f(addr)
+        for i in range(len(buf)):
+            buf[i] = f[reg + i]
+
+    def writeto_mem(self, addr, reg, data):
+        self.log.append(('w', addr, reg, data[0]))
+        if self.banked and reg == 0x7F:
+            self.bank = data[0] >> 4 & 3
+            return
+        self._f(addr)[reg:reg + len(data)] = data
+
+    def take(self):
+        out = self.log[:]
+        del self.log[:]
+        return out
+
+
+def _bmp():
+    i2c = LogI2C()
+    i2c.file(0x76)[0x88:0x88 + 24] = struct.pack('<HhhHhhhhhhhh', *_CAL)
+    bmp = bmp280.BMP280(i2c)
+    i2c.take()
+    return i2c, bmp
+
+
+def test_bmp280_setters_write_once_getters_are_free():
+    i2c, bmp = _bmp()
+    bmp.standby = bmp280.BMP280_STANDBY_250
+    bmp.iir = bmp280.BMP280_IIR_FILTER_2
+    bmp.temp_os = bmp280.BMP280_TEMP_OS_2
+    bmp.press_os = bmp280.BMP280_PRES_OS_8
+    bmp.force_measure()
+    log = i2c.take()
+    assert [e[0] for e in log] == ['w'] * 5
+    assert (bmp.standby, bmp.iir, bmp.temp_os, bmp.press_os, bmp.power_mode) == (
+        bmp280.BMP280_STANDBY_250, bmp280.BMP280_IIR_FILTER_2,
+        bmp280.BMP280_TEMP_OS_2, bmp280.BMP280_PRES_OS_8, bmp280.BMP280_POWER_FORCED)
+    assert bmp.in_normal_mode is False
+    assert i2c.take() == []
+    # Chip agrees with the shadow
+    f = i2c.file(0x76)
+    assert f[0xF4] == (2 << 5) | (4 << 2) | 1
+    assert f[0xF5] == (3 << 5) | (1 << 2)
+
+
+def test_bmp280_use_case_switch_is_two_writes():
+    i2c, bmp = _bmp()
+    bmp.use_case(bmp280.BMP280_CASE_DROP)
+    assert [e[:3] for e in i2c.take()] == [('w', 0x76, 0xF5), ('w', 0x76, 0xF4)]
+
+
+def test_bmp280_verify_and_sync():
+    i2c, bmp = _bmp()
+    assert bmp.verify()
+    f = i2c.file(0x76)
+    f[0xF5] = 0  # chip lost its config (e.g. brown-out)
+    assert not bmp.verify()
+    assert bmp.verify(repair=True) is False
+    assert f[0xF5] == bmp._shadow[1] and bmp.verify()
+    # Forced mode: the chip returns to sleep after the conversion
+    bmp.force_measure()
+    f[0xF4] &= 0xFC
+    assert bmp.verify()
+    f[0xF5] = 0x40
+    bmp.sync()
+    assert bmp.standby == 2 and bmp.iir == 0
+
+
+def test_mpu9250_skips_redundant_config_writes():
+    i2c = LogI2C()
+    imu = MPU9250(i2c)
+    i2c.take()
+    imu.set_sample_rate(500)
+    assert i2c.take() == [('w', 0x68, 0x19, 1)]
+    imu.set_sample_rate(500)
+    imu.enable_data_ready_int()
+    imu.enable_data_ready_int()
+    assert len(i2c.take()) == 2  # INT_PIN_CFG + INT_ENABLE, once
+    assert imu.config(0x19) == 1
+    assert i2c.take() == []
+
+
+def test_mpu9250_verify_repairs_and_reset_clears():
+    i2c = LogI2C()
+    imu = MPU9250(i2c)
+    f = i2c.file(0x68)
+    f[0x1B] = 0x18  # someone changed GYRO_CONFIG behind our back
+    assert imu.verify() == [0x1B]
+    assert imu.verify(repair=True) == [0x1B]
+    assert f[0x1B] == 0x00 and imu.verify() == []
+    imu._write(0x6B, 0x80)  # H_RESET
+    assert imu._shadow == {}
+    i2c.take()
+    imu.set_sample_rate(1000)
+    assert i2c.take() == [('w', 0x68, 0x19, 0)]
+
+
+def test_icm20948_bank_switches_only_when_needed():
+    i2c = LogI2C(banked=True)
+    i2c.file(0x68)[0x00] = 0xEA
+    imu = ICM20948(i2c)
+    i2c.take()
+    imu.set_sample_rate(1100)
+    log = i2c.take()
+    assert log[0] == ('w', 0x68, 0x7F, 0x20) and log[-1] == ('w', 0x68, 0x7F, 0x00)
+    assert len(log) == 7  # bank 2, five config registers, bank 0
+    imu.set_sample_rate(1100)
+    assert i2c.take() == []
+    imu.set_sample_rate(550)  # only the two dividers change
+    assert [e[2] for e in i2c.take()] == [0x7F, 0x00, 0x11, 0x7F]
+    assert imu.config(0x00, bank=2) == 1
+    assert i2c.take() == []
+
+
+def test_icm20948_verify_across_banks():
+    i2c = LogI2C(banked=True)
+    imu = ICM20948(i2c)
+    imu.set_sample_rate(1100)
+    imu.enable_data_ready_int()
+    assert imu.verify() == []
+    i2c.file(0x68, 2)[0x14] = 0
+    assert imu.verify(repair=True) == [0x200 | 0x14]
+    assert imu.verify() == []
+    assert i2c.bank == 0
+    i2c.file(0x68, 0)[0x11] = 0
+    imu.sync()
+    assert imu.config(0x11) == 0
@@ -0,0 +1,111 @@
+"""Rate-group scheduler tests driven by a fake microsecond clock."""
+from unittest.mock import patch
+
+from fc.scheduler import RateScheduler
+from fc_helpers import make_fc
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tasks_run_at_their_own_rates():
+    clk = FakeClock()
+    sched = RateScheduler(clock=clk)
+    calls = []
+    sched.add('fast', lambda now: calls.append('fast'), hz=1000, priority=0, critical=True)
+    sched.add('baro', lambda now: calls.append('baro'), hz=25, priority=10)
+    sched.add('gps', lambda now: calls.append('gps'), hz=5, priority=20)
+    for us in range(0, 1000000, 1000):
+        clk.now = us
+        sched.run_pending()
+    assert calls.count('fast') == 1000
+    assert calls.count('baro') == 25
+    assert calls.count('gps') == 5
+
+
+def test_priority_order_within_tick():
+    clk = FakeClock()
+    sched = RateScheduler(clock=clk)
+    calls = []
+    sched.add('low', lambda now: calls.append('low'), hz=10, priority=5)
+    sched.add('high', lambda now: calls.append('high'), hz=10, priority=0, critical=True)
+    sched.run_pending()
+    assert calls == ['high', 'low']
+
+
+def test_slow_task_waits_for_slack_then_is_forced():
+    clk = FakeClock()
+    sched = RateScheduler(clock=clk)
+
+    def slow(now):
+        clk.now += 800  # costs 0.8 ms of bus time
+
+    sched.add('fast', lambda now: None, hz=1000, priority=0, critical=True)
+    t = sched.add('slow', slow, hz=100, priority=10)
+    sched.run_pending()  # first run measures the cost
+    assert t.runs == 1 and t.cost_us == 800
+    # Next release at 10 ms; with 0.5 ms of slack left it must not run
+    clk.now = 10500
+    sched.get('fast').next_us = 11000
+    sched.run_pending()
+    assert t.runs == 1 and t.deferred == 1
+    # The loop sleeps until the critical deadline, not the expired release
+    assert sched.next_deadline() == 11000
+    # A full period late it runs regardless of slack
+    clk.now = 20000
+    sched.get('fast').next_us = 20100
+    sched.run_pending()
+    assert t.runs == 2
+
+
+def test_run_sleeps_while_a_task_is_deferred():
+    clk = FakeClock()
+    sched = RateScheduler(clock=clk)
+    sleeps = []
+
+    def fast(now):
+        clk.now += 300
+
+    def slow(now):
+        clk.now += 800
+
+    def fake_sleep(us):
+        sleeps.append(us)
+        clk.now += max(us, 1)  # a spin still costs a little time
+
+    sched.add('fast', fast, hz=1000, priority=0, critical=True)
+    slow_t = sched.add('slow', slow, hz=100, priority=10)
+    with patch('fc.scheduler.sleep_us', fake_sleep):
+        sched.run(seconds=0.05)
+    assert slow_t.deferred > 0
+    # About one sleep per 1 ms control slot, never a busy spin; only a
+    # forced slow run may leave the control task already due
+    assert len(sleeps) < 100
+    assert sum(1 for us in sleeps if us <= 0) <= slow_t.runs
+
+
+def test_flight_computer_scheduler_skips_slow_sensors():
+    fc = make_fc()
+    sched = fc.build_scheduler(control_hz=500, baro_hz=25, gps_hz=5, telemetry_hz=1)
+    clk = FakeClock()
+    sched._clock = clk
+    reads = {'imu': 0, 'baro': 0, 'gps': 0}
+    hub = fc.sensors
+    for name, sensor in (('imu', hub.imu), ('baro', hub.baro), ('gps', hub.gps)):
+        def counted(smp, orig=sensor.read_into, key=name):
+            reads[key] += 1
+            return orig(smp)
+        sensor.read_into = counted
+    fc.set_telemetry_sink(None)
+    for us in range(0, 1000000, 2000):
+        clk.now = us
+        sched.run_pending()
+    assert reads['imu'] == 500
+    assert reads['baro'] == 25
+    assert reads['gps'] == 5
+    assert fc.motors.last is not None
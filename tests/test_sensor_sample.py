@@ -0,0 +1,180 @@
+"""SensorSample validity bits and per-sensor timestamps."""
+import time
+
+import sensors.imu_wrapper as imu_wrapper
+from fc.dual_core import SensorCore
+from sensors.bmp280_wrapper import Bmp280Sensor
+from sensors.gps_wrapper import GpsSensor
+from sensors.sample import (SensorSample, VALID_ACCEL, VALID_GYRO, VALID_MAG,
+                            VALID_IMU_TEMP, VALID_PRESSURE, VALID_ALTITUDE,
+                            VALID_BARO_TEMP, VALID_IMU, VALID_BARO, VALID_GPS,
+                            VALID_GPS_POS)
+from sensors.sensor_hub import SensorHub
+
+from fc_helpers import make_fc
+
+
+class PartialImu:
+    """Legacy attribute driver with no magnetometer or temperature."""
+    acceleration = (0.0, 0.0, 1.0)
+    gyro = (1.0, 2.0, 3.0)
+    mag = (None, None, None)
+    temperature = None
+
+
+def test_new_sample_has_no_valid_fields():
+    s = SensorSample()
+    assert s.valid == 0 and not s.has(VALID_ACCEL)
+    d = s.as_dict()
+    assert d['temperature_c'] is None and d['altitude_m'] is None
+    assert d['gps_lat_e7'] is None and d['imu_temp_c'] is None
+
+
+def test_hub_update_sets_bits_and_stamps():
+    hub = SensorHub(i2c=None)
+    s = hub.update()
+    assert s.has(VALID_IMU | VALID_MAG | VALID_IMU_TEMP | VALID_BARO)
+    assert not s.valid & VALID_GPS
+    assert s.imu_us != 0 and s.baro_us != 0
+    assert isinstance(s.altitude_m, float)
+
+
+def test_partial_imu_read_clears_missing_bits():
+    imu = imu_wrapper.ImuSensor(None)
+    imu._drv = PartialImu()
+    imu._lib = 'mpu9250'
+    s = SensorSample()
+    s.valid = VALID_MAG | VALID_IMU_TEMP | VALID_PRESSURE
+    imu.read_into(s)
+    assert s.valid == VALID_ACCEL | VALID_GYRO | VALID_PRESSURE
+    assert tuple(s.gyro_dps) == (1.0, 2.0, 3.0)
+    assert imu.read()['temp_c'] is None
+
+
+class FlakyImu:
+    """Burst-read driver whose bus transactions fail."""
+    def read_all(self):
+        raise OSError(5)
+
+    @property
+    def acceleration(self):
+        raise OSError(5)
+
+
+def test_failed_imu_read_keeps_value_and_is_not_simulated():
+    imu = imu_wrapper.ImuSensor(None)
+    s = imu.read_into(SensorSample())
+    imu._drv = FlakyImu()
+    imu._lib = 'mpu9250'
+    imu._read_all = imu._drv.read_all
+    s.accel_g[0] = 0.25
+    s.gyro_dps[2] = -7.0
+    s.valid |= VALID_PRESSURE
+    stamp = s.imu_us
+    imu.read_into(s)
+    assert s.valid == VALID_PRESSURE
+    assert s.accel_g[0] == 0.25 and s.gyro_dps[2] == -7.0
+    assert s.imu_us == stamp
+
+
+class SlowMagImu:
+    """Burst read every call; the magnetometer has a new sample on every
+    5th read_mag() (100 Hz AK8963 polled at 500 Hz) and can fail."""
+    def __init__(self):
+        self.n = 0
+        self.fail = False
+
+    def read_all(self):
+        return (0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 25.0)
+
+    def read_mag(self, out):
+        if self.fail:
+            raise OSError(5)
+        self.n += 1
+        if self.n % 5:
+            return None
+        out[0] = float(self.n); out[1] = 0.0; out[2] = -1.0
+        return out
+
+
+def test_mag_without_new_data_keeps_last_field():
+    imu = imu_wrapper.ImuSensor(None)
+    imu._drv = SlowMagImu()
+    imu._lib = 'mpu9250'
+    imu._has_mag = True
+    imu._read_all = imu._drv.read_all
+    imu._read_mag = imu._drv.read_mag
+    s = SensorSample()
+    for _ in range(4):
+        imu.read_into(s)
+        assert not s.valid & VALID_MAG
+    for k in range(5, 15):
+        imu.read_into(s)
+        assert s.valid & VALID_MAG
+        assert s.mag_uT[0] == (5.0 if k < 10 else 10.0) and s.mag_uT[2] == -1.0
+    # A bus error is what invalidates it (the old field stays)
+    imu._drv.fail = True
+    imu.read_into(s)
+    assert s.has(VALID_IMU) and not s.valid & VALID_MAG
+    assert s.mag_uT[0] == 10.0
+
+
+def test_failed_baro_read_keeps_value_but_clears_bits():
+    baro = Bmp280Sensor(i2c=None)
+    s = baro.read_into(SensorSample())
+    p = s.pressure_pa
+    assert s.has(VALID_BARO)
+    baro._driver = type('Dead', (), {'measure': lambda self: (None, None)})()
+    baro.read_into(s)
+    assert not s.valid & (VALID_PRESSURE | VALID_ALTITUDE | VALID_BARO_TEMP)
+    assert s.pressure_pa == p
+    assert baro.read()['pressure_pa'] is None
+
+
+def test_gps_without_receiver_clears_gps_bits():
+    gps = GpsSensor()
+    gps._gps = None
+    s = SensorSample()
+    s.valid = VALID_GPS | VALID_ACCEL
+    gps.read_into(s)
+    assert s.valid == VALID_ACCEL and not s.gps_has_fix
+    assert not s.has(VALID_GPS_POS)
+
+
+def test_flight_outputs_follow_bits():
+    fc = make_fc()
+    fc.set_telemetry_sink(None)
+    s = SensorSample()
+    s.imu_temp_c = 31.0
+    s.valid = VALID_IMU | VALID_IMU_TEMP
+    out = fc._outputs(0.01, s)
+    assert out.alt_m is None and out.temp_c == 31.0
+    s.temperature_c = 0.0
+    s.altitude_m = 12.5
+    s.valid |= VALID_BARO
+    out = fc._outputs(0.01, s)
+    assert out.alt_m == 12.5 and out.temp_c == 0.0
+
+
+def test_sensor_core_carries_bits_and_baro_stamp():
+    hub = SensorHub(i2c=None)
+    core = SensorCore(hub, imu_hz=2000, baro_div=4)
+    core.start()
+    try:
+        deadline = time.time() + 2.0
+        while core.samples < 20 and time.time() < deadline:
+            time.sleep(0.001)
+    finally:
+        core.stop()
+    s = SensorSample()
+    s.valid = VALID_GPS_POS
+    assert core.pull_into(s)
+    assert s.has(VALID_IMU | VALID_BARO | VALID_GPS_POS)
+    assert s.imu_us == core.snapshot_ts
+    assert s.baro_us == core._acq.baro_us
+
+
+def test_benchmark_sample_path_allocates_less():
+    from benchmarks.sample_bench import main
+    r = main(reads=20)
+    assert r['sample_bytes'] < r['legacy_bytes']
@@ -0,0 +1,97 @@
+"""SensorHub subscriptions: read only what consumers declared, at their rate."""
+import pytest
+
+from sensors.sample import VALID_MAG
+from sensors.sensor_hub import SensorHub, SENSE_GPS
+
+from fc_helpers import make_fc
+
+
+def _counting_hub():
+    hub = SensorHub(i2c=None)
+    counts = {'imu': 0, 'baro': 0, 'gps': 0}
+    for name in counts:
+        sensor = getattr(hub, name)
+        orig = sensor.read_into
+
+        def read_into(s, _orig=orig, _name=name):
+            counts[_name] += 1
+            return _orig(s)
+        sensor.read_into = read_into
+    return hub, counts
+
+
+def test_no_subscriptions_reads_everything():
+    hub, counts = _counting_hub()
+    hub.update()
+    hub.update()
+    assert counts == {'imu': 2, 'baro': 2, 'gps': 2}
+
+
+def test_rates_and_unused_sensors():
+    hub, counts = _counting_hub()
+    hub.subscribe(('accel_g', 'gyro_dps'))
+    hub.subscribe('altitude_m', hz=25)
+    for t in range(100):
+        hub.update(now_us=t * 10000)  # 100 Hz for one second
+    assert counts == {'imu': 100, 'baro': 25, 'gps': 0}
+    assert hub.skipped[1] == 75 and hub.skipped[2] == 0
+
+
+def test_jitter_does_not_skip_a_period():
+    hub, counts = _counting_hub()
+    hub.subscribe('pressure_pa', hz=100)
+    for now in (0, 9500, 19200, 29900, 39000):
+        hub.update(now_us=now)
+    assert counts['baro'] == 5 and counts['imu'] == 0
+
+
+def test_fastest_subscriber_wins_and_cancel_replans():
+    hub, counts = _counting_hub()
+    slow = hub.subscribe('gps_lat_e7', hz=1)
+    fast = hub.subscribe(('gps_has_fix', 'temperature_c'), hz=5)
+    for t in range(10):
+        hub.update(now_us=t * 100000)
+    assert counts['gps'] == 5 and counts['baro'] == 5
+    fast.cancel()
+    for t in range(10, 30):
+        hub.update(now_us=t * 100000)
+    assert counts['gps'] == 7 and counts['baro'] == 5
+    hub.unsubscribe(slow)
+    assert hub.subscriptions == []
+
+
+def test_mag_only_read_when_subscribed():
+    hub = SensorHub(i2c=None)
+    hub.subscribe('accel_g')
+    s = hub.update(now_us=0)
+    assert not s.valid & VALID_MAG
+    assert hub.read()['mag_uT'] is not None  # read() ignores subscriptions
+    hub.subscribe('mag_uT', hz=10)
+    assert hub.update(now_us=200000).valid & VALID_MAG
+
+
+def test_age_per_field():
+    hub = SensorHub(i2c=None)
+    hub.subscribe(('accel_g', 'altitude_m'), hz=10)
+    s = hub.update()
+    assert hub.age_us('accel_g', now_us=s.imu_us + 1500) == 1500
+    assert hub.age_us('altitude_m', now_us=s.baro_us) == 0
+    assert hub.age_us('gps_lat') is None
+    with pytest.raises(ValueError):
+        hub.age_us('speed')
+    with pytest.raises(ValueError):
+        hub.subscribe('speed')
+
+
+def test_flight_computer_skips_gps():
+    hub, counts = _counting_hub()
+    fc = make_fc(sensors=hub)
+    fc.set_telemetry_sink(None)
+    for _ in range(5):
+        out = fc.step()
+    assert counts['gps'] == 0 and counts['imu'] == 5
+    assert 1 <= counts['baro'] <= 5
+    assert out['alt_m'] is not None
+    hub.update(sensors=SENSE_GPS)
+    assert counts['gps'] == 0
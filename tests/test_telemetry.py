@@ -0,0 +1,109 @@
+"""Binary telemetry ring buffer and drain tests."""
+from unittest.mock import patch
+
+from fc.telemetry import (TelemetryRing, TelemetryDrain, decode_records,
+                          REC_OUTPUTS, REC_STATS, REC_SIZE)
+
+from fc_helpers import make_fc
+
+
+class ListWriter:
+    def __init__(self, ready=True):
+        self.chunks = []
+        self.is_ready = ready
+
+    def ready(self):
+        return self.is_ready
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def records(self):
+        return decode_records(b''.join(self.chunks))
+
+
+def _push(ring, n, rtype=REC_OUTPUTS):
+    for i in range(n):
+        ring.values[0] = float(i)
+        ring.commit(rtype, 1000 * i)
+
+
+def test_records_roundtrip_in_order():
+    ring = TelemetryRing(capacity=8)
+    _push(ring, 5)
+    w = ListWriter()
+    assert TelemetryDrain(ring, w).drain() == 5
+    recs = w.records()
+    assert [r['dt'] for r in recs] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert [r['seq'] for r in recs] == [0, 1, 2, 3, 4]
+    assert recs[3]['ts_us'] == 3000
+    assert len(ring) == 0
+    assert len(b''.join(w.chunks)) == 5 * REC_SIZE
+
+
+class StrictBuf(bytearray):
+    """MicroPython's bytearray: no slice assignment from array('f')."""
+    def __setitem__(self, key, value):
+        if getattr(value, 'itemsize', 1) != 1:
+            raise ValueError('lhs and rhs should be compatible')
+        bytearray.__setitem__(self, key, value)
+
+
+def test_commit_packs_values_and_wraps_ts_to_ticks_range():
+    ring = TelemetryRing(capacity=2)
+    ring._buf = StrictBuf(len(ring._buf))
+    ring._mv = memoryview(ring._buf)
+    for i in range(14):
+        ring.values[i] = i + 0.5
+    ring.commit(REC_OUTPUTS, (1 << 32) + 7)   # desktop perf_counter() us
+    w = ListWriter()
+    TelemetryDrain(ring, w).drain()
+    rec = w.records()[0]
+    assert rec['ts_us'] == 7 and rec['dt'] == 0.5 and rec['alt_m'] == 13.5
+
+
+def test_full_ring_overwrites_oldest_and_wraps():
+    ring = TelemetryRing(capacity=4)
+    _push(ring, 6)
+    assert len(ring) == 4 and ring.dropped == 2
+    w = ListWriter()
+    drain = TelemetryDrain(ring, w)
+    drain.drain()
+    assert [r['dt'] for r in w.records()] == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_drain_never_writes_when_sink_busy():
+    ring = TelemetryRing(capacity=4)
+    _push(ring, 3)
+    w = ListWriter(ready=False)
+    assert TelemetryDrain(ring, w).drain() == 0
+    assert w.chunks == [] and len(ring) == 3
+
+
+def test_decimation_keeps_stats_records():
+    ring = TelemetryRing(capacity=32)
+    _push(ring, 10)
+    ring.values[0] = 42.0
+    ring.commit(REC_STATS, 0)
+    w = ListWriter()
+    TelemetryDrain(ring, w, decimate=5).drain()
+    recs = w.records()
+    assert [r['dt'] for r in recs if r['type'] == REC_OUTPUTS] == [0.0, 5.0]
+    assert [r['loops'] for r in recs if r['type'] == REC_STATS] == [42.0]
+
+
+def test_flight_computer_step_commits_without_printing():
+    fc = make_fc()
+    w = ListWriter()
+    fc.set_telemetry_sink(w, decimate=1)
+    with patch('builtins.print') as p:
+        for _ in range(3):
+            fc.step()
+        fc._publish_stats()
+    assert not p.called
+    fc.telemetry_drain.drain()
+    recs = w.records()
+    assert [r['type'] for r in recs] == [REC_OUTPUTS] * 3 + [REC_STATS]
+    assert recs[-1]['loops'] == 3.0
+    assert abs(recs[0]['roll_deg'] - fc.ahrs.roll) < 5.0